@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from copy import copy
+from math import prod
 from typing import Literal, Tuple
 
 import torch
@@ -6,15 +8,124 @@ from torch import Tensor
 
 from .elements import Element
 from .materials import Material
-from .sparse import CachedSolve, sparse_solve
+from .sparse import (
+    AMGCache,
+    CachedSolve,
+    FactorizationCache,
+    csr_pattern,
+    matrix_free_solve,
+    sparse_solve,
+)
+from .utils import voigt_stiffness
+
+
+class PrecisionPolicy:
+    def __init__(
+        self,
+        compute: torch.dtype | None = None,
+        accumulate: torch.dtype | None = None,
+        solve: torch.dtype | None = None,
+    ):
+        """Floating point precision of the stages of the solution pipeline.
+
+        Args:
+            compute (torch.dtype, optional): Gradient operators, material update,
+                material tangents and element matrices. Defaults to None, which uses
+                the accumulation precision.
+            accumulate (torch.dtype, optional): Assembly of the global stiffness
+                matrix and force vectors, residuals, solution and stored stress and
+                state. Defaults to None, which uses the dtype of the model.
+            solve (torch.dtype, optional): Factorization or preconditioner of linear
+                solves. If lower than the accumulation precision, solutions are
+                refined iteratively in the accumulation precision. Defaults to None,
+                which uses the accumulation precision.
+        """
+        self.compute = compute
+        self.accumulate = accumulate
+        self.solve = solve
+
+    @classmethod
+    def mixed(cls) -> "PrecisionPolicy":
+        """Element kernels and linear solves in float32, accumulation in float64."""
+        return cls(torch.float32, torch.float64, torch.float32)
+
+
+class AdaptiveStepping:
+    def __init__(
+        self,
+        initial: float | None = None,
+        min_step: float = 1e-3,
+        max_step: float | None = None,
+        grow: float = 1.5,
+        cutback: float = 0.5,
+        fast_iter: int = 4,
+        max_iter: int | None = None,
+    ):
+        """Adaptive load increment control of Newton-Raphson solves.
+
+        The load path runs from the first to the last entry of the increments
+        passed to `FEM.solve`. An increment that converges in at most `fast_iter`
+        iterations multiplies the next increment by `grow`. An increment that does
+        not converge (or yields a non-finite residual) is cut back by `cutback` and
+        retried from the last converged displacements, stress and state.
+
+        After a solve, `stats` holds the accepted load factors ("loads"), the number
+        of accepted increments, cutbacks, Newton iterations and linear solves. It
+        also compares them with the fixed schedule of the passed increments:
+        "solves_saved" estimates the solves of the fixed schedule with the average
+        number of solves per accepted increment.
+
+        Args:
+            initial (float, optional): First increment. Defaults to None, which uses
+                the first increment of the fixed schedule.
+            min_step (float): Smallest increment. The solve fails if an increment of
+                this size does not converge. Defaults to 1e-3.
+            max_step (float, optional): Largest increment. Defaults to None, which
+                allows the whole load path in one increment.
+            grow (float): Growth factor after fast convergence. Defaults to 1.5.
+            cutback (float): Reduction factor after divergence. Defaults to 0.5.
+            fast_iter (int): Maximum number of iterations of an increment that is
+                considered fast. Defaults to 4.
+            max_iter (int, optional): Maximum number of iterations per attempt
+                before cutting back (at least 1). Defaults to None, which uses
+                `max_iter` of the solve.
+        """
+        if max_iter is not None and max_iter < 1:
+            raise ValueError("max_iter must be at least 1.")
+        self.initial = initial
+        self.min_step = min_step
+        self.max_step = max_step
+        self.grow = grow
+        self.cutback = cutback
+        self.fast_iter = fast_iter
+        self.max_iter = max_iter
+        self.stats = {}
 
 
 class FEM(ABC):
-    def __init__(self, nodes: Tensor, elements: Tensor, material: Material):
-        """Initialize a general FEM problem."""
+    def __init__(
+        self,
+        nodes: Tensor,
+        elements: Tensor,
+        material: Material,
+        dtype: torch.dtype | None = None,
+    ):
+        """Initialize a general FEM problem.
+
+        Args:
+            nodes (Tensor): Nodal coordinates.
+            elements (Tensor): Element connectivity.
+            material (Material): Material model.
+            dtype (torch.dtype, optional): Floating point type of the model. Nodes and
+                material parameters are cast to it. Defaults to None, which uses the
+                type of the nodes.
+        """
+
+        # Floating point type of the model
+        self.dtype = nodes.dtype if dtype is None else dtype
 
         # Store nodes and elements
-        self.nodes = nodes
+        self.nodes = nodes.to(self.dtype)
         self.elements = elements
 
         # Compute problem size
@@ -24,8 +135,8 @@ class FEM(ABC):
         self.n_elem = len(self.elements)
 
         # Initialize load variables
-        self._forces = torch.zeros_like(nodes)
-        self._displacements = torch.zeros_like(nodes)
+        self._forces = torch.zeros_like(self.nodes)
+        self._displacements = torch.zeros_like(self.nodes)
         self._constraints = torch.zeros_like(nodes, dtype=torch.bool)
 
         # Compute mapping from local to global indices
@@ -37,6 +148,7 @@ class FEM(ABC):
             self.material = material
         else:
             self.material = material.vectorize(self.n_elem)
+        self.material = self.material.to(self.dtype)
 
         # Initialize types
         self.n_stress: int
@@ -47,14 +159,43 @@ class FEM(ABC):
         # Cached solve for sparse linear systems
         self.cached_solve = CachedSolve()
 
+        # Cached AMG preconditioner for iterative linear solves
+        self.amg_cache = AMGCache()
+
+        # Cached ordering and factorization for direct linear solves
+        self.factorization_cache = FactorizationCache()
+
+        # Cached sparsity pattern and scatter map for stiffness assembly
+        self._assembly_plan: Tuple[Tensor, bool, Tensor, Tensor, Tensor] | None = None
+
+        # Floating point precision of element kernels, assembly and solves
+        self.precision = PrecisionPolicy()
+
+        # Compiled integration step and deferred checks of the compile mode
+        self._compiled_step = None
+        self._deferred_checks = False
+        self._invalid_jacobian = torch.tensor(False)
+
+    @property
+    def nodes(self) -> Tensor:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, value: Tensor):
+        self._nodes = value
+        # Reassigning nodes invalidates the cached reference geometry
+        self._geometry: Tuple[int, Tuple[Tensor, Tensor, Tensor]] | None = None
+
     @property
     def forces(self) -> Tensor:
         return self._forces
 
     @forces.setter
     def forces(self, value: Tensor):
-        if not value.shape == self.nodes.shape:
-            raise ValueError("Forces must have the same shape as nodes.")
+        if not value.shape[-2:] == self.nodes.shape or value.dim() > 3:
+            raise ValueError(
+                "Forces must have the shape of nodes or (n_cases, *nodes.shape)."
+            )
         if not torch.is_floating_point(value):
             raise TypeError("Forces must be a floating-point tensor.")
         self._forces = value.to(self.nodes.device)
@@ -65,8 +206,10 @@ class FEM(ABC):
 
     @displacements.setter
     def displacements(self, value: Tensor):
-        if not value.shape == self.nodes.shape:
-            raise ValueError("Displacements must have the same shape as nodes.")
+        if not value.shape[-2:] == self.nodes.shape or value.dim() > 3:
+            raise ValueError(
+                "Displacements must have the shape of nodes or (n_cases, *nodes.shape)."
+            )
         if not torch.is_floating_point(value):
             raise TypeError("Displacements must be a floating-point tensor.")
         self._displacements = value.to(self.nodes.device)
@@ -97,10 +240,58 @@ class FEM(ABC):
     def compute_f(self, detJ: Tensor, B: Tensor, S: Tensor):
         raise NotImplementedError
 
+    def check_jacobian(self, detJ: Tensor):
+        """Check that all Jacobian determinants are positive.
+
+        In compile mode (see `solve(..., compile=True)`), the check is recorded as a
+        flag and raised after the compiled region instead of branching on data.
+        """
+        if self._deferred_checks:
+            self._invalid_jacobian = self._invalid_jacobian | torch.any(detJ <= 0.0)
+        elif torch.any(detJ <= 0.0):
+            raise Exception("Negative Jacobian. Check element numbering.")
+
+    def eval_geometry(self, u: Tensor | float = 0.0) -> Tuple[Tensor, Tensor, Tensor]:
+        """Shape functions, gradient operators and Jacobian determinants.
+
+        Args:
+            u (Tensor | float): Displacements of the evaluated configuration.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: N, B and detJ stacked over all integration
+            points, i.e. with shapes `(n_int, ...)`, `(n_int, n_elem, ...)` and
+            `(n_int, n_elem)`.
+        """
+        values = [self.eval_shape_functions(xi, u) for xi in self.etype.ipoints()]
+        N, B, detJ = zip(*values)
+        return torch.stack(N), torch.stack(B), torch.stack(detJ)
+
+    def reference_geometry(self) -> Tuple[Tensor, Tensor, Tensor]:
+        """Shape functions, gradient operators and Jacobian determinants.
+
+        The values are evaluated in the reference configuration at all integration
+        points. They are cached until the nodes are reassigned or modified in
+        place. If the nodes require gradients, the values are recomputed in each
+        call to track the dependency on the nodes.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: N, B0 and detJ0 stacked over all
+            integration points (see `eval_geometry`).
+        """
+        if self.nodes.requires_grad:
+            return self.eval_geometry()
+        # Compiled solves evaluate the cache beforehand, the version is not traceable
+        if torch.compiler.is_compiling() and self._geometry is not None:
+            return self._geometry[1]
+        version = self.nodes._version
+        if self._geometry is None or self._geometry[0] != version:
+            self._geometry = (version, self.eval_geometry())
+        return self._geometry[1]
+
     def compute_B(self) -> Tensor:
         """Null space representing rigid body modes."""
         if self.n_dim == 3:
-            B = torch.zeros((self.n_dofs, 6))
+            B = torch.zeros((self.n_dofs, 6), dtype=self.dtype)
             B[0::3, 0] = 1
             B[1::3, 1] = 1
             B[2::3, 2] = 1
@@ -111,26 +302,86 @@ class FEM(ABC):
             B[0::3, 5] = -self.nodes[:, 1]
             B[1::3, 5] = self.nodes[:, 0]
         else:
-            B = torch.zeros((self.n_dofs, 3))
+            B = torch.zeros((self.n_dofs, 3), dtype=self.dtype)
             B[0::2, 0] = 1
             B[1::2, 1] = 1
             B[1::2, 2] = -self.nodes[:, 0]
             B[0::2, 2] = self.nodes[:, 1]
         return B
 
+    def select(self, elements: slice) -> "FEM":
+        """Shallow copy of the problem restricted to a block of elements.
+
+        Nodes, loads and constraints are shared with the original problem. This is
+        used to stream blocks of elements through the integration.
+
+        Args:
+            elements (slice): Block of elements to select.
+
+        Returns:
+            FEM: Problem containing only the selected elements.
+        """
+        fem = copy(self)
+        fem.elements = self.elements[elements]
+        fem.idx = self.idx[elements]
+        fem.n_elem = len(fem.elements)
+        fem.ext_strain = self.ext_strain[elements]
+        fem.material = self.material.select(elements, self.n_elem)
+
+        # Restrict the cached reference geometry to the block of elements
+        if self._geometry is not None:
+            version, (N, B, detJ) = self._geometry
+            fem._geometry = (version, (N, B[:, elements], detJ[:, elements]))
+        return fem
+
     def k0(self) -> Tensor:
         """Compute element stiffness matrix for zero strain."""
+        n_s = self.n_stress
         u = torch.zeros_like(self.nodes)
-        F = torch.zeros(2, self.n_int, self.n_elem, self.n_stress, self.n_stress)
-        F[:, :, :, :, :] = torch.eye(self.n_stress)
-        s = torch.zeros(2, self.n_int, self.n_elem, self.n_stress, self.n_stress)
-        a = torch.zeros(2, self.n_int, self.n_elem, self.material.n_state)
-        du = torch.zeros_like(self.nodes)
-        de0 = torch.zeros(self.n_elem, self.n_stress, self.n_stress)
+        F = torch.zeros(2, self.n_int, self.n_elem, n_s, n_s, dtype=self.dtype)
+        F[:, :, :, :, :] = torch.eye(self.n_stress, dtype=self.dtype)
+        s = torch.zeros(2, self.n_int, self.n_elem, n_s, n_s, dtype=self.dtype)
+        n_state = self.material.n_state
+        a = torch.zeros(2, self.n_int, self.n_elem, n_state, dtype=self.dtype)
+        du = torch.zeros(self.n_dofs, dtype=self.dtype)
+        de0 = torch.zeros(self.n_elem, n_s, n_s, dtype=self.dtype)
         self.K = torch.empty(0)
         k, _ = self.integrate_material(u, F, s, a, 1, du, de0, False)
         return k
 
+    @property
+    def accumulate_dtype(self) -> torch.dtype:
+        """Precision of assembly, residuals and the solution."""
+        return self.precision.accumulate or self.dtype
+
+    @property
+    def compute_dtype(self) -> torch.dtype:
+        """Precision of gradient operators, material update and element matrices."""
+        return self.precision.compute or self.accumulate_dtype
+
+    def needs_stiffness(self, nlgeom: bool) -> bool:
+        """Whether element stiffness matrices must be (re)computed."""
+        return self.K.numel() == 0 or not self.material.n_state == 0 or nlgeom
+
+    def compute_BCB(self, ddsdde: Tensor, B: Tensor) -> Tensor:
+        """Material stiffness integrand B^T C B at integration points.
+
+        Materials with `voigt_kernel` set use batched matrix products in Voigt
+        notation, all others contract the fourth-order tangent directly.
+
+        Args:
+            ddsdde (Tensor): Material tangent. Shape: `(..., n_elem, d, d, d, d)`.
+            B (Tensor): Gradient operators. Shape: `(..., n_elem, n_stress, N)`.
+
+        Returns:
+            Tensor: Integrand. Shape: `(..., n_elem, n_dofs, n_dofs)`.
+        """
+        if self.material.voigt_kernel:
+            return voigt_stiffness(ddsdde, B)
+        n_dofs = self.n_dim * self.etype.nodes
+        BCB = torch.einsum("...ijpq,...qk,...il->...ljkp", ddsdde, B, B)
+        return BCB.reshape(*BCB.shape[:-4], n_dofs, n_dofs)
+
     def integrate_material(
         self,
         u: Tensor,
@@ -141,27 +392,54 @@ class FEM(ABC):
         du: Tensor,
         de0: Tensor,
         nlgeom: bool,
+        stiffness: bool | None = None,
     ) -> Tuple[Tensor, Tensor]:
-        """Perform numerical integrations for element stiffness matrix."""
+        """Perform numerical integrations for element stiffness matrix.
+
+        The displacement increment may have a leading load case dimension. The
+        element stiffness matrix is only computed without load cases.
+
+        The element stiffness matrix is computed if `stiffness` is True. None decides
+        based on the current global stiffness matrix, material state and `nlgeom`.
+        """
+        if stiffness is None:
+            stiffness = self.needs_stiffness(nlgeom)
+
+        # Leading load case dimensions
+        batch = du.shape[:-1]
+
         # Compute updated configuration
-        u_trial = u[n - 1] + du.view((-1, self.n_dim))
+        u_trial = u[n - 1] + du.view(*batch, -1, self.n_dim)
 
         # Reshape displacement increment
-        du = du.view(-1, self.n_dim)[self.elements].reshape(
-            self.n_elem, -1, self.n_stress
+        dtype = self.compute_dtype
+        du = du.view(*batch, -1, self.n_dim)[..., self.elements, :].reshape(
+            *batch, self.n_elem, -1, self.n_stress
         )
+        du = du.to(dtype)
+        de0 = de0.to(dtype)
+        material = self.material.to(dtype)
 
         # Initialize nodal force and stiffness
         N_nod = self.etype.nodes
-        f = torch.zeros(self.n_elem, self.n_dim * N_nod)
-        k = torch.zeros((self.n_elem, self.n_dim * N_nod, self.n_dim * N_nod))
+        f = torch.zeros(*batch, self.n_elem, self.n_dim * N_nod, dtype=dtype)
+        k = torch.zeros(
+            (self.n_elem, self.n_dim * N_nod, self.n_dim * N_nod), dtype=dtype
+        )
+
+        # Gradient operators in the reference configuration (cached)
+        _, B0_all, detJ0_all = self.reference_geometry()
+        B0_all = B0_all.to(dtype)
+        detJ0_all = detJ0_all.to(dtype)
 
         for i, (w, xi) in enumerate(zip(self.etype.iweights(), self.etype.ipoints())):
-            # Compute gradient operators
-            _, B0, detJ0 = self.eval_shape_functions(xi)
+            B0 = B0_all[i]
+            detJ0 = detJ0_all[i]
             if nlgeom:
                 # Compute updated gradient operators in deformed configuration
                 _, B, detJ = self.eval_shape_functions(xi, u_trial)
+                B = B.to(dtype)
+                detJ = detJ.to(dtype)
             else:
                 # Use initial gradient operators
                 B = B0
@@ -174,25 +452,27 @@ class FEM(ABC):
             F[n, i] = F[n - 1, i] + H_inc
 
             # Evaluate material response
-            stress[n, i], state[n, i], ddsdde = self.material.step(
-                H_inc, F[n - 1, i], stress[n - 1, i], state[n - 1, i], de0
+            stress[n, i], state[n, i], ddsdde = material.step(
+                H_inc,
+                F[n - 1, i].to(dtype),
+                stress[n - 1, i].to(dtype),
+                state[n - 1, i].to(dtype),
+                de0,
             )
+            ddsdde = ddsdde.to(dtype)
 
             # Compute element internal forces
-            force_contrib = self.compute_f(detJ, B, stress[n, i].clone())
-            f += w * force_contrib.reshape(-1, self.n_dim * N_nod)
+            sigma = stress[n, i].to(dtype, copy=True)
+            force_contrib = self.compute_f(detJ, B, sigma)
+            f += w * force_contrib.reshape(*batch, -1, self.n_dim * N_nod)
 
             # Compute element stiffness matrix
-            if self.K.numel() == 0 or not self.material.n_state == 0 or nlgeom:
+            if stiffness:
                 # Material stiffness
-                BCB = torch.einsum("...ijpq,...qk,...il->...ljkp", ddsdde, B, B)
-                BCB = BCB.reshape(-1, self.n_dim * N_nod, self.n_dim * N_nod)
-                k += w * self.compute_k(detJ, BCB)
+                k += w * self.compute_k(detJ, self.compute_BCB(ddsdde, B))
             if nlgeom:
                 # Geometric stiffness
-                BSB = torch.einsum(
-                    "...iq,...qk,...il->...lk", stress[n, i].clone(), B, B
-                )
+                BSB = torch.einsum("...iq,...qk,...il->...lk", sigma, B, B)
                 zeros = torch.zeros_like(BSB)
                 kg = torch.stack([BSB] + (self.n_dim - 1) * [zeros], dim=-1)
                 kg = kg.reshape(-1, N_nod, self.n_dim * N_nod).unsqueeze(-2)
@@ -203,67 +483,327 @@ class FEM(ABC):
 
         return k, f
 
+    def integrate_material_batched(
+        self,
+        u: Tensor,
+        F: Tensor,
+        stress: Tensor,
+        state: Tensor,
+        n: int,
+        du: Tensor,
+        de0: Tensor,
+        nlgeom: bool,
+        stiffness: bool | None = None,
+    ) -> Tuple[Tensor, Tensor]:
+        """Perform numerical integrations with all integration points at once.
+
+        Equivalent to `integrate_material`, but the displacement gradients, the
+        material response and the quadrature of element forces and stiffness
+        matrices are evaluated for all integration points in single batched
+        operations instead of a loop. The material is evaluated on a flat batch of
+        `n_int * n_elem` points (times the number of load cases).
+        """
+        if stiffness is None:
+            stiffness = self.needs_stiffness(nlgeom)
+
+        # Leading load case dimensions
+        batch = du.shape[:-1]
+
+        # Compute updated configuration
+        u_trial = u[n - 1] + du.view(*batch, -1, self.n_dim)
+
+        # Reshape displacement increment
+        dtype = self.compute_dtype
+        du = du.view(*batch, -1, self.n_dim)[..., self.elements, :].reshape(
+            *batch, self.n_elem, -1, self.n_stress
+        )
+        du = du.to(dtype)
+
+        # Gradient operators at all integration points, shaped to broadcast with
+        # the load case dimensions (n_int, *batch, n_elem, ...)
+        N_nod = self.etype.nodes
+        shape = (self.n_int,) + len(batch) * (1,) + (self.n_elem,)
+        _, B0, detJ0 = self.reference_geometry()
+        if nlgeom:
+            _, B, detJ = self.eval_geometry(u_trial)
+        else:
+            B = B0
+            detJ = detJ0
+        B0 = B0.view(*shape, *B0.shape[-2:]).to(dtype)
+        B = B.view(*shape, *B.shape[-2:]).to(dtype)
+        detJ = detJ.view(shape).to(dtype)
+        w = self.etype.iweights().to(detJ.dtype)
+
+        # Compute displacement gradient increment and update deformation gradient
+        H_inc = B0 @ du
+        F[n] = F[n - 1] + H_inc
+
+        # Evaluate material response for a flat batch of all integration points
+        material = self.material.to(dtype)
+        material = material.tile(self.n_int * prod(batch), self.n_elem)
+        sigma, alpha, ddsdde = material.step(
+            H_inc.flatten(0, -3),
+            F[n - 1].flatten(0, -3).to(dtype),
+            stress[n - 1].flatten(0, -3).to(dtype),
+            state[n - 1].flatten(0, -2).to(dtype),
+            de0.to(dtype).expand(*H_inc.shape).flatten(0, -3),
+        )
+        ddsdde = ddsdde.to(dtype)
+        stress[n] = sigma.reshape(stress[n].shape)
+        state[n] = alpha.reshape(state[n].shape)
+
+        # Compute element internal forces
+        sigma = stress[n].to(dtype, copy=True)
+        force = self.compute_f(detJ, B, sigma)
+        force = force.reshape(self.n_int, *batch, self.n_elem, self.n_dim * N_nod)
+        f = torch.einsum("i,i...->...", w, force)
+
+        # Compute element stiffness matrix
+        n_dofs = self.n_dim * N_nod
+        k = torch.zeros((self.n_elem, n_dofs, n_dofs), dtype=dtype)
+        if stiffness:
+            # Material stiffness
+            if ddsdde.shape[0] == 1:
+                # Homogeneous tangent broadcasts over all integration points
+                ddsdde = ddsdde.unsqueeze(0)
+            else:
+                ddsdde = ddsdde.reshape(self.n_int, self.n_elem, *ddsdde.shape[-4:])
+            BCB = self.compute_BCB(ddsdde, B)
+            k = torch.einsum("i,i...->...", w, self.compute_k(detJ, BCB))
+        if nlgeom:
+            # Geometric stiffness
+            BSB = torch.einsum("...iq,...qk,...il->...lk", sigma, B, B)
+            zeros = torch.zeros_like(BSB)
+            kg = torch.stack([BSB] + (self.n_dim - 1) * [zeros], dim=-1)
+            kg = kg.reshape(self.n_int, self.n_elem, N_nod, n_dofs).unsqueeze(-2)
+            zeros = torch.zeros_like(kg)
+            kg = torch.stack([kg] + (self.n_dim - 1) * [zeros], dim=-2)
+            kg = kg.reshape(self.n_int, self.n_elem, n_dofs, n_dofs)
+            k = k + torch.einsum("i,i...->...", w, self.compute_k(detJ, kg))
+
+        return k, f
+
+    def integrate_step(
+        self,
+        u: Tensor,
+        F: Tensor,
+        stress: Tensor,
+        state: Tensor,
+        n: int,
+        du: Tensor,
+        de0: Tensor,
+        nlgeom: bool,
+        stiffness: bool,
+        batch_ipoints: bool = False,
+    ) -> Tuple[Tensor, Tensor]:
+        """Element integration, material update and internal force assembly.
+
+        This is the region of a Newton-Raphson iteration that is compiled with
+        `solve(..., compile=True)`. It does not branch on tensor data and does not
+        access the global stiffness matrix.
+
+        Returns:
+            Tuple[Tensor, Tensor]: Element stiffness matrices and global internal
+            force vector.
+        """
+        integrate = self.integrate_material
+        if batch_ipoints:
+            integrate = self.integrate_material_batched
+        k, f = integrate(u, F, stress, state, n, du, de0, nlgeom, stiffness)
+        return k, self.assemble_force(f)
+
+    def integrate_chunked(
+        self,
+        u: Tensor,
+        F: Tensor,
+        stress: Tensor,
+        state: Tensor,
+        n: int,
+        du: Tensor,
+        de0: Tensor,
+        nlgeom: bool,
+        con: Tensor,
+        condense: bool,
+        chunk_size: int,
+        batch_ipoints: bool = False,
+    ) -> Tuple[Tensor | None, Tensor]:
+        """Integrate and assemble blocks of at most `chunk_size` elements.
+
+        Element stiffness matrices are scattered into the global matrix block by
+        block, so they never exist for all elements at once. The element order and
+        hence the order of summation is the same as in `assemble_stiffness`.
+
+        Returns:
+            Tuple[Tensor | None, Tensor]: Global stiffness matrix (None if it does
+            not need to be updated) and element internal forces.
+        """
+        # Integration with or without a loop over integration points
+        integrate = type(self).integrate_material
+        if batch_ipoints:
+            integrate = type(self).integrate_material_batched
+
+        assemble = self.needs_stiffness(nlgeom)
+        indices, scatter, diag = self.assembly_plan(con, condense)
+
+        # Evaluate the reference geometry once to share it with all blocks
+        self.reference_geometry()
+        n_entries = self.idx.shape[1] ** 2
+
+        values = None
+        f = []
+        for start in range(0, self.n_elem, chunk_size):
+            elements = slice(start, start + chunk_size)
+            k, f_chunk = integrate(
+                self.select(elements),
+                u,
+                F[..., elements, :, :],
+                stress[..., elements, :, :],
+                state[..., elements, :],
+                n,
+                du,
+                de0[elements],
+                nlgeom,
+                assemble,
+            )
+            f.append(f_chunk)
+
+            # Scatter element entries of this block into nonzero slots
+            if assemble:
+                if values is None:
+                    dtype = self.accumulate_dtype
+                    values = torch.zeros(indices.shape[1] + 1, dtype=dtype)
+                    values[diag] = 1.0
+                entries = slice(start * n_entries, start * n_entries + k.numel())
+                k = k.ravel().to(values.dtype)
+                values = values.index_add(0, scatter[entries], k)
+
+        if not assemble:
+            return None, torch.cat(f, dim=-2)
+
+        n_dofs = self.n_dofs - len(con) if condense else self.n_dofs
+        size = (n_dofs, n_dofs)
+        K = torch.sparse_coo_tensor(indices, values[:-1], size=size, is_coalesced=True)
+        return K, torch.cat(f, dim=-2)
+
     def integrate_field(self, field: Tensor | None = None) -> Tensor:
         """Integrate scalar field over elements."""
 
         # Default field is ones to integrate volume
         if field is None:
-            field = torch.ones(self.n_nod)
-
-        # Integrate
-        res = torch.zeros(len(self.elements))
-        for w, xi in zip(self.etype.iweights(), self.etype.ipoints()):
-            N, B, detJ = self.eval_shape_functions(xi)
-            f = field[self.elements, None].squeeze() @ N
-            res += w * f * detJ
-        return res
-
-    def assemble_stiffness(self, k: Tensor, con: Tensor) -> Tensor:
-        """Assemble global stiffness matrix."""
-
-        # Initialize sparse matrix
-        size = (self.n_dofs, self.n_dofs)
-        K = torch.empty(size, layout=torch.sparse_coo)
-
-        # Build matrix in chunks to prevent excessive memory usage
-        chunks = 4
-        for idx, k_chunk in zip(torch.chunk(self.idx, chunks), torch.chunk(k, chunks)):
-            # Ravel indices and values
-            chunk_size = idx.shape[0]
-            col = idx.unsqueeze(1).expand(chunk_size, self.idx.shape[1], -1).ravel()
-            row = idx.unsqueeze(-1).expand(chunk_size, -1, self.idx.shape[1]).ravel()
-            indices = torch.stack([row, col], dim=0)
-            values = k_chunk.ravel()
-
-            # Eliminate and replace constrained dofs
-            ci = torch.isin(idx, con)
-            mask_col = ci.unsqueeze(1).expand(chunk_size, self.idx.shape[1], -1).ravel()
-            mask_row = (
-                ci.unsqueeze(-1).expand(chunk_size, -1, self.idx.shape[1]).ravel()
-            )
-            mask = ~(mask_col | mask_row)
-            diag_index = torch.stack((con, con), dim=0)
-            diag_value = torch.ones_like(con, dtype=k.dtype)
+            field = torch.ones(self.n_nod, dtype=self.dtype)
+
+        # Integrate over all integration points at once
+        N, _, detJ = self.reference_geometry()
+        w = self.etype.iweights().to(detJ.dtype)
+        f = field[self.elements, None].squeeze() @ N.T
+        return torch.einsum("i,ei,ie->e", w, f, detJ)
+
+    def assembly_plan(
+        self, con: Tensor, condense: bool = False
+    ) -> Tuple[Tensor, Tensor, Tensor]:
+        """Sparsity pattern and scatter map for the global stiffness matrix.
+
+        The plan only depends on the mesh connectivity and the constrained dofs. It
+        is computed once and reused until the set of constrained dofs changes.
 
-            # Concatenate
-            indices = torch.cat((indices[:, mask], diag_index), dim=1)
-            values = torch.cat((values[mask], diag_value), dim=0)
+        Args:
+            con (Tensor): Indices of constrained degrees of freedom.
+            condense (bool): Number the matrix by free dofs only, i.e. drop the
+                constrained rows and columns instead of replacing them by identity
+                rows.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: Coalesced indices of all nonzero entries,
+            the nonzero slot of each element stiffness entry (entries coupling to
+            constrained dofs point to a trailing dummy slot), and the nonzero slots
+            of the constrained diagonal entries (empty if condensed).
+        """
+        if (
+            self._assembly_plan is not None
+            and self._assembly_plan[1] == condense
+            and torch.equal(self._assembly_plan[0], con)
+        ):
+            return self._assembly_plan[2:]
+
+        # Ravel indices of all element stiffness entries
+        n_loc = self.idx.shape[1]
+        idx = self.idx.long()
+        row = idx.unsqueeze(-1).expand(self.n_elem, -1, n_loc).ravel()
+        col = idx.unsqueeze(1).expand(self.n_elem, n_loc, -1).ravel()
+
+        # Eliminate entries of constrained dofs
+        is_con = torch.zeros(self.n_dofs, dtype=torch.bool)
+        is_con[con] = True
+        mask = ~(is_con[row] | is_con[col])
+        n_entries = int(mask.sum())
+
+        # Number the dofs of the matrix (free dofs only, if condensed)
+        if condense:
+            n = self.n_dofs - len(con)
+            dofs = torch.full((self.n_dofs,), -1, dtype=torch.int64)
+            dofs[~is_con] = torch.arange(n)
+            diag_keys = torch.empty(0, dtype=torch.int64)
+        else:
+            n = self.n_dofs
+            dofs = torch.arange(self.n_dofs)
+            diag_keys = con * n + con
+
+        # Sorted unique keys of nonzero entries (row-major, i.e. coalesced order)
+        keys = torch.cat([dofs[row[mask]] * n + dofs[col[mask]], diag_keys])
+        keys, slots = torch.unique(keys, sorted=True, return_inverse=True)
+        indices = torch.stack([keys // n, keys % n], dim=0)
+
+        # Map element entries to nonzero slots
+        nnz = keys.shape[0]
+        index_dtype = torch.int32 if nnz < 2**31 - 1 else torch.int64
+        scatter = torch.full_like(row, nnz)
+        scatter[mask] = slots[:n_entries]
+        scatter = scatter.to(index_dtype)
+        diag = slots[n_entries:]
+
+        # Row pointers and column indices (int32) for the linear solvers
+        csr_pattern(indices, n)
+
+        self._assembly_plan = (con.clone(), condense, indices, scatter, diag)
+        return indices, scatter, diag
+
+    def assemble_stiffness(
+        self, k: Tensor, con: Tensor, condense: bool = False
+    ) -> Tensor:
+        """Assemble global stiffness matrix.
+
+        Args:
+            k (Tensor): Element stiffness matrices.
+            con (Tensor): Indices of constrained degrees of freedom.
+            condense (bool): Assemble only the free dofs (reduced system) instead of
+                the full system with identity rows at constrained dofs.
+        """
+
+        # Get (cached) sparsity pattern and scatter map
+        indices, scatter, diag = self.assembly_plan(con, condense)
 
-            K += torch.sparse_coo_tensor(indices, values, size=size).coalesce()
+        # Scatter element entries into nonzero slots and replace constrained dofs
+        # (accumulated in the accumulation precision)
+        values = torch.zeros(indices.shape[1] + 1, dtype=self.accumulate_dtype)
+        values[diag] = 1.0
+        values = values.index_add(0, scatter, k.ravel().to(values.dtype))[:-1]
 
-        return K.coalesce()
+        n = self.n_dofs - len(con) if condense else self.n_dofs
+        size = (n, n)
+        return torch.sparse_coo_tensor(indices, values, size=size, is_coalesced=True)
 
     def assemble_force(self, f: Tensor) -> Tensor:
-        """Assemble global force vector."""
+        """Assemble global force vector (per load case, if any)."""
 
         # Initialize force vector
-        F = torch.zeros((self.n_dofs))
+        batch = f.shape[:-2]
+        F = torch.zeros((*batch, self.n_dofs), dtype=self.accumulate_dtype)
 
         # Ravel indices and values
         indices = self.idx.ravel()
-        values = f.ravel()
+        values = f.reshape(*batch, -1).to(F.dtype)
 
-        return F.index_add_(0, indices, values)
+        return F.index_add_(-1, indices, values)
 
     def solve(
         self,
@@ -279,13 +819,31 @@ class FEM(ABC):
         aggregate_integration_points: bool = True,
         use_cached_solve: bool = False,
         nlgeom: bool = False,
+        reuse_preconditioner: bool = False,
+        reuse_factorization: bool = False,
+        symmetric: bool | None = None,
+        condense: bool = False,
+        matrix_free: bool = False,
+        chunk_size: int | None = None,
+        batch_ipoints: bool = False,
+        compile: bool = False,
+        adaptive: AdaptiveStepping | None = None,
     ) -> Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]:
         """Solve the FEM problem with the Newton-Raphson method.
 
+        Forces and displacements may carry a leading load case dimension, i.e. have
+        the shape (n_cases, n_nod, n_dim). All load cases are then solved against
+        one assembled stiffness matrix with a single multi right-hand side solve per
+        iteration, which requires a constant stiffness matrix (no state variables
+        and nlgeom=False). Results get the same leading load case dimension.
+
         Args:
             increments (Tensor): Load increment stepping.
-            max_iter (int): Maximum number of iterations during Newton-Raphson.
-            rtol (float): Relative tolerance for Newton-Raphson convergence.
+            max_iter (int): Maximum number of iterations during Newton-Raphson (at
+                least 1).
+            rtol (float): Relative tolerance for Newton-Raphson convergence. Raised to
+                ten times the machine epsilon of the compute precision if it is
+                lower than the accumulation precision.
             atol (float): Absolute tolerance for Newton-Raphson convergence.
             stol (float): Solver tolerance for iterative methods.
             verbose (bool): Print iteration information.
@@ -295,6 +853,34 @@ class FEM(ABC):
             aggregate_integration_points (bool): Aggregate integration points if True.
             use_cached_solve (bool): Use cached solve, e.g. in topology optimization.
             nlgeom (bool): Use nonlinear geometry if True.
+            reuse_preconditioner (bool): Reuse the AMG preconditioner stored in
+                `self.amg_cache` across iterations, increments and calls if True.
+            reuse_factorization (bool): Reuse the ordering and factorization stored in
+                `self.factorization_cache` for direct solves if True.
+            symmetric (bool | None): Whether the stiffness matrix is symmetric. If
+                True, backpropagation reuses the forward operator and its caches.
+                None checks the symmetry in the backward pass.
+            condense (bool): Solve the reduced system of free dofs instead of the
+                full system with identity rows at constrained dofs if True.
+            matrix_free (bool): Solve with element-by-element matrix products instead
+                of an assembled stiffness matrix if True. `self.K` then holds the
+                element stiffness matrices. Requires method 'cg', 'minres' or None.
+            chunk_size (int | None): Integrate and assemble blocks of at most this many
+                elements to limit peak memory. None processes all elements at once.
+                Matrix-free solves keep all element stiffness matrices and instead
+                evaluate their products in blocks of this many elements (4096 if
+                None).
+            batch_ipoints (bool): Evaluate all integration points in one batch instead
+                of a loop over integration points if True. This launches fewer and
+                larger kernels, e.g. on GPUs, at the cost of more memory.
+            compile (bool): Compile the element integration, material update and
+                internal force assembly with `torch.compile` if True. Checks inside
+                this region are deferred to flags that are raised afterwards. Not
+                supported together with chunk_size.
+            adaptive (AdaptiveStepping, optional): Choose the load increments
+                adaptively between the first and last entry of `increments` instead
+                of the fixed schedule. Intermediate values are returned at the
+                accepted load factors in `adaptive.stats["loads"]`.
 
         Returns:
                 Tuple[Tensor, Tensor, Tensor, Tensor, Tensor]: Final displacements,
@@ -304,95 +890,294 @@ class FEM(ABC):
         # Number of increments
         N = len(increments)
 
-        # Null space rigid body modes for AMG preconditioner
-        B = self.compute_B()
-
         # Indexes of constrained and unconstrained degrees of freedom
         con = torch.nonzero(self.constraints.ravel(), as_tuple=False).ravel()
+        free = torch.nonzero(~self.constraints.ravel(), as_tuple=False).ravel()
+
+        if max_iter < 1:
+            raise ValueError("max_iter must be at least 1.")
+        if matrix_free and condense:
+            raise ValueError("Matrix-free solves do not support condense=True.")
+
+        if compile and chunk_size is not None:
+            raise ValueError("Compiled solves do not support chunk_size.")
+
+        # Element integration step (compiled once and reused across solves)
+        step = self.integrate_step
+        if compile:
+            if self._compiled_step is None:
+                self._compiled_step = torch.compile(self.integrate_step)
+            step = self._compiled_step
+            # Evaluate (and check) the reference geometry outside of the region
+            self.reference_geometry()
+        self._deferred_checks = compile
+        try:
+            self._invalid_jacobian = torch.tensor(False)
+
+            # Degrees of freedom in the linear system (only free ones if condensed)
+            dofs = free if condense else slice(None)
+
+            # Null space rigid body modes for AMG preconditioner
+            B = self.compute_B()[dofs]
+
+            # Load cases (empty batch shape for a single load case)
+            shape = torch.broadcast_shapes(self.forces.shape, self.displacements.shape)
+            batch = shape[:-2]
+            forces = self.forces.expand(shape).reshape(*batch, -1)
+            displacements = self.displacements.expand(shape).reshape(*batch, -1)
+
+            # Precision of the solution and of the linear solver (if lower)
+            dtype = self.accumulate_dtype
+            forces = forces.to(dtype)
+            displacements = displacements.to(dtype)
+            refine_dtype = self.precision.solve
+            if refine_dtype == dtype:
+                refine_dtype = None
+
+            # Residuals of lower precision element kernels stall at their round-off
+            eps = torch.finfo(self.compute_dtype).eps
+            if eps > torch.finfo(dtype).eps:
+                rtol = max(rtol, 10.0 * eps)
+
+            # Initialize variables to be computed
+            n_s = self.n_stress
+            n_state = self.material.n_state
+            u = torch.zeros(N, *batch, self.n_nod, self.n_dim, dtype=dtype)
+            f = torch.zeros(N, *batch, self.n_nod, self.n_dim, dtype=dtype)
+            stress = torch.zeros(
+                N, self.n_int, *batch, self.n_elem, n_s, n_s, dtype=dtype
+            )
+            defgrad = torch.zeros(
+                N, self.n_int, *batch, self.n_elem, n_s, n_s, dtype=dtype
+            )
+            defgrad[..., :, :] = torch.eye(self.n_stress, dtype=dtype)
+            state = torch.zeros(
+                N, self.n_int, *batch, self.n_elem, n_state, dtype=dtype
+            )
 
-        # Initialize variables to be computed
-        u = torch.zeros(N, self.n_nod, self.n_dim)
-        f = torch.zeros(N, self.n_nod, self.n_dim)
-        stress = torch.zeros(N, self.n_int, self.n_elem, self.n_stress, self.n_stress)
-        defgrad = torch.zeros(N, self.n_int, self.n_elem, self.n_stress, self.n_stress)
-        defgrad[:, :, :, :, :] = torch.eye(self.n_stress)
-        state = torch.zeros(N, self.n_int, self.n_elem, self.material.n_state)
-
-        # Initialize global stiffness matrix
-        self.K = torch.empty(0)
-
-        # Initialize displacement increment
-        du = torch.zeros_like(self.nodes).ravel()
-
-        # Incremental loading
-        for n in range(1, N):
-            # Increment size
-            inc = increments[n] - increments[n - 1]
-
-            # Load increment
-            F_ext = increments[n] * self.forces.ravel()
-            DU = inc * self.displacements.clone().ravel()
-            de0 = inc * self.ext_strain
-
-            # Newton-Raphson iterations
-            for i in range(max_iter):
-                du[con] = DU[con]
-
-                # Element-wise integration
-                k, f_i = self.integrate_material(
-                    u, defgrad, stress, state, n, du, de0, nlgeom
-                )
-
-                # Assemble global stiffness matrix and internal force vector (if needed)
-                if self.K.numel() == 0 or not self.material.n_state == 0 or nlgeom:
-                    self.K = self.assemble_stiffness(k, con)
-                F_int = self.assemble_force(f_i)
-
-                # Compute residual
-                residual = F_int - F_ext
-                residual[con] = 0.0
-                res_norm = torch.linalg.norm(residual)
-
-                # Save initial residual
-                if i == 0:
-                    res_norm0 = res_norm
-
-                # Print iteration information
-                if verbose:
-                    print(f"Increment {n} | Iteration {i+1} | Residual: {res_norm:.5e}")
-
-                # Check convergence
-                if res_norm < rtol * res_norm0 or res_norm < atol:
-                    break
-
-                # Use cached solve from previous iteration if available
-                if i == 0 and use_cached_solve:
-                    cached_solve = self.cached_solve
+            # Initialize global stiffness matrix
+            self.K = torch.empty(0)
+
+            # Load cases share one constant stiffness matrix
+            if batch:
+                if not self.material.n_state == 0 or nlgeom:
+                    raise ValueError(
+                        "Multiple load cases require a constant stiffness matrix, i.e. "
+                        "a material without state variables and nlgeom=False."
+                    )
+                k = self.k0()
+                if matrix_free:
+                    self.K = k.to(dtype)
+                else:
+                    self.K = self.assemble_stiffness(k, con, condense)
+
+            # Initialize displacement increment
+            du = torch.zeros(*batch, self.n_dofs, dtype=dtype)
+
+            # Adaptive load stepping between the first and last load factor
+            loads = [increments[0]]
+            attempt_iter = max_iter
+            if adaptive is not None:
+                loads = [float(increments[0])]
+                end = float(increments[-1])
+                step_size = adaptive.initial or float(increments[1] - increments[0])
+                max_step = adaptive.max_step or end - loads[0]
+                step_size = min(max(step_size, adaptive.min_step), max_step)
+                attempt_iter = adaptive.max_iter or max_iter
+                stats = {"cutbacks": 0, "iterations": 0, "solves": 0}
+
+            # Incremental loading
+            n = 1
+            while (n < N) if adaptive is None else (loads[-1] < end):
+                if adaptive is None:
+                    load = increments[n]
                 else:
-                    cached_solve = CachedSolve()
-
-                # Only update cache on first iteration
-                update_cache = i == 0
-
-                # Solve for displacement increment
-                du -= sparse_solve(
-                    self.K,
-                    residual,
-                    B,
-                    stol,
-                    device,
-                    method,
-                    None,
-                    cached_solve,
-                    update_cache,
-                )
-
-            if res_norm > rtol * res_norm0 and res_norm > atol:
-                raise Exception("Newton-Raphson iteration did not converge.")
-
-            # Update increment
-            f[n] = F_int.reshape((-1, self.n_dim))
-            u[n] = u[n - 1] + du.reshape((-1, self.n_dim))
+                    load = min(loads[-1] + step_size, end)
+                    # Grow the result buffers if needed
+                    if n == len(u):
+                        u, f, stress, defgrad, state = [
+                            torch.cat([x, x[-1:].expand_as(x)])
+                            for x in (u, f, stress, defgrad, state)
+                        ]
+
+                # Increment size
+                inc = load - loads[-1]
+
+                # Load increment
+                F_ext = load * forces
+                DU = inc * displacements.clone()
+                de0 = inc * self.ext_strain
+
+                # Newton-Raphson iterations
+                for i in range(attempt_iter):
+                    du[..., con] = DU[..., con]
+
+                    if chunk_size is not None and not matrix_free:
+                        # Element-wise integration and assembly in blocks of elements
+                        K, f_i = self.integrate_chunked(
+                            u,
+                            defgrad,
+                            stress,
+                            state,
+                            n,
+                            du,
+                            de0,
+                            nlgeom,
+                            con,
+                            condense,
+                            chunk_size,
+                            batch_ipoints,
+                        )
+                        if K is not None:
+                            self.K = K
+
+                        # Assemble internal force vector
+                        F_int = self.assemble_force(f_i)
+                    else:
+                        # Element-wise integration and internal force assembly
+                        stiffness = self.needs_stiffness(nlgeom)
+                        k, F_int = step(
+                            u,
+                            defgrad,
+                            stress,
+                            state,
+                            n,
+                            du,
+                            de0,
+                            nlgeom,
+                            stiffness,
+                            batch_ipoints,
+                        )
+
+                        # Raise deferred checks of the compiled region
+                        if compile and self._invalid_jacobian:
+                            raise Exception(
+                                "Negative Jacobian. Check element numbering."
+                            )
+
+                        # Assemble global stiffness matrix (if needed)
+                        if stiffness:
+                            if matrix_free:
+                                self.K = k.to(dtype)
+                            else:
+                                self.K = self.assemble_stiffness(k, con, condense)
+
+                    # Compute residual
+                    residual = F_int - F_ext
+                    residual[..., con] = 0.0
+                    res_norm = torch.linalg.norm(residual, dim=-1)
+
+                    # Save initial residual
+                    if i == 0:
+                        res_norm0 = res_norm
+
+                    # Print iteration information
+                    if verbose:
+                        res_max = res_norm.max()
+                        print(
+                            f"Increment {n} | Iteration {i+1} | Residual: {res_max:.5e}"
+                        )
+
+                    # Check convergence (of all load cases)
+                    converged = (res_norm < rtol * res_norm0) | (res_norm < atol)
+                    if converged.all() or not torch.isfinite(res_norm).all():
+                        break
+
+                    # Keep converged load cases fixed
+                    residual = torch.where(converged.unsqueeze(-1), 0.0, residual)
+
+                    # Use cached solve from previous iteration if available
+                    if i == 0 and use_cached_solve:
+                        cached_solve = self.cached_solve
+                    else:
+                        cached_solve = CachedSolve()
+
+                    # Reuse AMG hierarchy from previous iterations if requested
+                    if reuse_preconditioner:
+                        cached_solve.amg = self.amg_cache
+
+                    # Reuse ordering and factorization of direct solvers if requested
+                    if reuse_factorization:
+                        cached_solve.factorization = self.factorization_cache
+
+                    # Only update cache on first iteration
+                    update_cache = i == 0
+
+                    # Solve for displacement increment (load cases as columns)
+                    if adaptive is not None:
+                        stats["solves"] += 1
+                    if matrix_free:
+                        ddu = matrix_free_solve(
+                            self.K,
+                            self.idx,
+                            con,
+                            residual.movedim(0, -1),
+                            stol,
+                            method,
+                            cached_solve,
+                            update_cache,
+                            chunk_size,
+                        )
+                    else:
+                        ddu = sparse_solve(
+                            self.K,
+                            residual[..., dofs].movedim(0, -1),
+                            B,
+                            stol,
+                            device,
+                            method,
+                            None,
+                            cached_solve,
+                            update_cache,
+                            symmetric,
+                            refine_dtype,
+                        )
+                    du[..., dofs] -= ddu.movedim(-1, 0)
+
+                if adaptive is not None:
+                    stats["iterations"] += i + 1
+
+                if not converged.all():
+                    if adaptive is None or step_size <= adaptive.min_step:
+                        raise Exception("Newton-Raphson iteration did not converge.")
+
+                    # Cut back and retry from the last converged increment
+                    step_size = max(adaptive.cutback * step_size, adaptive.min_step)
+                    du = torch.zeros_like(du)
+                    stats["cutbacks"] += 1
+                    if verbose:
+                        print(f"Increment {n} | Cutback to step size {step_size:.5e}")
+                    continue
+
+                # Update increment
+                f[n] = F_int.reshape((*batch, -1, self.n_dim))
+                u[n] = u[n - 1] + du.reshape((*batch, -1, self.n_dim))
+                loads.append(load)
+                n += 1
+
+                # Grow the step after fast convergence
+                if adaptive is not None and i + 1 <= adaptive.fast_iter:
+                    step_size = min(adaptive.grow * step_size, max_step)
+
+            if adaptive is not None:
+                # Drop unused entries of the result buffers
+                u, f, stress, defgrad, state = [
+                    x[:n] for x in (u, f, stress, defgrad, state)
+                ]
+
+                # Compare with the fixed schedule
+                accepted = len(loads) - 1
+                fixed = len(increments) - 1
+                stats["loads"] = loads
+                stats["increments"] = accepted
+                stats["fixed_increments"] = fixed
+                stats["increments_saved"] = fixed - accepted
+                solves_per_increment = stats["solves"] / max(accepted, 1)
+                stats["solves_saved"] = fixed * solves_per_increment - stats["solves"]
+                adaptive.stats = stats
+        finally:
+            # Checks are immediate again outside of solves, also after errors
+            self._deferred_checks = False
 
         # Aggregate integration points as mean
         if aggregate_integration_points:
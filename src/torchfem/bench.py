@@ -0,0 +1,585 @@
+"""Stage-wise benchmarks of the solution pipeline.
+
+The benchmark solves the cube problem of `examples/benchmark` for combinations of
+mesh sizes, element orders, materials and solver methods and times each stage of
+the pipeline separately. Results are written as JSON and can be compared against a
+stored baseline to flag regressions, e.g.
+
+    python -m torchfem.bench -N 5 10 -order 1 2 -method spsolve cg -o base.json
+    python -m torchfem.bench -N 5 10 -order 1 2 -method spsolve cg -baseline base.json
+
+The element stiffness kernels (fourth-order contraction vs. Voigt notation) can be
+compared separately for all element types with
+
+    python -m torchfem.bench -kernels 10000
+
+and Newton-Raphson solves in eager and compile mode (`FEM.solve(..., compile=True)`)
+with
+
+    python -m torchfem.bench -N 10 -material plastic -compile
+
+The memory of material parameters that broadcast over all elements can be compared
+with per-element copies of the same parameters with
+
+    python -m torchfem.bench -memory 1000000
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable
+
+import pyamg
+import torch
+from scipy.sparse import csr_matrix
+from torch import Tensor
+
+from .elements import (
+    Bar1,
+    Bar2,
+    Hexa1,
+    Hexa2,
+    Quad1,
+    Quad2,
+    Tetra1,
+    Tetra2,
+    Tria1,
+    Tria2,
+)
+from .materials import (
+    IsotropicElasticity1D,
+    IsotropicElasticity3D,
+    IsotropicElasticityPlaneStress,
+    IsotropicPlasticity3D,
+    Material,
+    OrthotropicElasticity3D,
+)
+from .mesh import cube_hexa
+from .solid import Solid
+from .sparse import csr_buffers, sparse_solve
+from .utils import voigt_stiffness
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+KEYS = ["N", "order", "material", "method"]
+
+STAGES = [
+    "shape_functions",
+    "material_step",
+    "element_stiffness",
+    "assembly_plan",
+    "assembly",
+    "coalesce",
+    "conversion",
+    "preconditioner",
+    "solve",
+    "backward",
+    "fem_solve",
+    "fem_backward",
+]
+
+
+def get_material(name: str) -> Material:
+    """Material models available in the benchmark."""
+    if name == "elastic":
+        return IsotropicElasticity3D(E=1000.0, nu=0.3)
+    elif name == "plastic":
+        return IsotropicPlasticity3D(
+            E=1000.0,
+            nu=0.3,
+            sigma_f=lambda q: 1.0 + 100.0 * q,
+            sigma_f_prime=lambda q: 100.0 * torch.ones_like(q),
+        )
+    else:
+        raise ValueError(f"Material {name} is not supported.")
+
+
+def get_cube(N: int, order: int = 1, material: str = "elastic") -> Solid:
+    """Cube with N x N x N nodes under one-dimensional extension."""
+    if order > 2:
+        raise ValueError("Only linear and quadratic elements are supported.")
+    nodes, elements, sets = cube_hexa(N, N, N, quadratic=order == 2, boundaries=True)
+
+    cube = Solid(nodes, elements, get_material(material))
+    cube.forces = torch.zeros_like(nodes, requires_grad=True)
+    cube.constraints[sets["x0"], :] = True
+    cube.constraints[sets["x1"], 0] = True
+    cube.displacements[sets["x1"], 0] = 0.1
+    return cube
+
+
+def _synchronize():
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+
+
+def timed(fn: Callable, repeat: int = 1):
+    """Run fn repeatedly and return the last result and the best wall-clock time."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        _synchronize()
+        start = time.perf_counter()
+        result = fn()
+        _synchronize()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def peak_rss() -> float | None:
+    """Peak resident set size of the process in MB (None if not available)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is given in bytes on macOS and in kilobytes elsewhere
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+def tensor_bytes(*tensors: Tensor) -> int:
+    """Memory held by dense and sparse tensors in bytes."""
+    total = 0
+    for t in tensors:
+        if t.layout == torch.sparse_coo:
+            total += tensor_bytes(t._indices(), t._values())
+        elif t.layout == torch.sparse_csr:
+            total += tensor_bytes(t.crow_indices(), t.col_indices(), t.values())
+        else:
+            total += t.numel() * t.element_size()
+    return total
+
+
+def material_bytes(material: Material) -> int:
+    """Memory held by the tensor attributes of a material in bytes."""
+    tensors = [v for v in vars(material).values() if isinstance(v, Tensor)]
+    return tensor_bytes(*tensors)
+
+
+def run_case(
+    N: int,
+    order: int = 1,
+    material: str = "elastic",
+    method: str = "spsolve",
+    rtol: float = 1e-8,
+    repeat: int = 1,
+) -> dict:
+    """Time all stages of the pipeline for one configuration.
+
+    Args:
+        N (int): Number of nodes per direction.
+        order (int): Element order (1 or 2).
+        material (str): Material model ('elastic', 'plastic').
+        method (str): Linear solver ('spsolve', 'pardiso', 'cg', 'minres').
+        rtol (float): Relative tolerance of iterative linear solvers.
+        repeat (int): Number of repetitions per stage, the best time is reported.
+
+    Returns:
+        dict: Configuration, problem size, stage times in seconds and memory.
+    """
+    cube = get_cube(N, order, material)
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    times = {}
+
+    # Shape functions at all integration points
+    def shape_functions():
+        for xi in cube.etype.ipoints():
+            cube.eval_shape_functions(xi)
+
+    _, times["shape_functions"] = timed(shape_functions, repeat)
+
+    # Material step for small random strain increments at all integration points
+    shape = (cube.n_int, cube.n_elem, cube.n_stress, cube.n_stress)
+    H_inc = 1e-3 * torch.rand(shape)
+    F = torch.eye(cube.n_stress).expand(shape)
+    sigma = torch.zeros(shape)
+    state = torch.zeros(cube.n_int, cube.n_elem, cube.material.n_state)
+    de0 = torch.zeros(cube.n_elem, cube.n_stress, cube.n_stress)
+    _, times["material_step"] = timed(
+        lambda: cube.material.step(H_inc, F, sigma, state, de0), repeat
+    )
+
+    # Element stiffness matrices
+    k, times["element_stiffness"] = timed(cube.k0, repeat)
+
+    # Sparsity pattern and scatter map (computed once per mesh)
+    def assembly_plan():
+        cube._assembly_plan = None
+        return cube.assembly_plan(con)
+
+    _, times["assembly_plan"] = timed(assembly_plan, repeat)
+
+    # Global stiffness matrix
+    k.requires_grad_(True)
+    K, times["assembly"] = timed(lambda: cube.assemble_stiffness(k, con), repeat)
+
+    # Reference: COO matrix with duplicate entries summed up by coalescing
+    def coalesce():
+        rows = cube.idx.unsqueeze(-1).expand_as(k).ravel()
+        cols = cube.idx.unsqueeze(-2).expand_as(k).ravel()
+        indices = torch.stack([rows, cols]).long()
+        size = (cube.n_dofs, cube.n_dofs)
+        return torch.sparse_coo_tensor(indices, k.detach().ravel(), size).coalesce()
+
+    _, times["coalesce"] = timed(coalesce, repeat)
+
+    # CSR buffers for the solver backends
+    _, times["conversion"] = timed(lambda: csr_buffers(K), repeat)
+
+    # Preconditioner setup for iterative methods
+    B = cube.compute_B()
+    M = None
+    times["preconditioner"] = None
+    if method in ["cg", "minres"]:
+        crow, col, val = csr_buffers(K)
+        A = csr_matrix((val.numpy(), col.numpy(), crow.numpy()), shape=K.shape)
+        ml, times["preconditioner"] = timed(
+            lambda: pyamg.smoothed_aggregation_solver(A, B.numpy(), smooth="jacobi"),
+            repeat,
+        )
+        M = ml.aspreconditioner()
+
+    # Linear solve and its backward pass
+    b = torch.rand(cube.n_dofs, requires_grad=True)
+    x, times["solve"] = timed(
+        lambda: sparse_solve(K, b, B, rtol, None, method, M), repeat
+    )
+    _, times["backward"] = timed(lambda: x.sum().backward(retain_graph=True), repeat)
+
+    # Complete forward and backward pass of the FEM problem
+    u, times["fem_solve"] = timed(lambda: cube.solve(rtol=1e-5, method=method), 1)
+    _, times["fem_backward"] = timed(lambda: u[0].sum().backward(), 1)
+
+    return {
+        "N": N,
+        "order": order,
+        "material": material,
+        "method": method,
+        "dofs": cube.n_dofs,
+        "nnz": K._nnz(),
+        "stages": times,
+        "memory": {
+            "peak_rss_mb": peak_rss(),
+            "material_mb": material_bytes(cube.material) / 1024**2,
+            "element_stiffness_mb": tensor_bytes(k) / 1024**2,
+            "stiffness_mb": tensor_bytes(K) / 1024**2,
+            "cuda_peak_mb": (
+                torch.cuda.max_memory_allocated() / 1024**2
+                if torch.cuda.is_available()
+                else None
+            ),
+        },
+    }
+
+
+def kernel_benchmark(n_elem: int = 10000, repeat: int = 3) -> list[dict]:
+    """Time element stiffness kernels B^T C B for all element types.
+
+    The fourth-order contraction (einsum) is compared with the Voigt kernel using
+    batched matrix products. Bars are evaluated as three-dimensional trusses.
+
+    Args:
+        n_elem (int): Number of elements (one integration point each).
+        repeat (int): Number of repetitions, the best time is reported.
+
+    Returns:
+        list[dict]: Element type, number of dofs, kernel times in seconds and the
+            maximum relative deviation of the Voigt kernel.
+    """
+    materials = {
+        1: IsotropicElasticity1D(E=1000.0),
+        2: IsotropicElasticityPlaneStress(E=1000.0, nu=0.3),
+        3: IsotropicElasticity3D(E=1000.0, nu=0.3),
+    }
+    etypes = [Bar1, Bar2, Tria1, Tria2, Quad1, Quad2, Tetra1, Tetra2, Hexa1, Hexa2]
+    results = []
+    for etype in etypes:
+        element = etype()
+        dim = element.ipoints().shape[-1]
+        C = materials[dim].C.expand(n_elem, *materials[dim].C.shape).contiguous()
+        if dim == 1:
+            n_dofs = 3 * element.nodes
+            B = torch.rand(n_elem, 1, n_dofs)
+        else:
+            n_dofs = dim * element.nodes
+            B = torch.rand(n_elem, dim, element.nodes)
+
+        def einsum():
+            BCB = torch.einsum("...ijpq,...qk,...il->...ljkp", C, B, B)
+            return BCB.reshape(n_elem, n_dofs, n_dofs)
+
+        reference, t_einsum = timed(einsum, repeat)
+        voigt, t_voigt = timed(lambda: voigt_stiffness(C, B), repeat)
+        error = (voigt - reference).abs().max() / reference.abs().max()
+        results.append(
+            {
+                "element": etype.__name__,
+                "dofs": n_dofs,
+                "einsum": t_einsum,
+                "voigt": t_voigt,
+                "error": error.item(),
+            }
+        )
+    return results
+
+
+def print_kernel_table(results: list[dict]):
+    """Print kernel times in ms and speedups relative to the einsum kernel."""
+    header = ["element", "dofs", "einsum", "voigt", "error"]
+    print("| " + " | ".join(header) + " |")
+    print("|" + "|".join(["---"] * len(header)) + "|")
+    for r in results:
+        speedup = r["einsum"] / r["voigt"]
+        row = [r["element"], str(r["dofs"]), f"{1000 * r['einsum']:.2f}"]
+        row.append(f"{1000 * r['voigt']:.2f} ({speedup:.1f}x)")
+        row.append(f"{r['error']:.1e}")
+        print("| " + " | ".join(row) + " |")
+
+
+def memory_benchmark(n_elem: int = 100000, repeat: int = 3) -> list[dict]:
+    """Compare broadcast and per-element material parameters.
+
+    Vectorized materials keep homogeneous parameters with a leading dimension of
+    size 1. The reference repeats them for each element, which is the layout of
+    heterogeneous parameter fields. Both are timed for one material step of all
+    elements.
+
+    Args:
+        n_elem (int): Number of elements (one integration point each).
+        repeat (int): Number of repetitions, the best time is reported.
+
+    Returns:
+        list[dict]: Material, parameter memory in MB, step times in seconds and the
+            maximum deviation of the stresses.
+    """
+    materials = {
+        "elastic": get_material("elastic"),
+        "plastic": get_material("plastic"),
+        "orthotropic": OrthotropicElasticity3D(
+            1000.0, 500.0, 500.0, 0.3, 0.3, 0.3, 200.0, 200.0, 200.0
+        ),
+    }
+    H_inc = 1e-2 * (torch.rand(n_elem, 3, 3) - 0.5)
+    F = torch.eye(3).expand(n_elem, 3, 3)
+    zeros = torch.zeros(n_elem, 3, 3)
+    results = []
+    for name, material in materials.items():
+        state = torch.zeros(n_elem, material.n_state)
+        broadcast = material.vectorize(n_elem)
+        # Tiling the single broadcast entry materializes one copy per element
+        repeated = broadcast.tile(n_elem, 1)
+
+        def step(m: Material) -> Tensor:
+            return m.step(H_inc, F, zeros, state, zeros)[0]
+
+        sigma_b, t_broadcast = timed(lambda: step(broadcast), repeat)
+        sigma_r, t_repeated = timed(lambda: step(repeated), repeat)
+        results.append(
+            {
+                "material": name,
+                "elements": n_elem,
+                "broadcast_mb": material_bytes(broadcast) / 1024**2,
+                "repeated_mb": material_bytes(repeated) / 1024**2,
+                "broadcast_step": t_broadcast,
+                "repeated_step": t_repeated,
+                "error": (sigma_b - sigma_r).abs().max().item(),
+            }
+        )
+    return results
+
+
+def print_memory_table(results: list[dict]):
+    """Print parameter memory in MB and step times in ms."""
+    header = ["material", "elements", "broadcast", "repeated", "error"]
+    print("| " + " | ".join(header) + " |")
+    print("|" + "|".join(["---"] * len(header)) + "|")
+    for r in results:
+        row = [r["material"], str(r["elements"])]
+        for layout in ["broadcast", "repeated"]:
+            row.append(
+                f"{r[f'{layout}_mb']:.3f} MB, {1000 * r[f'{layout}_step']:.2f} ms"
+            )
+        row.append(f"{r['error']:.1e}")
+        print("| " + " | ".join(row) + " |")
+
+
+def compile_benchmark(
+    N: int, order: int = 1, material: str = "plastic", repeat: int = 1
+) -> dict:
+    """Time Newton-Raphson solves in eager and compile mode.
+
+    The first compiled solve includes the compilation and is reported separately.
+
+    Args:
+        N (int): Number of nodes per direction.
+        order (int): Element order (1 or 2).
+        material (str): Material model ('elastic', 'plastic').
+        repeat (int): Number of repetitions, the best time is reported.
+
+    Returns:
+        dict: Configuration, solve times in seconds, speedup and maximum deviation
+            of the displacements.
+    """
+    cube = get_cube(N, order, material)
+    increments = torch.linspace(0.0, 1.0, 5)
+
+    def solve(compile: bool) -> Tensor:
+        with torch.no_grad():
+            return cube.solve(increments=increments, compile=compile)[0]
+
+    u_eager, t_eager = timed(lambda: solve(False), repeat)
+    _, t_warmup = timed(lambda: solve(True), 1)
+    u_compiled, t_compiled = timed(lambda: solve(True), repeat)
+    return {
+        "N": N,
+        "order": order,
+        "material": material,
+        "dofs": cube.n_dofs,
+        "eager": t_eager,
+        "compile_warmup": t_warmup,
+        "compiled": t_compiled,
+        "speedup": t_eager / t_compiled,
+        "error": (u_compiled - u_eager).abs().max().item(),
+    }
+
+
+def case_key(case: dict) -> tuple:
+    """Configuration of a benchmark case."""
+    return tuple(case[key] for key in KEYS)
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float = 0.2, min_time: float = 1e-3
+) -> list[dict]:
+    """Compare stage times against a baseline.
+
+    Args:
+        results (dict): Benchmark results.
+        baseline (dict): Stored benchmark results with the same layout.
+        tolerance (float): Allowed relative slowdown before a stage is flagged.
+        min_time (float): Stages faster than this in both runs are ignored as noise.
+
+    Returns:
+        list[dict]: Regressions with configuration, stage, old and new times.
+    """
+    reference = {case_key(case): case for case in baseline["cases"]}
+    regressions = []
+    for case in results["cases"]:
+        old_case = reference.get(case_key(case))
+        if old_case is None:
+            continue
+        for stage, new in case["stages"].items():
+            old = old_case["stages"].get(stage)
+            if old is None or new is None or max(old, new) < min_time:
+                continue
+            if new > (1.0 + tolerance) * old:
+                regressions.append(
+                    {
+                        "case": dict(zip(KEYS, case_key(case))),
+                        "stage": stage,
+                        "old": old,
+                        "new": new,
+                        "ratio": new / old,
+                    }
+                )
+    return regressions
+
+
+def print_table(results: dict):
+    """Print stage times in ms for all cases."""
+    header = KEYS + ["dofs"] + STAGES + ["RSS [MB]"]
+    print("| " + " | ".join(header) + " |")
+    print("|" + "|".join(["---"] * len(header)) + "|")
+    for case in results["cases"]:
+        row = [str(case[key]) for key in KEYS + ["dofs"]]
+        for stage in STAGES:
+            t = case["stages"].get(stage)
+            row.append("-" if t is None else f"{1000 * t:.1f}")
+        rss = case["memory"]["peak_rss_mb"]
+        row.append("-" if rss is None else f"{rss:.0f}")
+        print("| " + " | ".join(row) + " |")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Stage-wise torch-fem benchmark.")
+    parser.add_argument("-N", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("-order", type=int, nargs="+", default=[1])
+    parser.add_argument("-material", type=str, nargs="+", default=["elastic"])
+    parser.add_argument("-method", type=str, nargs="+", default=["spsolve"])
+    parser.add_argument("-repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", type=str, help="Write results as JSON.")
+    parser.add_argument("-baseline", type=str, help="Compare against JSON results.")
+    parser.add_argument("-tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "-kernels", type=int, metavar="N_ELEM", help="Benchmark stiffness kernels."
+    )
+    parser.add_argument(
+        "-compile", action="store_true", help="Benchmark compiled solves."
+    )
+    parser.add_argument(
+        "-memory", type=int, metavar="N_ELEM", help="Benchmark material memory."
+    )
+    args = parser.parse_args(argv)
+
+    if args.compile:
+        print("| N | order | material | dofs | eager | compiled | speedup | warmup |")
+        print("|---|---|---|---|---|---|---|---|")
+        for N in args.N:
+            for order in args.order:
+                for material in args.material:
+                    r = compile_benchmark(N, order, material, args.repeat)
+                    print(
+                        f"| {N} | {order} | {material} | {r['dofs']} "
+                        f"| {1000 * r['eager']:.1f} | {1000 * r['compiled']:.1f} "
+                        f"| {r['speedup']:.2f}x | {r['compile_warmup']:.1f}s |"
+                    )
+        return 0
+
+    if args.kernels:
+        print_kernel_table(kernel_benchmark(args.kernels, args.repeat))
+        return 0
+
+    if args.memory:
+        print_memory_table(memory_benchmark(args.memory, args.repeat))
+        return 0
+
+    results = {
+        "meta": {
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "cases": [],
+    }
+    for N in args.N:
+        for order in args.order:
+            for material in args.material:
+                for method in args.method:
+                    case = run_case(N, order, material, method, repeat=args.repeat)
+                    results["cases"].append(case)
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(
+                f"Regression in {r['stage']} for {r['case']}: "
+                f"{1000 * r['old']:.1f}ms -> {1000 * r['new']:.1f}ms "
+                f"({r['ratio']:.2f}x)"
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
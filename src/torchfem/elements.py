@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
 from math import sqrt
-from typing import Dict, Tuple
 
 import torch
 from torch import Tensor
@@ -693,98 +692,75 @@ class Hexa2(Element):
         return torch.tensor([1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0])
 
 
+# Local node pairs of the element edges, keyed by (nodes per element, dimension)
+LINEAR_EDGES = {
+    (3, 2): [[0, 1], [1, 2], [2, 0]],
+    (4, 2): [[0, 1], [1, 2], [2, 3], [3, 0]],
+    (4, 3): [[0, 1], [1, 2], [0, 2], [3, 0], [1, 3], [2, 3]],
+    (8, 3): [
+        [0, 1],
+        [1, 2],
+        [2, 3],
+        [3, 0],
+        [4, 5],
+        [5, 6],
+        [6, 7],
+        [7, 4],
+        [0, 4],
+        [1, 5],
+        [2, 6],
+        [3, 7],
+    ],
+}
+
+
 def linear_to_quadratic(nodes: Tensor, elements: Tensor) -> tuple[Tensor, Tensor]:
-    dvc = nodes.device
-    if "cuda" in dvc.type:
-        nodes = nodes.cpu()
-        elements = elements.cpu()
-    new_nodes = nodes.tolist()
-    midpoints: Dict[Tuple, int] = {}
-
-    def get_midpoint_index(n1: Tensor, n2: Tensor) -> int:
-        if (n1, n2) in midpoints:
-            return midpoints[(n1, n2)]
-        if (n2, n1) in midpoints:
-            return midpoints[(n2, n1)]
-
-        midpoint = (nodes[n1] + nodes[n2]) / 2
-        mid_index = len(new_nodes)
-        new_nodes.append(midpoint)
-        midpoints[(n1, n2)] = mid_index
-        return mid_index
-
-    new_elements = []
-    for element in elements:
-        if len(element) == 2:
-            n1, n2 = element.numpy()
-            m12 = get_midpoint_index(n1, n2)
-            new_elements.append([n1, n2, m12])
-        elif len(element) == 3 and nodes.shape[1] == 2:
-            n1, n2, n3 = element.numpy()
-            m12 = get_midpoint_index(n1, n2)
-            m23 = get_midpoint_index(n2, n3)
-            m31 = get_midpoint_index(n3, n1)
-            new_elements.append([n1, n2, n3, m12, m23, m31])
-        elif len(element) == 4 and nodes.shape[1] == 2:
-            n1, n2, n3, n4 = element.numpy()
-            m12 = get_midpoint_index(n1, n2)
-            m23 = get_midpoint_index(n2, n3)
-            m34 = get_midpoint_index(n3, n4)
-            m41 = get_midpoint_index(n4, n1)
-            new_elements.append([n1, n2, n3, n4, m12, m23, m34, m41])
-        elif len(element) == 4 and nodes.shape[1] == 3:
-            n1, n2, n3, n4 = element.numpy()
-            m12 = get_midpoint_index(n1, n2)
-            m23 = get_midpoint_index(n2, n3)
-            m13 = get_midpoint_index(n1, n3)
-            m41 = get_midpoint_index(n4, n1)
-            m24 = get_midpoint_index(n2, n4)
-            m34 = get_midpoint_index(n3, n4)
-            new_elements.append([n1, n2, n3, n4, m12, m23, m13, m41, m24, m34])
-        elif len(element) == 8 and nodes.shape[1] == 3:
-            n1, n2, n3, n4, n5, n6, n7, n8 = element.numpy()
-            m12 = get_midpoint_index(n1, n2)
-            m23 = get_midpoint_index(n2, n3)
-            m34 = get_midpoint_index(n3, n4)
-            m41 = get_midpoint_index(n4, n1)
-            m56 = get_midpoint_index(n5, n6)
-            m67 = get_midpoint_index(n6, n7)
-            m78 = get_midpoint_index(n7, n8)
-            m85 = get_midpoint_index(n8, n5)
-            m15 = get_midpoint_index(n1, n5)
-            m26 = get_midpoint_index(n2, n6)
-            m37 = get_midpoint_index(n3, n7)
-            m48 = get_midpoint_index(n4, n8)
-            new_elements.append(
-                [
-                    n1,
-                    n2,
-                    n3,
-                    n4,
-                    n5,
-                    n6,
-                    n7,
-                    n8,
-                    m12,
-                    m23,
-                    m34,
-                    m41,
-                    m56,
-                    m67,
-                    m78,
-                    m85,
-                    m15,
-                    m26,
-                    m37,
-                    m48,
-                ]
-            )
-        else:
-            print(
-                "The element type is not supported for conversion to quadratic."
-                "Maybe the element is already quadratic? Anyway, returning the "
-                "original elements."
-            )
-            new_elements.append(elements.numpy())
+    """Convert linear elements to quadratic elements.
+
+    Midpoint nodes are shared by all elements with a common edge and appended to
+    the nodes in the order of their first appearance in the elements. The
+    conversion runs on the device of the mesh.
+
+    Args:
+        nodes (Tensor): Node coordinates. Shape: `(n_nodes, n_dim)`.
+        elements (Tensor): Linear bar, tria, quad, tetra or hexa elements.
+            Shape: `(n_elem, n_nodes_per_elem)`.
+
+    Returns:
+        tuple[Tensor, Tensor]: Nodes with appended midpoints and quadratic elements.
+    """
+    if elements.shape[1] == 2:
+        edges = [[0, 1]]
+    else:
+        edges = LINEAR_EDGES.get((elements.shape[1], nodes.shape[1]))
+    if edges is None:
+        print(
+            "The element type is not supported for conversion to quadratic."
+            "Maybe the element is already quadratic? Anyway, returning the "
+            "original elements."
+        )
+        return nodes, elements
 
-    return torch.tensor(new_nodes, device=dvc), torch.tensor(new_elements, device=dvc)
+    dvc = nodes.device
+    elements = elements.to(device=dvc, dtype=torch.int64)
+    n_elem, n_edges = elements.shape[0], len(edges)
+
+    # Edge keys independent of the edge orientation
+    pairs = elements[:, torch.tensor(edges, device=dvc)].reshape(-1, 2)
+    low, high = pairs.min(dim=-1).values, pairs.max(dim=-1).values
+    keys = low * len(nodes) + high
+    unique, inverse = torch.unique(keys, return_inverse=True)
+
+    # Number the unique edges by their first appearance
+    position = torch.arange(len(keys), device=dvc)
+    first = torch.full((len(unique),), len(keys), device=dvc)
+    first = first.scatter_reduce(0, inverse, position, reduce="amin")
+    order = torch.argsort(first)
+    rank = torch.empty_like(order)
+    rank[order] = torch.arange(len(order), device=dvc)
+
+    # Scatter midpoint nodes into the elements
+    n1, n2 = pairs[first[order]].T
+    midpoints = (nodes[n1] + nodes[n2]) / 2
+    mid = len(nodes) + rank[inverse].reshape(n_elem, n_edges)
+    return torch.cat([nodes, midpoints]), torch.cat([elements, mid], dim=1)
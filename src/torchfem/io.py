@@ -2,7 +2,6 @@ from os import PathLike
 from typing import Dict
 
 import torch
-from meshio import Mesh
 from torch import Tensor
 
 from torchfem import Planar, Shell, Solid, Truss
@@ -19,6 +18,8 @@ def export_mesh(
     nodal_data: Dict[str, Tensor] = {},
     elem_data: Dict[str, Tensor] = {},
 ):
+    from meshio import Mesh
+
     if isinstance(mesh, Truss):
         etype = "line"
     else:
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from copy import copy
 from math import sqrt
 from typing import Callable
 
@@ -20,6 +21,10 @@ from .utils import (
 class Material(ABC):
     """Base class for material models."""
 
+    # Assemble element stiffness matrices with the Voigt kernel (requires a tangent
+    # with minor symmetries)
+    voigt_kernel: bool = False
+
     @abstractmethod
     def __init__(self):
         self.n_state: int
@@ -45,6 +50,74 @@ class Material(ABC):
     def rotate(self, R: Tensor) -> Material:
         return self
 
+    def select(self, elements: slice | Tensor, n_elem: int) -> Material:
+        """Returns a shallow copy of the vectorized material for a block of elements.
+
+        Tensor attributes with a leading dimension of `n_elem` (the vectorized
+        material parameters) are sliced, all other attributes are shared. This
+        includes homogeneous parameters with a leading dimension of size 1.
+
+        Args:
+            elements (slice | Tensor): Block (or indices) of elements to select.
+            n_elem (int): Number of elements the material is vectorized for.
+
+        Returns:
+            Material: Material instance for the selected elements.
+        """
+        material = copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, Tensor) and value.dim() > 0:
+                if value.shape[0] == n_elem:
+                    setattr(material, name, value[elements])
+        return material
+
+    def to(self, dtype: torch.dtype) -> Material:
+        """Returns a shallow copy of the material with parameters cast to `dtype`.
+
+        Floating point tensor attributes are cast, all other attributes are shared.
+        The material itself is returned if all parameters already have this dtype.
+
+        Args:
+            dtype (torch.dtype): Floating point type of the material parameters.
+
+        Returns:
+            Material: Material instance with parameters of type `dtype`.
+        """
+        tensors = {
+            name: value
+            for name, value in vars(self).items()
+            if isinstance(value, Tensor) and value.is_floating_point()
+        }
+        if all(value.dtype == dtype for value in tensors.values()):
+            return self
+        material = copy(self)
+        for name, value in tensors.items():
+            setattr(material, name, value.to(dtype))
+        return material
+
+    def tile(self, reps: int, n_elem: int) -> Material:
+        """Returns a shallow copy of the vectorized material tiled `reps` times.
+
+        This maps a flat batch of `reps * n_elem` points (e.g. all integration
+        points of all elements) to the material parameters of their elements.
+        Homogeneous parameters with a leading dimension of size 1 broadcast over
+        the batch and are shared.
+
+        Args:
+            reps (int): Number of repetitions of the element batch.
+            n_elem (int): Number of elements the material is vectorized for.
+
+        Returns:
+            Material: Material instance vectorized for `reps * n_elem` points.
+        """
+        material = copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, Tensor) and value.dim() > 0:
+                if value.shape[0] == n_elem:
+                    dims = (reps,) + (value.dim() - 1) * (1,)
+                    setattr(material, name, value.repeat(dims))
+        return material
+
 
 class IsotropicElasticity3D(Material):
     """Isotropic elastic material.
@@ -67,10 +140,14 @@ class IsotropicElasticity3D(Material):
             Shape: `(N, 3, 3, 3, 3)` if vectorized, otherwise `(3, 3, 3, 3)`.
     """
 
-    def __init__(self, E: Tensor | float, nu: Tensor | float):
+    voigt_kernel = True
+
+    def __init__(
+        self, E: Tensor | float, nu: Tensor | float, dtype: torch.dtype | None = None
+    ):
         # Convert float inputs to tensors
-        self.E = torch.as_tensor(E)
-        self.nu = torch.as_tensor(nu)
+        self.E = torch.as_tensor(E, dtype=dtype)
+        self.nu = torch.as_tensor(nu, dtype=dtype)
 
         # There are no internal variables
         self.n_state = 0
@@ -83,7 +160,7 @@ class IsotropicElasticity3D(Material):
         self.G = self.E / (2.0 * (1.0 + self.nu))
 
         # Identity tensors
-        I2 = torch.eye(3)
+        I2 = torch.eye(3, dtype=self.E.dtype)
         I4 = torch.einsum("ij,kl->ijkl", I2, I2)
         I4S = torch.einsum("ik,jl->ijkl", I2, I2) + torch.einsum("il,jk->ijkl", I2, I2)
 
@@ -95,9 +172,11 @@ class IsotropicElasticity3D(Material):
     def vectorize(self, n_elem: int) -> IsotropicElasticity3D:
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -109,8 +188,8 @@ class IsotropicElasticity3D(Material):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicElasticity3D(E, nu)
 
     def step(
@@ -179,12 +258,16 @@ class IsotropicHencky3D(IsotropicElasticity3D):
             Shape: `(N, 3, 3, 3, 3)` if vectorized, otherwise `(3, 3, 3, 3)`.
     """
 
+    voigt_kernel = False
+
     def vectorize(self, n_elem: int) -> IsotropicHencky3D:
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -196,8 +279,8 @@ class IsotropicHencky3D(IsotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicHencky3D(E, nu)
 
     def step(
@@ -251,23 +334,83 @@ class IsotropicHencky3D(IsotropicElasticity3D):
         return sigma_new, state_new, ddsdde
 
 
+def _derivatives(f: Callable) -> Callable:
+    """Batched gradient and Hessian of a scalar function (reverse over reverse).
+
+    Forward over reverse differentiation yields wrong Hessians of torch.det in some
+    versions of PyTorch.
+    """
+
+    def gradient(x):
+        g = jacrev(f)(x)
+        return g, g
+
+    return vmap(jacrev(gradient, has_aux=True))
+
+
+def _sym_outer(a: Tensor, b: Tensor) -> Tensor:
+    """Symmetrized tensor product 0.5 * (a_ik b_jl + a_il b_jk)."""
+    return 0.5 * (
+        a[..., :, None, :, None] * b[..., None, :, None, :]
+        + a[..., :, None, None, :] * b[..., None, :, :, None]
+    )
+
+
+def _push_forward(F: Tensor, C_SE: Tensor) -> Tensor:
+    """Push forward F_iI F_jJ F_kK F_lL C_IJKL of a tangent with minor symmetries.
+
+    The product is evaluated in Voigt notation as P C P^T with the 6x6 matrix
+    P_aA = F_iI F_jJ + F_iJ F_jI (second term only for I != J).
+    """
+    i = torch.tensor([0, 1, 2, 1, 0, 0], device=F.device)
+    j = torch.tensor([0, 1, 2, 2, 2, 1], device=F.device)
+    shear = (i != j).to(F.dtype)
+    P = (
+        F[..., i[:, None], i[None, :]] * F[..., j[:, None], j[None, :]]
+        + shear * F[..., i[:, None], j[None, :]] * F[..., j[:, None], i[None, :]]
+    )
+    c = P @ stiffness2voigt(C_SE) @ P.transpose(-1, -2)
+    # Expand to a full fourth order tensor
+    v = torch.tensor([[0, 5, 4], [5, 1, 3], [4, 3, 2]], device=F.device)
+    return c[..., v[:, :, None, None], v[None, None, :, :]]
+
+
 class Hyperelastic3D(Material):
     """Hyperelastic material.
 
     This class implements a hyper-elastic material model suitable for large
     deformations, e.g., for rubber-like materials.
 
+    The strain energy density is either a function `psi(C)` of the right
+    Cauchy-Green tensor or, with `invariants=True`, a function `psi(I1, I2, J)` of
+    the invariants I1 = tr(C), I2 = 0.5 * (tr(C)^2 - tr(C^2)) and J = det(F). In
+    the first case, stress and tangent are computed with automatic differentiation
+    with respect to C. In the second case, only the derivatives with respect to the
+    three invariants are computed automatically, and stress and tangent are
+    assembled from closed-form expressions in the current configuration.
+
     Attributes:
         psi (Callable): Function that computes the strain energy density.
+        invariants (bool): `True` if `psi` is a function of (I1, I2, J).
         n_state (int): Number of internal state variables (here: 0).
         is_vectorized (bool): `True` if `psi` accepts batch dimensions.
 
     """
 
-    def __init__(self, psi: Callable):
+    # The spatial tangent has minor symmetries
+    voigt_kernel = True
+
+    def __init__(self, psi: Callable, invariants: bool = False):
 
         # Store the strain energy density function
         self.psi = psi
+        self.invariants = invariants
+
+        # Gradient and Hessian of psi in one transform (evaluated anew in each step)
+        if invariants:
+            self._derivatives = _derivatives(lambda x: psi(x[0], x[1], x[2]))
+        else:
+            self._derivatives = _derivatives(psi)
 
         # There are no internal variables
         self.n_state = 0
@@ -311,37 +454,52 @@ class Hyperelastic3D(Material):
         """
         # Compute deformation gradient
         F_new = F + H_inc
+        batch = F_new.shape[:-2]
         # Compute determinant of the deformation gradient
-        J_new = torch.det(F_new)[:, None, None]
-        # Compute right Cauchy-Green tensor
-        C = F_new.transpose(-1, -2) @ F_new
-        C = C.requires_grad_(True)
-        # Compute second Piola-Kirchhoff stress
-        S_new = 2 * vmap(jacrev(self.psi))(C)
-        # Compute Cauchy stress
-        sigma_new = 1 / J_new * F_new @ S_new @ F_new.transpose(-1, -2)
+        J_new = torch.det(F_new)
+        J = J_new[..., None, None]
+        I2 = torch.eye(3, dtype=F_new.dtype, device=F_new.device)
+        if self.invariants:
+            # Left Cauchy-Green tensor and invariants I1, I2 (same as for C)
+            b = F_new @ F_new.transpose(-1, -2)
+            inv1 = torch.einsum("...ii->...", b)
+            inv2 = 0.5 * (inv1**2 - (b * b).sum(dim=(-1, -2)))
+            x = torch.stack([inv1, inv2, J_new], dim=-1).reshape(-1, 3)
+            d2psi, dpsi = self._derivatives(x)
+            d2psi = d2psi.reshape(*batch, 3, 3)
+            dpsi = dpsi.reshape(*batch, 3)
+            # Push forward of the invariant derivatives F dI/dC F^T
+            g = [b, inv1[..., None, None] * b - b @ b, 0.5 * J * I2]
+            g = torch.stack(g, dim=-3)
+            # Compute Cauchy stress
+            sigma_new = 2.0 / J * torch.einsum("...a,...aij->...ij", dpsi, g)
+            # Push forward of the material tangent stiffness tensor, using the
+            # second derivatives of I2 and J with respect to C
+            d2I2 = torch.einsum("...ij,...kl->...ijkl", b, b) - _sym_outer(b, b)
+            d2J = 0.25 * torch.einsum("ij,kl->ijkl", I2, I2) - 0.5 * _sym_outer(I2, I2)
+            c = 4.0 * (
+                torch.einsum("...ab,...aij,...bkl->...ijkl", d2psi, g, g)
+                + dpsi[..., 1, None, None, None, None] * d2I2
+                + (dpsi[..., 2] * J_new)[..., None, None, None, None] * d2J
+            )
+        else:
+            # Compute right Cauchy-Green tensor
+            C = F_new.transpose(-1, -2) @ F_new
+            d2psi, dpsi = self._derivatives(C.reshape(-1, 3, 3))
+            # Compute second Piola-Kirchhoff stress
+            S_new = 2 * dpsi.reshape(*batch, 3, 3)
+            # Compute Cauchy stress
+            sigma_new = 1 / J * F_new @ S_new @ F_new.transpose(-1, -2)
+            # Algorithmic material tangent stiffness tensor (symmetrized, since C is)
+            C_SE = 4 * d2psi.reshape(*batch, 3, 3, 3, 3)
+            C_SE = 0.5 * (C_SE + C_SE.transpose(-3, -4))
+            C_SE = 0.5 * (C_SE + C_SE.transpose(-1, -2))
+            c = _push_forward(F_new, C_SE)
         # Update internal state (this material does not change state)
         state_new = state
-        # Algorithmic material tangent stiffness tensor
-        C_SE = 4 * vmap(jacrev(jacrev(self.psi)))(C)
         # Algorithmic spatial tangent stiffness tensor (push forward + geo. stiffness)
-        ddsdde = (
-            torch.einsum(
-                "...iI,...jJ,...kK,...lL,...IJKL->...ijkl",
-                F_new,
-                F_new,
-                F_new,
-                F_new,
-                C_SE,
-            )
-            + 0.5
-            * (
-                torch.einsum("...ik,...jl->...ijkl", sigma_new, torch.eye(3))
-                + torch.einsum("...il,...jk->...ijkl", sigma_new, torch.eye(3))
-                + torch.einsum("...jk,...il->...ijkl", sigma_new, torch.eye(3))
-                + torch.einsum("...jl,...ik->...ijkl", sigma_new, torch.eye(3))
-            )
-        ) / J_new[:, None, None]
+        geometric = _sym_outer(sigma_new, I2) + _sym_outer(I2, sigma_new)
+        ddsdde = (c + geometric) / J[..., None, None]
         return sigma_new, state_new, ddsdde
 
 
@@ -378,8 +536,9 @@ class IsotropicPlasticity3D(IsotropicElasticity3D):
         sigma_f_prime: Callable,
         tolerance: float = 1e-5,
         max_iter: int = 10,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(E, nu)
+        super().__init__(E, nu, dtype)
         self.sigma_f = sigma_f
         self.sigma_f_prime = sigma_f_prime
         self.n_state = 1
@@ -389,9 +548,11 @@ class IsotropicPlasticity3D(IsotropicElasticity3D):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -403,8 +564,8 @@ class IsotropicPlasticity3D(IsotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicPlasticity3D(
                 E, nu, self.sigma_f, self.sigma_f_prime, self.tolerance, self.max_iter
             )
@@ -445,18 +606,14 @@ class IsotropicPlasticity3D(IsotropicElasticity3D):
                 - **ddsdde (Tensor)**: Algorithmic tangent stiffness tensor.
                     Shape: `(..., 3, 3, 3, 3)`.
         """
-        # Second order identity tensor
-        I2 = torch.eye(H_inc.shape[-1])
         # Compute small strain tensor
         de = 0.5 * (H_inc.transpose(-1, -2) + H_inc)
 
         # Initialize solution variables
-        sigma_new = sigma.clone()
         state_new = state.clone()
         q = state_new[..., 0]
-        ddsdde = self.C.clone()
 
-        # Compute trial stress
+        # Compute trial stress (elastic predictor)
         s_trial = sigma + torch.einsum("...ijkl,...kl->...ij", self.C, de - de0)
 
         # Compute the deviatoric trial stress
@@ -471,50 +628,123 @@ class IsotropicPlasticity3D(IsotropicElasticity3D):
         f = dev_norm - sqrt(2.0 / 3.0) * self.sigma_f(q)
         fm = f > 0
 
+        if torch.compiler.is_compiling():
+            return self._masked_correction(s_trial, dev, dev_norm, state_new, fm)
+
+        # Elastic tangent shared by all points that do not yield
+        C = torch.broadcast_to(self.C, (*fm.shape, 3, 3, 3, 3))
+        G = torch.broadcast_to(self.G, fm.shape)
+
+        # Compact the yielding points into index buffers once per step
+        idx = torch.nonzero(fm, as_tuple=True)
+        if len(idx[0]) == 0:
+            return s_trial, state_new, C
+        dev = dev[idx]
+        dev_norm = dev_norm[idx]
+        q = q[idx]
+        G = G[idx]
+
         # Direction of flow
-        n = dev[fm] / dev_norm[fm][..., None, None]
+        n = dev / dev_norm[..., None, None]
 
-        # Local Newton solver to find plastic strain increment
-        dGamma = torch.zeros_like(f[fm])
-        G = self.G[fm]
+        # Local Newton solver to find plastic strain increment (iterated only on
+        # the points that did not converge yet)
+        dGamma = torch.zeros_like(dev_norm)
+        active = torch.arange(len(dev_norm), device=dev_norm.device)
         for _ in range(self.max_iter):
+            q_a = q[active]
             res = (
-                dev_norm[fm] - 2.0 * G * dGamma - sqrt(2.0 / 3.0) * self.sigma_f(q[fm])
+                dev_norm[active]
+                - 2.0 * G[active] * dGamma[active]
+                - sqrt(2.0 / 3.0) * self.sigma_f(q_a)
             )
-            ddGamma = res / (2.0 * G + 2.0 / 3.0 * self.sigma_f_prime(q[fm]))
-            dGamma += ddGamma
-            q[fm] += sqrt(2.0 / 3.0) * ddGamma
-
-            # Check convergence for early stopping
-            if (torch.abs(res) < self.tolerance).all():
+            ddGamma = res / (2.0 * G[active] + 2.0 / 3.0 * self.sigma_f_prime(q_a))
+            dGamma = dGamma.index_add(0, active, ddGamma)
+            q = q.index_add(0, active, sqrt(2.0 / 3.0) * ddGamma)
+            active = active[torch.abs(res) >= self.tolerance]
+            if len(active) == 0:
                 break
 
         # Check if the local Newton iteration converged
-        if (torch.abs(res) > self.tolerance).any():
+        if len(active) > 0:
             print("Local Newton iteration did not converge")
 
         # Update stress
-        sigma_new[~fm] = s_trial[~fm]
-        sigma_new[fm] = s_trial[fm] - (2.0 * G * dGamma)[:, None, None] * n
+        ds = (2.0 * G * dGamma)[..., None, None] * n
+        sigma_new = s_trial.index_put(idx, s_trial[idx] - ds)
+
+        # Update state
+        state_new[..., 0] = state_new[..., 0].index_put(idx, q)
+
+        # Correct the elastic tangent at the yielding points
+        ddsdde_p = self._plastic_tangent(C[idx], G, n, dGamma, dev_norm, q)
+        ddsdde = C.index_put(idx, ddsdde_p)
+
+        return sigma_new, state_new, ddsdde
+
+    def _masked_correction(
+        self,
+        s_trial: Tensor,
+        dev: Tensor,
+        dev_norm: Tensor,
+        state_new: Tensor,
+        fm: Tensor,
+    ) -> tuple[Tensor, Tensor, Tensor]:
+        """Plastic correction with masked updates of all points.
+
+        Shapes stay static (no compaction of the yielding points, fixed number of
+        iterations), so this variant is used while compiling.
+        """
+        q = state_new[..., 0]
+
+        # Direction of flow (the divisor is safe at elastic points)
+        dev_norm_fm = torch.where(fm, dev_norm, 1.0)
+        n = dev / dev_norm_fm[..., None, None]
+
+        # Local Newton solver to find plastic strain increment
+        dGamma = torch.zeros_like(dev_norm)
+        G = self.G
+        for _ in range(self.max_iter):
+            res = dev_norm - 2.0 * G * dGamma - sqrt(2.0 / 3.0) * self.sigma_f(q)
+            res = torch.where(fm, res, 0.0)
+            ddGamma = res / (2.0 * G + 2.0 / 3.0 * self.sigma_f_prime(q))
+            dGamma = dGamma + ddGamma
+            q = q + sqrt(2.0 / 3.0) * ddGamma
+
+        # Update stress (dGamma vanishes at elastic points)
+        sigma_new = s_trial - (2.0 * G * dGamma)[..., None, None] * n
 
         # Update state
         state_new[..., 0] = q
 
         # Update algorithmic tangent
-        A = 2.0 * G / (1.0 + self.sigma_f_prime(q[fm]) / (3.0 * G))
-        B = 4.0 * G**2 * dGamma / dev_norm[fm]
-        I2 = torch.eye(3)
+        ddsdde_p = self._plastic_tangent(self.C, G, n, dGamma, dev_norm_fm, q)
+        ddsdde = torch.where(fm[..., None, None, None, None], ddsdde_p, self.C)
+
+        return sigma_new, state_new, ddsdde
+
+    def _plastic_tangent(
+        self,
+        C: Tensor,
+        G: Tensor,
+        n: Tensor,
+        dGamma: Tensor,
+        dev_norm: Tensor,
+        q: Tensor,
+    ) -> Tensor:
+        """Consistent elastoplastic tangent at yielding points."""
+        A = 2.0 * G / (1.0 + self.sigma_f_prime(q) / (3.0 * G))
+        B = 4.0 * G**2 * dGamma / dev_norm
+        I2 = torch.eye(3, dtype=n.dtype, device=n.device)
         I4 = torch.einsum("ij,kl->ijkl", I2, I2)
         I4S = torch.einsum("ik,jl->ijkl", I2, I2) + torch.einsum("il,jk->ijkl", I2, I2)
         nn = torch.einsum("...ij,...kl->...ijkl", n, n)
-        ddsdde[fm] = (
-            self.C[fm]
+        return (
+            C
             - A[..., None, None, None, None] * nn
             - B[..., None, None, None, None] * (1 / 2 * I4S - 1 / 3 * I4 - nn)
         )
 
-        return sigma_new, state_new, ddsdde
-
 
 class IsotropicElasticityPlaneStress(IsotropicElasticity3D):
     """Isotropic elastic material for planar stress problems.
@@ -537,15 +767,14 @@ class IsotropicElasticityPlaneStress(IsotropicElasticity3D):
             Shape: `(N, 2, 2, 2, 2)` if vectorized, otherwise `(2, 2, 2, 2)`.
     """
 
-    def __init__(self, E: float | Tensor, nu: float | Tensor):
-        super().__init__(E, nu)
+    def __init__(
+        self, E: float | Tensor, nu: float | Tensor, dtype: torch.dtype | None = None
+    ):
+        super().__init__(E, nu, dtype)
 
         # Overwrite the 3D stiffness tensor with a 2D plane stress tensor
         fac = self.E / (1.0 - self.nu**2)
-        if self.E.dim() == 0:
-            self.C = torch.zeros(2, 2, 2, 2)
-        else:
-            self.C = torch.zeros(*self.E.shape, 2, 2, 2, 2)
+        self.C = torch.zeros(*self.E.shape, 2, 2, 2, 2, dtype=self.E.dtype)
         self.C[..., 0, 0, 0, 0] = fac
         self.C[..., 0, 0, 1, 1] = fac * self.nu
         self.C[..., 1, 1, 0, 0] = fac * self.nu
@@ -564,9 +793,11 @@ class IsotropicElasticityPlaneStress(IsotropicElasticity3D):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -579,8 +810,8 @@ class IsotropicElasticityPlaneStress(IsotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicElasticityPlaneStress(E, nu)
 
 
@@ -605,8 +836,10 @@ class IsotropicHenckyPlaneStrain(IsotropicHencky3D):
             Shape: `(N, 2, 2, 2, 2)` if vectorized, otherwise `(2, 2, 2, 2)`.
     """
 
-    def __init__(self, E: float | Tensor, nu: float | Tensor):
-        super().__init__(E, nu)
+    def __init__(
+        self, E: float | Tensor, nu: float | Tensor, dtype: torch.dtype | None = None
+    ):
+        super().__init__(E, nu, dtype)
 
         # Overwrite the 3D stiffness tensor with a 2D plane stress tensor
         if self.E.dim() == 0:
@@ -617,9 +850,11 @@ class IsotropicHenckyPlaneStrain(IsotropicHencky3D):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -632,8 +867,8 @@ class IsotropicHenckyPlaneStrain(IsotropicHencky3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicHenckyPlaneStrain(E, nu)
 
 
@@ -664,8 +899,9 @@ class IsotropicHenckyPlaneStress(IsotropicHencky3D):
         nu: float | Tensor,
         tolerance: float = 1e-5,
         max_iter: int = 10,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(E, nu)
+        super().__init__(E, nu, dtype)
         self.tolerance = tolerance
         self.max_iter = max_iter
 
@@ -675,9 +911,11 @@ class IsotropicHenckyPlaneStress(IsotropicHencky3D):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -690,8 +928,8 @@ class IsotropicHenckyPlaneStress(IsotropicHencky3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicHenckyPlaneStress(E, nu)
 
     def step(
@@ -734,7 +972,7 @@ class IsotropicHenckyPlaneStress(IsotropicHencky3D):
         # Local Newton solver to find out-of-plane stretch with plane stress condition
         for _ in range(self.max_iter):
             # Update deformation gradient
-            F_new = torch.zeros(F.shape[0], 3, 3)
+            F_new = torch.zeros(F.shape[0], 3, 3, dtype=F.dtype)
             F_new[..., 0:2, 0:2] = F + H_inc
             F_new[..., 2, 2] = lbd_z
             # Compute right Cauchy-Green tensor
@@ -797,8 +1035,9 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
         sigma_f_prime: Callable,
         tolerance: float = 1e-5,
         max_iter: int = 10,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(E, nu)
+        super().__init__(E, nu, dtype)
         self._C = stiffness2voigt(self.C)
         self._S = torch.linalg.inv(self._C)
         self.sigma_f = sigma_f
@@ -810,9 +1049,11 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -825,8 +1066,8 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicPlasticityPlaneStress(
                 E, nu, self.sigma_f, self.sigma_f_prime, self.tolerance, self.max_iter
             )
@@ -869,7 +1110,7 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
         """
 
         # Projection operator
-        P = 1 / 3 * torch.tensor([[2, -1, 0], [-1, 2, 0], [0, 0, 6]])
+        P = torch.tensor([[2, -1, 0], [-1, 2, 0], [0, 0, 6]], dtype=H_inc.dtype) / 3
 
         # Compute small strain tensor in Voigt notation
         depsilon = strain2voigt(0.5 * (H_inc.transpose(-1, -2) + H_inc) - de0)
@@ -877,12 +1118,10 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
         sigma = stress2voigt(sigma)
 
         # Solution variables
-        sigma_new = sigma.clone()
         state_new = state.clone()
         q = state_new[..., 0]
-        ddsdde = self._C.clone()
 
-        # Compute trial stress
+        # Compute trial stress (elastic predictor)
         s_trial = sigma + torch.einsum("...kl,...l->...k", self._C, depsilon)
 
         # Flow potential
@@ -895,68 +1134,86 @@ class IsotropicPlasticityPlaneStress(IsotropicElasticityPlaneStress):
         # Flow mask
         fm = psi > 0
 
-        # Local Newton solver to find plastic strain increment
-        dGamma = torch.zeros_like(psi[fm])
-        E = self.E[fm]
-        G = self.G[fm]
-        nu = self.nu[fm]
+        # Elastic tangent shared by all points that do not yield
+        C = torch.broadcast_to(self.C, (*fm.shape, 2, 2, 2, 2))
+
+        # Compact the yielding points into index buffers once per step
+        idx = torch.nonzero(fm, as_tuple=True)
+        if len(idx[0]) == 0:
+            return voigt2stress(s_trial), state_new, C
+        a1 = a1[idx]
+        a2 = a2[idx]
+        a3 = a3[idx]
+        q0 = q[idx]
+        E = torch.broadcast_to(self.E, fm.shape)[idx]
+        G = torch.broadcast_to(self.G, fm.shape)[idx]
+        nu = torch.broadcast_to(self.nu, fm.shape)[idx]
+        S = torch.broadcast_to(self._S, (*fm.shape, 3, 3))[idx]
+
+        # Local Newton solver to find plastic strain increment (iterated only on
+        # the points that did not converge yet)
+        dGamma = torch.zeros_like(a1)
+        qq = q0.clone()
+        active = torch.arange(len(a1), device=a1.device)
         for j in range(self.max_iter):
+            dG = dGamma[active]
+            E_a, G_a, nu_a = E[active], G[active], nu[active]
+            a1_a, a2_a, a3_a = a1[active], a2[active], a3[active]
+
             # Compute xi and some short hands
             xi = (
-                a1[fm] / (6 * (1 + E * dGamma / (3 * (1 - nu))) ** 2)
-                + (1 / 2 * a2[fm] + 2 * a3[fm]) / (1 + 2 * G * dGamma) ** 2
+                a1_a / (6 * (1 + E_a * dG / (3 * (1 - nu_a))) ** 2)
+                + (1 / 2 * a2_a + 2 * a3_a) / (1 + 2 * G_a * dG) ** 2
             )
             sxi = torch.sqrt(xi)
-            qq = q[fm] + dGamma * torch.sqrt(2 / 3 * xi)
+            qq_a = q0[active] + dG * torch.sqrt(2 / 3 * xi)
+            qq = qq.index_copy(0, active, qq_a)
 
             # Compute residual
-            res = 1 / 2 * xi - 1 / 3 * self.sigma_f(qq) ** 2
+            res = 1 / 2 * xi - 1 / 3 * self.sigma_f(qq_a) ** 2
 
             # Compute derivative of residual w.r.t dGamma
-            H = self.sigma_f_prime(qq)
+            H = self.sigma_f_prime(qq_a)
             xi_p = (
-                -a1[fm] / (9 * (1 + E * dGamma / (3 * (1 - nu))) ** 3) * E / (1 - nu)
-                - 2 * G * (a2[fm] + 4 * a3[fm]) / (1 + 2 * G * dGamma) ** 3
+                -a1_a / (9 * (1 + E_a * dG / (3 * (1 - nu_a))) ** 3) * E_a / (1 - nu_a)
+                - 2 * G_a * (a2_a + 4 * a3_a) / (1 + 2 * G_a * dG) ** 3
             )
             H_p = (
-                2
-                * self.sigma_f(qq)
-                * H
-                * sqrt(2 / 3)
-                * (sxi + dGamma * xi_p / (2 * sxi))
+                2 * self.sigma_f(qq_a) * H * sqrt(2 / 3) * (sxi + dG * xi_p / (2 * sxi))
             )
             res_prime = 1 / 2 * xi_p - 1 / 3 * H_p
 
             # Update dGamma
-            dGamma -= res / res_prime
-
-            if (torch.abs(res) < self.tolerance).all():
+            dGamma = dGamma.index_add(0, active, -res / res_prime)
+            active = active[torch.abs(res) >= self.tolerance]
+            if len(active) == 0:
                 break
-        if (torch.abs(res) > self.tolerance).any():
+        if len(active) > 0:
             print("Local Newton iteration did not converge.")
 
         # Compute inverse operator
-        inv = torch.linalg.inv(self._S[fm] + dGamma[None, :, None, None] * P)
+        inv = torch.linalg.inv(S + dGamma[:, None, None] * P)
 
         # Update stress
-        sigma_new[~fm] = s_trial[~fm]
-        sigma_new[fm] = (inv @ self._S[fm] @ s_trial[fm][:, :, None]).squeeze(-1)
+        s_p = (inv @ S @ s_trial[idx][:, :, None]).squeeze(-1)
+        sigma_new = s_trial.index_put(idx, s_p)
 
         # Update state
-        q[fm] = qq
-        state_new[..., 0] = q
+        state_new[..., 0] = q.index_put(idx, qq)
 
-        # Update algorithmic tangent
-        xi = sigma_new[fm][:, :, None].transpose(-1, -2) @ P @ sigma_new[fm][:, :, None]
-        H = self.sigma_f_prime(q[fm])
-        n = inv @ P @ sigma_new[fm][:, :, None]
+        # Correct the elastic tangent at the yielding points
+        xi = s_p[:, :, None].transpose(-1, -2) @ P @ s_p[:, :, None]
+        H = self.sigma_f_prime(qq)
+        n = inv @ P @ s_p[:, :, None]
+        H = H[:, None, None]
         alpha = 1.0 / (
-            sigma_new[fm][:, :, None].transpose(-1, -2) @ P @ n
+            s_p[:, :, None].transpose(-1, -2) @ P @ n
             + 2 * xi * H / (3 - 2 * H * dGamma[:, None, None])
         )
-        ddsdde[fm] = inv - alpha * n @ n.transpose(-1, -2)
+        ddsdde_p = voigt2stiffness(inv - alpha * n @ n.transpose(-1, -2))
+        ddsdde = C.index_put(idx, ddsdde_p)
 
-        return voigt2stress(sigma_new), state_new, voigt2stiffness(ddsdde)
+        return voigt2stress(sigma_new), state_new, ddsdde
 
 
 class IsotropicElasticityPlaneStrain(IsotropicElasticity3D):
@@ -980,16 +1237,15 @@ class IsotropicElasticityPlaneStrain(IsotropicElasticity3D):
             Shape: `(N, 2, 2, 2, 2)` if vectorized, otherwise `(2, 2, 2, 2)`.
     """
 
-    def __init__(self, E: Tensor | float, nu: Tensor | float):
-        super().__init__(E, nu)
+    def __init__(
+        self, E: Tensor | float, nu: Tensor | float, dtype: torch.dtype | None = None
+    ):
+        super().__init__(E, nu, dtype)
 
         # Overwrite the 3D stiffness tensor with a 2D plane strain tensor
         lbd = self.lbd
         G = self.G
-        if self.E.dim() == 0:
-            self.C = torch.zeros(2, 2, 2, 2)
-        else:
-            self.C = torch.zeros(*self.E.shape, 2, 2, 2, 2)
+        self.C = torch.zeros(*self.E.shape, 2, 2, 2, 2, dtype=self.E.dtype)
         self.C[..., 0, 0, 0, 0] = 2.0 * G + lbd
         self.C[..., 0, 0, 1, 1] = lbd
         self.C[..., 1, 1, 0, 0] = lbd
@@ -1008,9 +1264,11 @@ class IsotropicElasticityPlaneStrain(IsotropicElasticity3D):
     def vectorize(self, n_elem: int):
         """Returns a vectorized copy of the material for `n_elem` elements.
 
-        This function creates a batched version of the material properties. If the
-        material is already vectorized (`self.is_vectorized == True`), the function
-        simply returns `self` without modification.
+        This function creates a batched version of the material properties. Scalar
+        properties get a leading dimension of size 1, which broadcasts over all
+        elements instead of repeating the constants per element. If the material is
+        already vectorized (`self.is_vectorized == True`), the function simply
+        returns `self` without modification.
 
         Args:
             n_elem (int): Number of elements to vectorize the material for.
@@ -1023,8 +1281,8 @@ class IsotropicElasticityPlaneStrain(IsotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicElasticityPlaneStrain(E, nu)
 
 
@@ -1061,8 +1319,9 @@ class IsotropicPlasticityPlaneStrain(IsotropicElasticityPlaneStrain):
         sigma_f_prime: Callable,
         tolerance: float = 1e-5,
         max_iter: int = 10,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(E, nu)
+        super().__init__(E, nu, dtype)
         self.sigma_f = sigma_f
         self.sigma_f_prime = sigma_f_prime
         self.n_state = 2
@@ -1075,8 +1334,8 @@ class IsotropicPlasticityPlaneStrain(IsotropicElasticityPlaneStrain):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
-            nu = self.nu.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
+            nu = torch.atleast_1d(self.nu)
             return IsotropicPlasticityPlaneStrain(
                 E, nu, self.sigma_f, self.sigma_f_prime, self.tolerance, self.max_iter
             )
@@ -1117,15 +1376,13 @@ class IsotropicPlasticityPlaneStrain(IsotropicElasticityPlaneStrain):
         de = 0.5 * (H_inc.transpose(-1, -2) + H_inc)
 
         # Solution variables
-        sigma_new = sigma.clone()
         state_new = state.clone()
         q = state_new[..., 0]
         ez = state_new[..., 1]
-        ddsdde = self.C.clone()
 
-        # Compute trial stress
+        # Compute trial stress (elastic predictor)
         s_2D = sigma + torch.einsum("...ijkl,...kl->...ij", self.C, de - de0)
-        s_trial = torch.zeros(sigma.shape[0], 3, 3)
+        s_trial = torch.zeros(*s_2D.shape[:-2], 3, 3, dtype=sigma.dtype)
         s_trial[..., :2, :2] = s_2D
         s_trial[..., 2, 2] = self.nu * (s_2D[..., 0, 0] + s_2D[..., 1, 1]) - self.E * ez
 
@@ -1141,59 +1398,75 @@ class IsotropicPlasticityPlaneStrain(IsotropicElasticityPlaneStrain):
         f = dev_norm - sqrt(2.0 / 3.0) * self.sigma_f(q)
         fm = f > 0
 
+        # Elastic tangent shared by all points that do not yield
+        C = torch.broadcast_to(self.C, (*fm.shape, 2, 2, 2, 2))
+
+        # Compact the yielding points into index buffers once per step
+        idx = torch.nonzero(fm, as_tuple=True)
+        if len(idx[0]) == 0:
+            return s_2D, state_new, C
+        dev = dev[idx]
+        dev_norm = dev_norm[idx]
+        q = q[idx]
+        G = torch.broadcast_to(self.G, fm.shape)[idx]
+
         # Direction of flow
-        n = dev[fm] / dev_norm[fm][..., None, None]
+        n = dev / dev_norm[..., None, None]
 
-        # Local Newton solver to find plastic strain increment
-        dGamma = torch.zeros_like(f[fm])
-        G = self.G[fm]
+        # Local Newton solver to find plastic strain increment (iterated only on
+        # the points that did not converge yet)
+        dGamma = torch.zeros_like(dev_norm)
+        active = torch.arange(len(dev_norm), device=dev_norm.device)
         for _ in range(self.max_iter):
+            q_a = q[active]
             res = (
-                dev_norm[fm] - 2.0 * G * dGamma - sqrt(2.0 / 3.0) * self.sigma_f(q[fm])
+                dev_norm[active]
+                - 2.0 * G[active] * dGamma[active]
+                - sqrt(2.0 / 3.0) * self.sigma_f(q_a)
             )
-            ddGamma = res / (2.0 * G + 2.0 / 3.0 * self.sigma_f_prime(q[fm]))
-            dGamma += ddGamma
-            q[fm] += sqrt(2.0 / 3.0) * ddGamma
-
-            # Check convergence for early stopping
-            if (torch.abs(res) < self.tolerance).all():
+            ddGamma = res / (2.0 * G[active] + 2.0 / 3.0 * self.sigma_f_prime(q_a))
+            dGamma = dGamma.index_add(0, active, ddGamma)
+            q = q.index_add(0, active, sqrt(2.0 / 3.0) * ddGamma)
+            active = active[torch.abs(res) >= self.tolerance]
+            if len(active) == 0:
                 break
 
         # Check if the local Newton iteration converged
-        if (torch.abs(res) > self.tolerance).any():
+        if len(active) > 0:
             print("Local Newton iteration did not converge")
 
         # Update stress
-        sigma_new[~fm] = s_trial[~fm][..., :2, :2]
-        sigma_new[fm] = (s_trial[fm] - (2.0 * G * dGamma)[:, None, None] * n)[
-            ..., :2, :2
-        ]
+        ds = (2.0 * G * dGamma)[:, None, None] * n
+        sigma_new = s_2D.index_put(idx, (s_trial[idx] - ds)[..., :2, :2])
 
         # Update state
-        state_new[..., 0] = q
-        ez[fm] += dGamma * n[..., 2, 2]
-        state_new[..., 1] = ez
+        state_new[..., 0] = state_new[..., 0].index_put(idx, q)
+        state_new[..., 1] = ez.index_put(idx, ez[idx] + dGamma * n[..., 2, 2])
 
-        # Update algorithmic tangent
-        A = 2.0 * G / (1.0 + self.sigma_f_prime(q[fm]) / (3.0 * G))
-        B = 4.0 * G**2 * dGamma / dev_norm[fm]
+        # Correct the elastic tangent at the yielding points
+        A = 2.0 * G / (1.0 + self.sigma_f_prime(q) / (3.0 * G))
+        B = 4.0 * G**2 * dGamma / dev_norm
         n0n1 = n[:, 0, 0] * n[:, 1, 1]
-        ddsdde[fm, 0, 0, 0, 0] += -A * n[:, 0, 0] ** 2 - B * (2 / 3 - n[:, 0, 0] ** 2)
-        ddsdde[fm, 1, 1, 1, 1] += -A * n[:, 1, 1] ** 2 - B * (2 / 3 - n[:, 1, 1] ** 2)
-        ddsdde[fm, 0, 0, 1, 1] += -A * n0n1 - B * (-1 / 3 - n0n1)
-        ddsdde[fm, 1, 1, 0, 0] += -A * n0n1 - B * (-1 / 3 - n0n1)
-        ddsdde[fm, 0, 1, 0, 1] += -A * n[:, 0, 1] ** 2 - B * (1 / 2 - n[:, 0, 1] ** 2)
-        ddsdde[fm, 0, 1, 1, 0] += -A * n[:, 0, 1] ** 2 - B * (1 / 2 - n[:, 1, 0] ** 2)
-        ddsdde[fm, 1, 0, 0, 1] += -A * n[:, 1, 0] ** 2 - B * (1 / 2 - n[:, 0, 1] ** 2)
-        ddsdde[fm, 1, 0, 1, 0] += -A * n[:, 1, 0] ** 2 - B * (1 / 2 - n[:, 1, 0] ** 2)
+        ddsdde_p = C[idx].clone()
+        ddsdde_p[:, 0, 0, 0, 0] += -A * n[:, 0, 0] ** 2 - B * (2 / 3 - n[:, 0, 0] ** 2)
+        ddsdde_p[:, 1, 1, 1, 1] += -A * n[:, 1, 1] ** 2 - B * (2 / 3 - n[:, 1, 1] ** 2)
+        ddsdde_p[:, 0, 0, 1, 1] += -A * n0n1 - B * (-1 / 3 - n0n1)
+        ddsdde_p[:, 1, 1, 0, 0] += -A * n0n1 - B * (-1 / 3 - n0n1)
+        ddsdde_p[:, 0, 1, 0, 1] += -A * n[:, 0, 1] ** 2 - B * (1 / 2 - n[:, 0, 1] ** 2)
+        ddsdde_p[:, 0, 1, 1, 0] += -A * n[:, 0, 1] ** 2 - B * (1 / 2 - n[:, 1, 0] ** 2)
+        ddsdde_p[:, 1, 0, 0, 1] += -A * n[:, 1, 0] ** 2 - B * (1 / 2 - n[:, 0, 1] ** 2)
+        ddsdde_p[:, 1, 0, 1, 0] += -A * n[:, 1, 0] ** 2 - B * (1 / 2 - n[:, 1, 0] ** 2)
+        ddsdde = C.index_put(idx, ddsdde_p)
 
         return sigma_new, state_new, ddsdde
 
 
 class IsotropicElasticity1D(Material):
-    def __init__(self, E: float | Tensor):
+    voigt_kernel = True
+
+    def __init__(self, E: float | Tensor, dtype: torch.dtype | None = None):
         # Convert float inputs to tensors
-        self.E = torch.as_tensor(E)
+        self.E = torch.as_tensor(E, dtype=dtype)
 
         # Check if the material is vectorized
         self.is_vectorized = self.E.dim() > 0
@@ -1210,7 +1483,7 @@ class IsotropicElasticity1D(Material):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
             return IsotropicElasticity1D(E)
 
     def step(
@@ -1238,8 +1511,9 @@ class IsotropicPlasticity1D(IsotropicElasticity1D):
         sigma_f_prime: Callable,
         tolerance: float = 1e-5,
         max_iter: int = 10,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(E)
+        super().__init__(E, dtype)
         self.sigma_f = sigma_f
         self.sigma_f_prime = sigma_f_prime
         self.n_state = 1
@@ -1252,7 +1526,7 @@ class IsotropicPlasticity1D(IsotropicElasticity1D):
             print("Material is already vectorized.")
             return self
         else:
-            E = self.E.repeat(n_elem)
+            E = torch.atleast_1d(self.E)
             return IsotropicPlasticity1D(
                 E, self.sigma_f, self.sigma_f_prime, self.tolerance, self.max_iter
             )
@@ -1267,50 +1541,92 @@ class IsotropicPlasticity1D(IsotropicElasticity1D):
     ) -> tuple[Tensor, Tensor, Tensor]:
         """Perform a strain increment."""
         # Solution variables
-        sigma_new = sigma.clone()
         state_new = state.clone()
         q = state_new[..., 0]
-        ddsdde = self.C.clone()
 
         # Compute trial stress
         s_trial = sigma + torch.einsum("...ijkl,...kl->...ij", self.C, H_inc - de0)
-        s_norm = torch.abs(s_trial).squeeze()
+        s_norm = torch.abs(s_trial[..., 0, 0])
 
         # Flow potential
         f = s_norm - self.sigma_f(q)
         fm = f > 0
 
-        # Local Newton solver to find plastic strain increment
-        dGamma = torch.zeros_like(f[fm])
-        E = self.E[fm]
-        for _ in range(self.max_iter):
-            res = s_norm[fm] - E * dGamma - self.sigma_f(q[fm])
-            ddGamma = res / (E + self.sigma_f_prime(q[fm]))
-            dGamma += ddGamma
-            q[fm] += ddGamma
+        if torch.compiler.is_compiling():
+            return self._masked_correction(s_trial, s_norm, state_new, fm)
 
-            # Check convergence for early stopping
-            if (torch.abs(res) < self.tolerance).all():
+        # Elastic tangent shared by all points that do not yield
+        C = torch.broadcast_to(self.C, (*fm.shape, 1, 1, 1, 1))
+
+        # Compact the yielding points into index buffers once per step
+        idx = torch.nonzero(fm, as_tuple=True)
+        if len(idx[0]) == 0:
+            return s_trial, state_new, C
+        s_norm = s_norm[idx]
+        q = q[idx]
+        E = torch.broadcast_to(self.E, fm.shape)[idx]
+
+        # Local Newton solver to find plastic strain increment (iterated only on
+        # the points that did not converge yet)
+        dGamma = torch.zeros_like(s_norm)
+        active = torch.arange(len(s_norm), device=s_norm.device)
+        for _ in range(self.max_iter):
+            q_a = q[active]
+            res = s_norm[active] - E[active] * dGamma[active] - self.sigma_f(q_a)
+            ddGamma = res / (E[active] + self.sigma_f_prime(q_a))
+            dGamma = dGamma.index_add(0, active, ddGamma)
+            q = q.index_add(0, active, ddGamma)
+            active = active[torch.abs(res) >= self.tolerance]
+            if len(active) == 0:
                 break
 
         # Check if the local Newton iteration converged
-        if (torch.abs(res) > self.tolerance).any():
+        if len(active) > 0:
             print("Local Newton iteration did not converge.")
 
         # Update stress
-        sigma_new[~fm] = s_trial[~fm]
-        sigma_new[fm] = (1.0 - (dGamma * E) / s_norm[fm])[:, None, None] * s_trial[fm]
+        scale = (1.0 - (dGamma * E) / s_norm)[..., None, None]
+        sigma_new = s_trial.index_put(idx, scale * s_trial[idx])
+
+        # Update state
+        state_new[..., 0] = state_new[..., 0].index_put(idx, q)
+
+        # Correct the elastic tangent at the yielding points
+        E_t = E * self.sigma_f_prime(q) / (E + self.sigma_f_prime(q))
+        ddsdde = C.index_put(idx, E_t[..., None, None, None, None])
+
+        return sigma_new, state_new, ddsdde
+
+    def _masked_correction(
+        self, s_trial: Tensor, s_norm: Tensor, state_new: Tensor, fm: Tensor
+    ) -> tuple[Tensor, Tensor, Tensor]:
+        """Plastic correction with masked updates of all points.
+
+        Shapes stay static (no compaction of the yielding points, fixed number of
+        iterations), so this variant is used while compiling.
+        """
+        q = state_new[..., 0]
+
+        # Local Newton solver to find plastic strain increment
+        dGamma = torch.zeros_like(s_norm)
+        E = self.E
+        for _ in range(self.max_iter):
+            res = torch.where(fm, s_norm - E * dGamma - self.sigma_f(q), 0.0)
+            ddGamma = res / (E + self.sigma_f_prime(q))
+            dGamma = dGamma + ddGamma
+            q = q + ddGamma
+
+        # Update stress (dGamma vanishes at elastic points)
+        s_norm_fm = torch.where(fm, s_norm, 1.0)
+        sigma_new = (1.0 - (dGamma * E) / s_norm_fm)[..., None, None] * s_trial
 
         # Update state
         state_new[..., 0] = q
 
         # Update algorithmic tangent
-        if fm.sum() > 0:
-            ddsdde[fm] = (
-                E[:, None, None, None, None]
-                * self.sigma_f_prime(q[fm])
-                / (E[:, None, None, None, None] + self.sigma_f_prime(q[fm]))
-            )
+        E_t = E * self.sigma_f_prime(q) / (E + self.sigma_f_prime(q))
+        mask = fm[..., None, None, None, None]
+        ddsdde = torch.where(mask, E_t[..., None, None, None, None], self.C)
 
         return sigma_new, state_new, ddsdde
 
@@ -1318,6 +1634,8 @@ class IsotropicPlasticity1D(IsotropicElasticity1D):
 class OrthotropicElasticity3D(Material):
     """Orthotropic material."""
 
+    voigt_kernel = True
+
     def __init__(
         self,
         E_1: float | Tensor,
@@ -1329,20 +1647,21 @@ class OrthotropicElasticity3D(Material):
         G_12: float | Tensor,
         G_13: float | Tensor,
         G_23: float | Tensor,
+        dtype: torch.dtype | None = None,
     ):
         # Convert float inputs to tensors
-        self.E_1 = torch.as_tensor(E_1)
-        self.E_2 = torch.as_tensor(E_2)
-        self.E_3 = torch.as_tensor(E_3)
-        self.nu_12 = torch.as_tensor(nu_12)
+        self.E_1 = torch.as_tensor(E_1, dtype=dtype)
+        self.E_2 = torch.as_tensor(E_2, dtype=dtype)
+        self.E_3 = torch.as_tensor(E_3, dtype=dtype)
+        self.nu_12 = torch.as_tensor(nu_12, dtype=dtype)
         self.nu_21 = self.E_2 / self.E_1 * self.nu_12
-        self.nu_13 = torch.as_tensor(nu_13)
+        self.nu_13 = torch.as_tensor(nu_13, dtype=dtype)
         self.nu_31 = self.E_3 / self.E_1 * self.nu_13
-        self.nu_23 = torch.as_tensor(nu_23)
+        self.nu_23 = torch.as_tensor(nu_23, dtype=dtype)
         self.nu_32 = self.E_3 / self.E_2 * self.nu_23
-        self.G_12 = torch.as_tensor(G_12)
-        self.G_13 = torch.as_tensor(G_13)
-        self.G_23 = torch.as_tensor(G_23)
+        self.G_12 = torch.as_tensor(G_12, dtype=dtype)
+        self.G_13 = torch.as_tensor(G_13, dtype=dtype)
+        self.G_23 = torch.as_tensor(G_23, dtype=dtype)
 
         # Check if the material is vectorized
         self.is_vectorized = self.E_1.dim() > 0
@@ -1351,10 +1670,7 @@ class OrthotropicElasticity3D(Material):
         self.n_state = 0
 
         # Full stiffness tensor
-        if self.E_1.dim() == 0:
-            self.C = torch.zeros(3, 3, 3, 3)
-        else:
-            self.C = torch.zeros(*self.E_1.shape, 3, 3, 3, 3)
+        self.C = torch.zeros(*self.E_1.shape, 3, 3, 3, 3, dtype=self.E_1.dtype)
         F = 1 / (
             1
             - self.nu_12 * self.nu_21
@@ -1390,15 +1706,15 @@ class OrthotropicElasticity3D(Material):
             print("Material is already vectorized.")
             return self
         else:
-            E_1 = self.E_1.repeat(n_elem)
-            E_2 = self.E_2.repeat(n_elem)
-            E_3 = self.E_3.repeat(n_elem)
-            nu_12 = self.nu_12.repeat(n_elem)
-            nu_13 = self.nu_13.repeat(n_elem)
-            nu_23 = self.nu_23.repeat(n_elem)
-            G_12 = self.G_12.repeat(n_elem)
-            G_13 = self.G_13.repeat(n_elem)
-            G_23 = self.G_23.repeat(n_elem)
+            E_1 = torch.atleast_1d(self.E_1)
+            E_2 = torch.atleast_1d(self.E_2)
+            E_3 = torch.atleast_1d(self.E_3)
+            nu_12 = torch.atleast_1d(self.nu_12)
+            nu_13 = torch.atleast_1d(self.nu_13)
+            nu_23 = torch.atleast_1d(self.nu_23)
+            G_12 = torch.atleast_1d(self.G_12)
+            G_13 = torch.atleast_1d(self.G_13)
+            G_23 = torch.atleast_1d(self.G_23)
             return OrthotropicElasticity3D(
                 E_1, E_2, E_3, nu_12, nu_13, nu_23, G_12, G_13, G_23
             )
@@ -1456,6 +1772,7 @@ class TransverseIsotropicElasticity3D(OrthotropicElasticity3D):
         nu_L: float | Tensor,
         nu_T: float | Tensor,
         G_L: float | Tensor,
+        dtype: torch.dtype | None = None,
     ):
         # https://webpages.tuni.fi/rakmek/jmm/slides/jmm_lect_06.pdf
         if G_L > E_L / (2 * (1 + nu_L)):
@@ -1471,7 +1788,7 @@ class TransverseIsotropicElasticity3D(OrthotropicElasticity3D):
         G_13 = G_L
         G_23 = E_2 / (2 * (1 + nu_23))
 
-        super().__init__(E_1, E_2, E_3, nu_12, nu_13, nu_23, G_12, G_13, G_23)
+        super().__init__(E_1, E_2, E_3, nu_12, nu_13, nu_23, G_12, G_13, G_23, dtype)
 
 
 class OrthotropicElasticityPlaneStress(OrthotropicElasticity3D):
@@ -1485,15 +1802,16 @@ class OrthotropicElasticityPlaneStress(OrthotropicElasticity3D):
         G_12: float | Tensor,
         G_13: float | Tensor = 0.0,
         G_23: float | Tensor = 0.0,
+        dtype: torch.dtype | None = None,
     ):
         # Convert float inputs to tensors
-        self.E_1 = torch.as_tensor(E_1)
-        self.E_2 = torch.as_tensor(E_2)
-        self.nu_12 = torch.as_tensor(nu_12)
+        self.E_1 = torch.as_tensor(E_1, dtype=dtype)
+        self.E_2 = torch.as_tensor(E_2, dtype=dtype)
+        self.nu_12 = torch.as_tensor(nu_12, dtype=dtype)
         self.nu_21 = self.E_2 / self.E_1 * self.nu_12
-        self.G_12 = torch.as_tensor(G_12)
-        self.G_13 = torch.as_tensor(G_13)
-        self.G_23 = torch.as_tensor(G_23)
+        self.G_12 = torch.as_tensor(G_12, dtype=dtype)
+        self.G_13 = torch.as_tensor(G_13, dtype=dtype)
+        self.G_23 = torch.as_tensor(G_23, dtype=dtype)
 
         # Check if the material is vectorized
         self.is_vectorized = self.E_1.dim() > 0
@@ -1502,10 +1820,7 @@ class OrthotropicElasticityPlaneStress(OrthotropicElasticity3D):
         self.n_state = 0
 
         # Stiffness tensor
-        if self.E_1.dim() == 0:
-            self.C = torch.zeros(2, 2, 2, 2)
-        else:
-            self.C = torch.zeros(*self.E_1.shape, 2, 2, 2, 2)
+        self.C = torch.zeros(*self.E_1.shape, 2, 2, 2, 2, dtype=self.E_1.dtype)
         nu2 = self.nu_12 * self.nu_21
         self.C[..., 0, 0, 0, 0] = E_1 / (1 - nu2)
         self.C[..., 0, 0, 1, 1] = nu_12 * E_2 / (1 - nu2)
@@ -1529,12 +1844,12 @@ class OrthotropicElasticityPlaneStress(OrthotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E_1 = self.E_1.repeat(n_elem)
-            E_2 = self.E_2.repeat(n_elem)
-            nu_12 = self.nu_12.repeat(n_elem)
-            G_12 = self.G_12.repeat(n_elem)
-            G_13 = self.G_13.repeat(n_elem)
-            G_23 = self.G_23.repeat(n_elem)
+            E_1 = torch.atleast_1d(self.E_1)
+            E_2 = torch.atleast_1d(self.E_2)
+            nu_12 = torch.atleast_1d(self.nu_12)
+            G_12 = torch.atleast_1d(self.G_12)
+            G_13 = torch.atleast_1d(self.G_13)
+            G_23 = torch.atleast_1d(self.G_23)
             return OrthotropicElasticityPlaneStress(E_1, E_2, nu_12, G_12, G_13, G_23)
 
     def rotate(self, R):
@@ -1573,20 +1888,21 @@ class OrthotropicElasticityPlaneStrain(OrthotropicElasticity3D):
         G_12: float | Tensor,
         G_13: float | Tensor = 0.0,
         G_23: float | Tensor = 0.0,
+        dtype: torch.dtype | None = None,
     ):
         # Convert float inputs to tensors
-        self.E_1 = torch.as_tensor(E_1)
-        self.E_2 = torch.as_tensor(E_2)
-        self.E_3 = torch.as_tensor(E_3)
-        self.nu_12 = torch.as_tensor(nu_12)
+        self.E_1 = torch.as_tensor(E_1, dtype=dtype)
+        self.E_2 = torch.as_tensor(E_2, dtype=dtype)
+        self.E_3 = torch.as_tensor(E_3, dtype=dtype)
+        self.nu_12 = torch.as_tensor(nu_12, dtype=dtype)
         self.nu_21 = self.E_2 / self.E_1 * self.nu_12
-        self.nu_13 = torch.as_tensor(nu_13)
+        self.nu_13 = torch.as_tensor(nu_13, dtype=dtype)
         self.nu_31 = self.E_3 / self.E_1 * self.nu_13
-        self.nu_23 = torch.as_tensor(nu_23)
+        self.nu_23 = torch.as_tensor(nu_23, dtype=dtype)
         self.nu_32 = self.E_3 / self.E_2 * self.nu_23
-        self.G_12 = torch.as_tensor(G_12)
-        self.G_13 = torch.as_tensor(G_13)
-        self.G_23 = torch.as_tensor(G_23)
+        self.G_12 = torch.as_tensor(G_12, dtype=dtype)
+        self.G_13 = torch.as_tensor(G_13, dtype=dtype)
+        self.G_23 = torch.as_tensor(G_23, dtype=dtype)
 
         # Check if the material is vectorized
         self.is_vectorized = self.E_1.dim() > 0
@@ -1595,10 +1911,7 @@ class OrthotropicElasticityPlaneStrain(OrthotropicElasticity3D):
         self.n_state = 0
 
         # Full stiffness tensor
-        if self.E_1.dim() == 0:
-            self.C = torch.zeros(3, 3, 3, 3)
-        else:
-            self.C = torch.zeros(*self.E_1.shape, 3, 3, 3, 3)
+        self.C = torch.zeros(*self.E_1.shape, 3, 3, 3, 3, dtype=self.E_1.dtype)
         F = 1 / (
             1
             - self.nu_12 * self.nu_21
@@ -1628,15 +1941,15 @@ class OrthotropicElasticityPlaneStrain(OrthotropicElasticity3D):
             print("Material is already vectorized.")
             return self
         else:
-            E_1 = self.E_1.repeat(n_elem)
-            E_2 = self.E_2.repeat(n_elem)
-            E_3 = self.E_3.repeat(n_elem)
-            nu_12 = self.nu_12.repeat(n_elem)
-            nu_13 = self.nu_13.repeat(n_elem)
-            nu_23 = self.nu_23.repeat(n_elem)
-            G_12 = self.G_12.repeat(n_elem)
-            G_13 = self.G_13.repeat(n_elem)
-            G_23 = self.G_23.repeat(n_elem)
+            E_1 = torch.atleast_1d(self.E_1)
+            E_2 = torch.atleast_1d(self.E_2)
+            E_3 = torch.atleast_1d(self.E_3)
+            nu_12 = torch.atleast_1d(self.nu_12)
+            nu_13 = torch.atleast_1d(self.nu_13)
+            nu_23 = torch.atleast_1d(self.nu_23)
+            G_12 = torch.atleast_1d(self.G_12)
+            G_13 = torch.atleast_1d(self.G_13)
+            G_23 = torch.atleast_1d(self.G_23)
             return OrthotropicElasticityPlaneStrain(
                 E_1, E_2, E_3, nu_12, nu_13, nu_23, G_12, G_13, G_23
             )
@@ -1661,3 +1974,169 @@ class OrthotropicElasticityPlaneStrain(OrthotropicElasticity3D):
         self.nu_12 = -S[..., 0, 0] * S[..., 0, 1]
         self.G_12 = 1 / S[..., 2, 2]
         return self
+
+
+class MaterialAssignment(Material):
+    """Composite material that assigns material models to groups of elements.
+
+    Each element belongs to one group and each group has its own material model,
+    e.g. elastic, plastic or hyperelastic. In each step, the points of a group are
+    gathered into a contiguous batch, the material model of the group is evaluated
+    on this batch and stress, state and tangent are scattered back. The state has
+    as many variables as the material with the most state variables, materials
+    with fewer state variables use the leading ones.
+
+    Attributes:
+        materials (list[Material]): Material model of each group. All models must
+            return tangents of the same shape.
+        groups (Tensor): Group of each element. Shape: `(N,)`.
+        local (Tensor): Index of each element within its group. Shape: `(N,)`.
+        counts (list[int]): Number of elements in each group.
+        n_state (int): Maximum number of internal state variables of the groups.
+        is_vectorized (bool): `True` if the material of each group is vectorized.
+    """
+
+    def __init__(self, materials: list[Material], groups: Tensor):
+        groups = torch.as_tensor(groups, dtype=torch.int64)
+        if groups.dim() != 1:
+            raise ValueError("Groups must be a 1D tensor with one entry per element.")
+        if groups.numel() > 0 and (groups.min() < 0 or groups.max() >= len(materials)):
+            raise ValueError("Groups must index into the list of materials.")
+
+        self.materials = list(materials)
+        self.groups = groups
+
+        # Index of each element within its group
+        self.local = torch.zeros_like(groups)
+        self.counts = []
+        for g in range(len(materials)):
+            index = torch.nonzero(groups == g).ravel()
+            self.local[index] = torch.arange(len(index), device=groups.device)
+            self.counts.append(len(index))
+
+        # State variables are padded to the largest state of all groups
+        self.n_state = max((m.n_state for m in materials), default=0)
+
+        # Check if the material is vectorized
+        self.is_vectorized = all(m.is_vectorized for m in materials)
+
+        # The Voigt kernel requires minor symmetries of all tangents
+        self.voigt_kernel = all(m.voigt_kernel for m in materials)
+
+    def vectorize(self, n_elem: int) -> MaterialAssignment:
+        """Returns a copy with the material of each group vectorized for its elements.
+
+        Args:
+            n_elem (int): Number of elements to vectorize the material for.
+
+        Returns:
+            MaterialAssignment: A new material instance with vectorized groups.
+        """
+        if n_elem != len(self.groups):
+            raise ValueError(
+                f"Material is assigned to {len(self.groups)} elements, not {n_elem}."
+            )
+        materials = [
+            m if m.is_vectorized else m.vectorize(n)
+            for m, n in zip(self.materials, self.counts)
+        ]
+        return MaterialAssignment(materials, self.groups)
+
+    def to(self, dtype: torch.dtype) -> MaterialAssignment:
+        """Returns a shallow copy with the materials of all groups cast to `dtype`.
+
+        Args:
+            dtype (torch.dtype): Floating point type of the material parameters.
+
+        Returns:
+            MaterialAssignment: Material instance with parameters of type `dtype`.
+        """
+        materials = [m.to(dtype) for m in self.materials]
+        if all(a is b for a, b in zip(materials, self.materials)):
+            return self
+        material = copy(self)
+        material.materials = materials
+        return material
+
+    def rotate(self, R: Tensor) -> MaterialAssignment:
+        """Rotate the material of each group with rotation matrix R.
+
+        Args:
+            R (Tensor): Rotation matrices. Shape: `(N, d, d)` or `(d, d)`.
+        """
+        for g, material in enumerate(self.materials):
+            if R.dim() > 2:
+                index = torch.nonzero(self.groups == g).ravel()
+                self.materials[g] = material.rotate(R[index])
+            else:
+                self.materials[g] = material.rotate(R)
+        return self
+
+    def step(
+        self,
+        H_inc: Tensor,
+        F: Tensor,
+        sigma: Tensor,
+        state: Tensor,
+        de0: Tensor,
+    ) -> tuple[Tensor, Tensor, Tensor]:
+        """Performs an incremental step with the material model of each group.
+
+        The group assignment applies to the last batch dimension, i.e. the points
+        of a flat batch (see `Material.tile`) or the elements.
+
+        Args:
+            H_inc (Tensor): Incremental displacement gradient.
+                - Shape: `(..., N, d, d)`.
+            F (Tensor): Current deformation gradient.
+                - Shape: `(..., N, d, d)`.
+            sigma (Tensor): Current stress tensor.
+                - Shape: `(..., N, d, d)`.
+            state (Tensor): Internal state variables.
+                - Shape: `(..., N, n_state)`.
+            de0 (Tensor): External deformation gradient increment (e.g., thermal).
+                - Shape: `(..., N, d, d)`.
+
+        Returns:
+            tuple:
+                - **sigma_new (Tensor)**: Updated stress tensor.
+                Shape: `(..., N, d, d)`.
+                - **state_new (Tensor)**: Updated internal state.
+                Shape: `(..., N, n_state)`.
+                - **ddsdde (Tensor)**: Algorithmic tangent stiffness tensor.
+                Shape: `(..., N, d, d, d, d)`.
+        """
+        dim = H_inc.dim() - 3
+        de0 = torch.broadcast_to(de0, H_inc.shape)
+        sigma_new = torch.zeros_like(sigma)
+        state_new = state.clone()
+        ddsdde = None
+
+        for g, material in enumerate(self.materials):
+            # Gather the points of this group into a contiguous batch
+            index = torch.nonzero(self.groups == g).ravel()
+            if len(index) == 0:
+                continue
+            material = material.select(self.local[index], self.counts[g])
+            s, a, d = material.step(
+                H_inc.index_select(dim, index),
+                F.index_select(dim, index),
+                sigma.index_select(dim, index),
+                state.index_select(dim, index)[..., : material.n_state],
+                de0.index_select(dim, index),
+            )
+
+            # Scatter the results back (tangents may broadcast over batch dimensions)
+            d = torch.broadcast_to(d, s.shape[:-2] + d.shape[-4:])
+            if ddsdde is None:
+                shape = H_inc.shape[:-2] + d.shape[-4:]
+                ddsdde = torch.zeros(shape, dtype=d.dtype, device=d.device)
+            elif d.shape[-4:] != ddsdde.shape[-4:]:
+                raise ValueError("Tangents of all materials must have the same shape.")
+            sigma_new = sigma_new.index_copy(dim, index, s)
+            state_new[..., index, : material.n_state] = a
+            ddsdde = ddsdde.index_copy(dim, index, d)
+
+        if ddsdde is None:
+            ddsdde = sigma.new_zeros(H_inc.shape + H_inc.shape[-2:])
+        return sigma_new, state_new, ddsdde
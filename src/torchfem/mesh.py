@@ -1,46 +1,288 @@
+from itertools import combinations, permutations, product
+from math import prod
+
 import torch
+from torch import Tensor
+
+from .elements import LINEAR_EDGES, linear_to_quadratic
+
+
+def _spacing(
+    N: int,
+    L: float,
+    grading: float,
+    dtype: torch.dtype | None,
+    device: torch.device | str | None,
+) -> Tensor:
+    """Node positions on [0, L] with element sizes in a geometric progression.
+
+    Args:
+        N (int): Number of nodes.
+        L (float): Length of the interval.
+        grading (float): Ratio of the last to the first element size.
+        dtype (torch.dtype, optional): Floating point type of the positions.
+        device (torch.device, optional): Device of the positions.
+
+    Returns:
+        Tensor: Node positions. Shape: `(N,)`.
+    """
+    if N > 2 and grading != 1.0:
+        h = grading ** torch.linspace(0.0, 1.0, N - 1, dtype=dtype, device=device)
+        x = torch.cat([torch.zeros_like(h[:1]), torch.cumsum(h, dim=0)])
+        x = L * x / x[-1]
+    else:
+        x = torch.linspace(0, L, N, dtype=dtype, device=device)
+    # Exact end points of the box
+    x[0] = 0.0
+    x[-1] = L
+    return x
+
+
+def _grid(
+    shape: tuple[int, ...],
+    lengths: tuple[float, ...],
+    grading: tuple[float, ...],
+    dtype: torch.dtype | None,
+    device: torch.device | str | None,
+) -> tuple[Tensor, Tensor]:
+    """Nodes of a structured grid and their grid indices."""
+    axes = [
+        _spacing(N, L, g, dtype, device) for N, L, g in zip(shape, lengths, grading)
+    ]
+    nodes = torch.stack(torch.meshgrid(*axes, indexing="ij"), dim=-1)
+    indices = torch.arange(nodes[..., 0].numel(), device=device).reshape(shape)
+    return nodes.reshape(-1, len(shape)), indices
+
+
+def _cells(indices: Tensor, corners: list[tuple[int, ...]]) -> Tensor:
+    """Node indices at the given corners (0 or 1 per axis) of all grid cells."""
+    first = indices[tuple(slice(0, n - 1) for n in indices.shape)].reshape(-1, 1)
+    # Offsets of the corners from the first node of a cell
+    bits = torch.tensor(corners, device=indices.device)
+    return first + bits @ torch.tensor(indices.stride(), device=indices.device)
+
+
+def _finalize(
+    nodes: Tensor,
+    elements: Tensor,
+    indices: Tensor,
+    quadratic: bool,
+    boundaries: bool,
+) -> tuple[Tensor, Tensor] | tuple[Tensor, Tensor, dict[str, Tensor]]:
+    if quadratic:
+        nodes, elements = linear_to_quadratic(nodes, elements)
+    if boundaries:
+        return nodes, elements, box_boundaries(indices, elements if quadratic else None)
+    return nodes, elements
+
+
+def box_boundaries(
+    indices: Tensor, elements: Tensor | None = None
+) -> dict[str, Tensor]:
+    """Node sets on the faces, edges and corners of a structured grid on a box.
+
+    Sets are keyed by the axis and side of each bounding plane, e.g. "x0" for the
+    face x=0, "x0y1" for the edge x=0, y=L_y and "x1y1z0" for a corner of a 3D box.
+    The sets follow from the grid indices of the nodes without comparing
+    coordinates, and only elements in boundary cells are visited.
+
+    Args:
+        indices (Tensor): Node indices of the grid. Shape: `(N_x, N_y, ...)`.
+        elements (Tensor, optional): Quadratic elements from `linear_to_quadratic`
+            with the same number of elements per grid cell in the order of the
+            cells. Their edge midpoints are added to the sets. Defaults to None.
+
+    Returns:
+        dict[str, Tensor]: Indices of the nodes in each set in ascending order.
+    """
+    shape = indices.shape
+    n_dim = len(shape)
+    cells = torch.arange(prod(n - 1 for n in shape), device=indices.device)
+    cells = cells.reshape([n - 1 for n in shape])
+
+    # Corner nodes and edges of the quadratic elements
+    if elements is not None:
+        n_corners, edges = next(
+            (n, e)
+            for (n, d), e in LINEAR_EDGES.items()
+            if d == n_dim and n + len(e) == elements.shape[1]
+        )
+        edges = torch.tensor(edges, device=elements.device)
+        per_cell = torch.arange(len(elements) // cells.numel(), device=cells.device)
+
+    sets = {}
+    for n in range(1, n_dim + 1):
+        for axes in combinations(range(n_dim), n):
+            for sides in product((0, 1), repeat=n):
+                key = "".join(f"{'xyz'[a]}{s}" for a, s in zip(axes, sides))
+                # Grid nodes and cells at index 0 or -1 along the bounding axes
+                select = [slice(None)] * n_dim
+                for a, s in zip(axes, sides):
+                    select[a] = -s
+                sets[key] = indices[tuple(select)].ravel()
+                if elements is None:
+                    continue
+
+                # Midpoints of element edges with both end points on the set
+                boundary = cells[tuple(select)].reshape(-1, 1)
+                local = elements[(boundary * len(per_cell) + per_cell).ravel()]
+                ends = local[:, edges]
+                on_set = torch.ones(
+                    ends.shape[:2], dtype=torch.bool, device=ends.device
+                )
+                for a, s in zip(axes, sides):
+                    grid_index = ends // indices.stride(a) % shape[a]
+                    on_set &= (grid_index == s * (shape[a] - 1)).all(dim=-1)
+                midpoints = torch.unique(local[:, n_corners:][on_set])
+                sets[key] = torch.cat([sets[key], midpoints])
+    return sets
 
 
 def cube_hexa(
-    Nx: int, Ny: int, Nz: int, Lx: float = 1.0, Ly: float = 1.0, Lz: float = 1.0
-) -> tuple[torch.Tensor, torch.Tensor]:
-    # Create nodes
-    X = torch.linspace(0, Lx, Nx)
-    Y = torch.linspace(0, Ly, Ny)
-    Z = torch.linspace(0, Lz, Nz)
-    x, y, z = torch.meshgrid(X, Y, Z, indexing="ij")
-    nodes = torch.vstack([x.ravel(), y.ravel(), z.ravel()]).T
+    Nx: int,
+    Ny: int,
+    Nz: int,
+    Lx: float = 1.0,
+    Ly: float = 1.0,
+    Lz: float = 1.0,
+    quadratic: bool = False,
+    grading: tuple[float, float, float] = (1.0, 1.0, 1.0),
+    boundaries: bool = False,
+    dtype: torch.dtype | None = None,
+    device: torch.device | str | None = None,
+) -> tuple[Tensor, Tensor] | tuple[Tensor, Tensor, dict[str, Tensor]]:
+    """Structured mesh of hexahedra (Hexa1 or Hexa2) on a box.
+
+    Args:
+        Nx, Ny, Nz (int): Number of corner nodes per direction.
+        Lx, Ly, Lz (float): Edge lengths of the box. Defaults to 1.0.
+        quadratic (bool): Add edge midpoints for Hexa2 elements. Defaults to False.
+        grading (tuple[float, float, float]): Ratio of the last to the first element
+            size per direction. Defaults to a uniform grid.
+        boundaries (bool): Also return the node sets on faces, edges and corners
+            (see `box_boundaries`). Defaults to False.
+        dtype (torch.dtype, optional): Floating point type of the nodes.
+        device (torch.device, optional): Device of the mesh.
+
+    Returns:
+        tuple: Nodes, elements and (optionally) boundary node sets.
+    """
+    lengths = (Lx, Ly, Lz)
+    nodes, indices = _grid((Nx, Ny, Nz), lengths, grading, dtype, device)
 
     # Create elements
-    indices = torch.arange(Nx * Ny * Nz).reshape((Nx, Ny, Nz))
-    n0 = indices[:-1, :-1, :-1].ravel()
-    n1 = indices[1:, :-1, :-1].ravel()
-    n2 = indices[:-1, 1:, :-1].ravel()
-    n3 = indices[1:, 1:, :-1].ravel()
-    n4 = indices[:-1, :-1, 1:].ravel()
-    n5 = indices[1:, :-1, 1:].ravel()
-    n6 = indices[:-1, 1:, 1:].ravel()
-    n7 = indices[1:, 1:, 1:].ravel()
-    elements = torch.vstack([n0, n1, n3, n2, n4, n5, n7, n6]).T
+    corners = [
+        (0, 0, 0),
+        (1, 0, 0),
+        (1, 1, 0),
+        (0, 1, 0),
+        (0, 0, 1),
+        (1, 0, 1),
+        (1, 1, 1),
+        (0, 1, 1),
+    ]
+    elements = _cells(indices, corners)
 
-    return nodes, elements
+    return _finalize(nodes, elements, indices, quadratic, boundaries)
+
+
+def cube_tetra(
+    Nx: int,
+    Ny: int,
+    Nz: int,
+    Lx: float = 1.0,
+    Ly: float = 1.0,
+    Lz: float = 1.0,
+    quadratic: bool = False,
+    grading: tuple[float, float, float] = (1.0, 1.0, 1.0),
+    boundaries: bool = False,
+    dtype: torch.dtype | None = None,
+    device: torch.device | str | None = None,
+) -> tuple[Tensor, Tensor] | tuple[Tensor, Tensor, dict[str, Tensor]]:
+    """Structured mesh of tetrahedra (Tetra1 or Tetra2) on a box.
+
+    Each grid cell is split into six tetrahedra along its diagonal from (0, 0, 0)
+    to (1, 1, 1), which gives a conforming mesh. Arguments are the same as for
+    `cube_hexa`.
+    """
+    lengths = (Lx, Ly, Lz)
+    nodes, indices = _grid((Nx, Ny, Nz), lengths, grading, dtype, device)
+
+    # Create elements on the paths from corner (0, 0, 0) to (1, 1, 1)
+    tetras = []
+    for p in permutations(range(3)):
+        path = [[0, 0, 0]]
+        for axis in p:
+            path.append(path[-1].copy())
+            path[-1][axis] = 1
+        # Swap nodes of odd permutations for a positive Jacobian
+        if sum(p[i] > p[j] for i, j in combinations(range(3), 2)) % 2 == 1:
+            path[1], path[2] = path[2], path[1]
+        tetras.append(_cells(indices, path))
+    elements = torch.stack(tetras, dim=1).reshape(-1, 4)
+
+    return _finalize(nodes, elements, indices, quadratic, boundaries)
 
 
 def rect_quad(
-    Nx: int, Ny: int, Lx: float = 1.0, Ly: float = 1.0
-) -> tuple[torch.Tensor, torch.Tensor]:
-    # Create nodes
-    X = torch.linspace(0, Lx, Nx)
-    Y = torch.linspace(0, Ly, Ny)
-    x, y = torch.meshgrid(X, Y, indexing="ij")
-    nodes = torch.vstack([x.ravel(), y.ravel()]).T
+    Nx: int,
+    Ny: int,
+    Lx: float = 1.0,
+    Ly: float = 1.0,
+    quadratic: bool = False,
+    grading: tuple[float, float] = (1.0, 1.0),
+    boundaries: bool = False,
+    dtype: torch.dtype | None = None,
+    device: torch.device | str | None = None,
+) -> tuple[Tensor, Tensor] | tuple[Tensor, Tensor, dict[str, Tensor]]:
+    """Structured mesh of quadrilaterals (Quad1 or Quad2) on a rectangle.
+
+    Args:
+        Nx, Ny (int): Number of corner nodes per direction.
+        Lx, Ly (float): Edge lengths of the rectangle. Defaults to 1.0.
+        quadratic (bool): Add edge midpoints for Quad2 elements. Defaults to False.
+        grading (tuple[float, float]): Ratio of the last to the first element size
+            per direction. Defaults to a uniform grid.
+        boundaries (bool): Also return the node sets on edges and corners (see
+            `box_boundaries`). Defaults to False.
+        dtype (torch.dtype, optional): Floating point type of the nodes.
+        device (torch.device, optional): Device of the mesh.
+
+    Returns:
+        tuple: Nodes, elements and (optionally) boundary node sets.
+    """
+    lengths = (Lx, Ly)
+    nodes, indices = _grid((Nx, Ny), lengths, grading, dtype, device)
 
     # Create elements
-    indices = torch.arange(Nx * Ny).reshape((Nx, Ny))
-    n0 = indices[:-1, :-1].ravel()
-    n1 = indices[1:, :-1].ravel()
-    n2 = indices[:-1, 1:].ravel()
-    n3 = indices[1:, 1:].ravel()
-    elements = torch.vstack([n0, n1, n3, n2]).T
+    corners = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    elements = _cells(indices, corners)
 
-    return nodes, elements
+    return _finalize(nodes, elements, indices, quadratic, boundaries)
+
+
+def rect_tria(
+    Nx: int,
+    Ny: int,
+    Lx: float = 1.0,
+    Ly: float = 1.0,
+    quadratic: bool = False,
+    grading: tuple[float, float] = (1.0, 1.0),
+    boundaries: bool = False,
+    dtype: torch.dtype | None = None,
+    device: torch.device | str | None = None,
+) -> tuple[Tensor, Tensor] | tuple[Tensor, Tensor, dict[str, Tensor]]:
+    """Structured mesh of triangles (Tria1 or Tria2) on a rectangle.
+
+    Each grid cell is split into two triangles along its diagonal from (0, 0) to
+    (1, 1). Arguments are the same as for `rect_quad`.
+    """
+    lengths = (Lx, Ly)
+    nodes, indices = _grid((Nx, Ny), lengths, grading, dtype, device)
+
+    # Create elements
+    lower = _cells(indices, [(0, 0), (1, 0), (1, 1)])
+    upper = _cells(indices, [(0, 0), (1, 1), (0, 1)])
+    elements = torch.stack([lower, upper], dim=1).reshape(-1, 3)
+
+    return _finalize(nodes, elements, indices, quadratic, boundaries)
@@ -1,22 +1,32 @@
-import matplotlib.pyplot as plt
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import torch
-from matplotlib.axes import Axes
-from matplotlib.collections import PolyCollection
 from torch import Tensor
 
 from .base import FEM
 from .elements import Quad1, Quad2, Tria1, Tria2
 from .materials import Material
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
 
 class Planar(FEM):
-    def __init__(self, nodes: Tensor, elements: Tensor, material: Material):
+    def __init__(
+        self,
+        nodes: Tensor,
+        elements: Tensor,
+        material: Material,
+        dtype: torch.dtype | None = None,
+    ):
         """Initialize the planar FEM problem."""
 
-        super().__init__(nodes, elements, material)
+        super().__init__(nodes, elements, material, dtype)
 
         # Set up thickness
-        self.thickness = torch.ones(self.n_elem)
+        self.thickness = torch.ones(self.n_elem, dtype=self.dtype)
 
         # Element type
         if len(elements[0]) == 3:
@@ -35,7 +45,7 @@ class Planar(FEM):
         self.n_int = len(self.etype.iweights())
 
         # Initialize external strain
-        self.ext_strain = torch.zeros(self.n_elem, 2, 2)
+        self.ext_strain = torch.zeros(self.n_elem, 2, 2, dtype=self.dtype)
 
     def eval_shape_functions(
         self, xi: Tensor, u: Tensor | float = 0.0
@@ -43,21 +53,28 @@ class Planar(FEM):
         """Gradient operator at integration points xi."""
         nodes = self.nodes + u
         nodes = nodes[self.elements, :]
-        b = self.etype.B(xi)
+        b = self.etype.B(xi).to(nodes.dtype)
         J = torch.einsum("jk,mkl->mjl", b, nodes)
         detJ = torch.linalg.det(J)
-        if torch.any(detJ <= 0.0):
-            raise Exception("Negative Jacobian. Check element numbering.")
+        self.check_jacobian(detJ)
         B = torch.einsum("jkl,lm->jkm", torch.linalg.inv(J), b)
-        return self.etype.N(xi), B, detJ
+        return self.etype.N(xi).to(nodes.dtype), B, detJ
+
+    def select(self, elements: slice) -> "Planar":
+        """Shallow copy of the problem restricted to a block of elements."""
+        fem = super().select(elements)
+        fem.thickness = self.thickness[elements]
+        return fem
 
     def compute_k(self, detJ: Tensor, BCB: Tensor):
         """Element stiffness matrix."""
-        return torch.einsum("...,...,...kl->...kl", self.thickness, detJ, BCB)
+        thickness = self.thickness.to(detJ.dtype)
+        return torch.einsum("...,...,...kl->...kl", thickness, detJ, BCB)
 
     def compute_f(self, detJ: Tensor, B: Tensor, S: Tensor):
         """Element internal force vector."""
-        return torch.einsum("...,...,...ik,...ij->...kj", self.thickness, detJ, B, S)
+        thickness = self.thickness.to(detJ.dtype)
+        return torch.einsum("...,...,...ik,...ij->...kj", thickness, detJ, B, S)
 
     @torch.no_grad()
     def plot(
@@ -81,6 +98,9 @@ class Planar(FEM):
         title: str | None = None,
         ax: Axes | None = None,
     ):
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PolyCollection
+
         # Compute deformed positions
         pos = self.nodes + u
 
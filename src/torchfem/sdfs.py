@@ -6,11 +6,27 @@ from torch import Tensor
 from torchfem.rotations import axis_rotation
 
 EPS = 1e-10
-torch.set_default_dtype(torch.float64)
 
 
 class SDF:
-    def __init__(self, center: Tensor = torch.zeros(3), scale: Tensor = torch.ones(3)):
+    def __init__(
+        self,
+        center: Tensor = torch.zeros(3),
+        scale: Tensor = torch.ones(3),
+        dtype: torch.dtype | None = None,
+    ):
+        """Signed distance function.
+
+        Args:
+            center (Tensor): Center of the SDF.
+            scale (Tensor): Scaling of the SDF along the coordinate axes.
+            dtype (torch.dtype, optional): Floating point type of the SDF. Defaults to
+                None, which evaluates the SDF in the type of the query points.
+        """
+        self.dtype = dtype
+        if dtype is not None:
+            center = center.to(dtype)
+            scale = scale.to(dtype)
         self.center = center
         self.transform = torch.diag(1 / scale)
 
@@ -35,7 +51,7 @@ class SDF:
         return self._f(points) / (torch.norm(self._grad(points), dim=1) + EPS)
 
     def scale(self, scale: Tensor):
-        self.transform = self.transform @ torch.diag(1 / scale)
+        self.transform = self.transform @ torch.diag(1 / scale).to(self.transform)
         return self
 
     def translate(self, center: Tensor):
@@ -44,17 +60,19 @@ class SDF:
 
     def rotate(self, axis: Tensor, angle: Tensor):
         rotation = axis_rotation(axis, angle)
-        self.transform = rotation @ self.transform
+        self.transform = rotation.to(self.transform) @ self.transform
         return self
 
     def _to_xyz(self, points: Tensor) -> tuple[Tensor, Tensor, Tensor]:
-        p = (points - self.center) @ self.transform
+        dtype = points.dtype if self.dtype is None else self.dtype
+        points = points.to(dtype)
+        p = (points - self.center.to(dtype)) @ self.transform.to(dtype)
         return p[:, 0], p[:, 1], p[:, 2]
 
 
 class Boolean(SDF):
     def __init__(self, sdf1: SDF, sdf2: SDF):
-        super().__init__((sdf1.center + sdf2.center) / 2)
+        super().__init__((sdf1.center + sdf2.center) / 2, dtype=sdf1.dtype)
         self.sdf1 = sdf1
         self.sdf2 = sdf2
 
@@ -97,8 +115,9 @@ class Gyroid(SDF):
         self,
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
 
     def _f(self, points: Tensor) -> Tensor:
         x, y, z = self._to_xyz(points)
@@ -122,8 +141,9 @@ class SchwarzP(SDF):
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
         c: float = 0.0,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
         self.c = c
 
     def _f(self, points: Tensor) -> Tensor:
@@ -143,8 +163,9 @@ class Diamond(SDF):
         self,
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
 
     def _f(self, points: Tensor) -> Tensor:
         x, y, z = self._to_xyz(points)
@@ -183,8 +204,9 @@ class Lidinoid(SDF):
         self,
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
 
     def _f(self, points: Tensor) -> Tensor:
         x, y, z = self._to_xyz(points)
@@ -226,8 +248,9 @@ class SplitP(SDF):
         self,
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
 
     def _f(self, points: Tensor) -> Tensor:
         x, y, z = self._to_xyz(points)
@@ -287,8 +310,9 @@ class Neovius(SDF):
         self,
         center: Tensor = torch.zeros(3),
         scale: Tensor = 1 / (2 * torch.pi) * torch.ones(3),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center, scale)
+        super().__init__(center, scale, dtype)
 
     def _f(self, points: Tensor) -> Tensor:
         x, y, z = self._to_xyz(points)
@@ -305,8 +329,13 @@ class Neovius(SDF):
 
 
 class Sphere(SDF):
-    def __init__(self, center: Tensor = torch.zeros(3), radius: float = 1.0):
-        super().__init__(center)
+    def __init__(
+        self,
+        center: Tensor = torch.zeros(3),
+        radius: float = 1.0,
+        dtype: torch.dtype | None = None,
+    ):
+        super().__init__(center, dtype=dtype)
         self.radius = radius
 
     def _f(self, points: Tensor) -> Tensor:
@@ -327,8 +356,9 @@ class Torus(SDF):
         center: Tensor = torch.zeros(3),
         radius: float = 1.0,
         tube_radius: float = 0.5,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center)
+        super().__init__(center, dtype=dtype)
         self.radius = radius
         self.tube_radius = tube_radius
 
@@ -347,8 +377,13 @@ class Torus(SDF):
 
 
 class Box(SDF):
-    def __init__(self, center: Tensor = torch.zeros(3), size: Tensor = torch.ones(3)):
-        super().__init__(center)
+    def __init__(
+        self,
+        center: Tensor = torch.zeros(3),
+        size: Tensor = torch.ones(3),
+        dtype: torch.dtype | None = None,
+    ):
+        super().__init__(center, dtype=dtype)
         self.size = size
 
     def _f(self, points: Tensor) -> Tensor:
@@ -378,8 +413,9 @@ class Cylinder(SDF):
         center: Tensor = torch.zeros(3),
         radius: float = 1.0,
         height: float = 1.0,
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center)
+        super().__init__(center, dtype=dtype)
         self.radius = radius
         self.height = height
 
@@ -400,9 +436,12 @@ class Cylinder(SDF):
 
 class Plane(SDF):
     def __init__(
-        self, center: Tensor = torch.zeros(3), normal: Tensor = torch.tensor([0, 0, 1])
+        self,
+        center: Tensor = torch.zeros(3),
+        normal: Tensor = torch.tensor([0, 0, 1]),
+        dtype: torch.dtype | None = None,
     ):
-        super().__init__(center)
+        super().__init__(center, dtype=dtype)
         self.normal = normal / torch.norm(normal)
 
     def _f(self, points: Tensor) -> Tensor:
@@ -415,7 +454,7 @@ class Plane(SDF):
 
 class Shell(SDF):
     def __init__(self, other: SDF, thickness: float):
-        super().__init__(other.center)
+        super().__init__(other.center, dtype=other.dtype)
         self.other = other
         self.thickness = thickness
 
@@ -136,27 +136,61 @@ class Shell:
         return torch.cat([D0, D1, D2], dim=-1)
 
     def update_local_nodes(self):
-        # Element type and local coordinates
-        local_coords = []
-        for element in self.elements:
-            edge1 = self.nodes[element[1]] - self.nodes[element[0]]
-            edge2 = self.nodes[element[2]] - self.nodes[element[1]]
-            normal = torch.linalg.cross(edge1, edge2)
-            normal = normal / torch.linalg.norm(normal)
-            dir1 = edge1 / torch.linalg.norm(edge1)
-            dir2 = -torch.linalg.cross(edge1, normal)
-            dir2 = dir2 / torch.linalg.norm(dir2)
-            local_coords.append(torch.vstack([dir1, dir2, normal]))
+        # Element edges and normals of all elements
+        nodes = self.nodes[self.elements, :]
+        edge1 = nodes[:, 1] - nodes[:, 0]
+        edge2 = nodes[:, 2] - nodes[:, 1]
+        normal = torch.linalg.cross(edge1, edge2)
+        normal = normal / torch.linalg.norm(normal, dim=-1, keepdim=True)
+        dir1 = edge1 / torch.linalg.norm(edge1, dim=-1, keepdim=True)
+        dir2 = -torch.linalg.cross(edge1, normal)
+        dir2 = dir2 / torch.linalg.norm(dir2, dim=-1, keepdim=True)
 
         # Tranformation matrix x = t X with element coords x and global coords X
-        self.t = torch.stack(local_coords)
-        self.T = torch.func.vmap(torch.block_diag)(*(NDOF * [self.t]))
+        self.t = torch.stack([dir1, dir2, normal], dim=1)
 
         # Compute local node coordinates
-        nodes = self.nodes[self.elements, :]
         rel_pos = (nodes - nodes[:, 0, None]).transpose(2, 1)
         self.loc_nodes = (self.t @ rel_pos).transpose(2, 1)[:, :, 0:2]
 
+    @property
+    def T(self) -> Tensor:
+        """Dense element transformation matrices (shape: [N x 18 x 18]).
+
+        Only for reference, the element routines apply the rotation t to each block
+        of three dofs instead (see `_to_local` and `_to_global`).
+        """
+        return torch.func.vmap(torch.block_diag)(*(NDOF * [self.t]))
+
+    def _to_local(self, u: Tensor) -> Tensor:
+        """Rotate element dofs to local coordinates (T u).
+
+        Args:
+            u (torch tensor): Element dofs in global coordinates (shape: [N x 18])
+
+        Returns:
+            torch tensor: Element dofs in local coordinates (shape: [N x 18])
+        """
+        u = u.reshape(self.n_elem, -1, 3)
+        return torch.einsum("...ij,...aj->...ai", self.t, u).reshape(self.n_elem, -1)
+
+    def _to_global(self, k: Tensor) -> Tensor:
+        """Rotate element matrices to global coordinates (T^T k T).
+
+        Args:
+            k (torch tensor): Element matrices in local coordinates (shape:
+                [N x 18 x 18])
+
+        Returns:
+            torch tensor: Element matrices in global coordinates (shape: [N x 18 x 18])
+        """
+        N = self.n_elem
+        n = k.shape[-1] // 3
+        k = k.reshape(N, n, 3, n, 3)
+        k = torch.einsum("...ki,...akbl->...aibl", self.t, k)
+        k = torch.einsum("...aibl,...lj->...aibj", k, self.t)
+        return k.reshape(N, 3 * n, 3 * n)
+
     def k(self):
         # Perform integrations
         k = torch.zeros((self.n_elem, NDOF * self.etype.nodes, NDOF * self.etype.nodes))
@@ -199,11 +233,10 @@ class Shell:
                 kd[:, i * NDOF - 1, i * NDOF - 1] = DRILL_PENALTY
 
             # Total element stiffness in local coordinates
-            kt = km + kb + ks + kd
+            k += km + kb + ks + kd
 
-            # Total element stiffness in global coordinates
-            k[:, :, :] += self.T.transpose(1, 2) @ kt @ self.T
-        return k
+        # Total element stiffness in global coordinates
+        return self._to_global(k)
 
     def stiffness(self):
         # Assemble global stiffness matrix
@@ -252,7 +285,7 @@ class Shell:
         Cs = self.material.Cs
 
         # Compute in-plane stresses in local coordinate system
-        loc_disp = torch.einsum("...ij,...j->...i", self.T, disp)
+        loc_disp = self._to_local(disp)
         sigma_m = torch.einsum("...ij,...jk,...k->...i", C, self._Dm(B), loc_disp)
         sigma_b = torch.einsum("...ij,...jk,...k->...i", C, self._Db(B), loc_disp)
         sigma = sigma_m + z * sigma_b
@@ -1,4 +1,7 @@
-import pyvista
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import torch
 from torch import Tensor
 
@@ -6,12 +9,21 @@ from .base import FEM
 from .elements import Hexa1, Hexa2, Tetra1, Tetra2
 from .materials import Material
 
+if TYPE_CHECKING:
+    import pyvista
+
 
 class Solid(FEM):
-    def __init__(self, nodes: Tensor, elements: Tensor, material: Material):
+    def __init__(
+        self,
+        nodes: Tensor,
+        elements: Tensor,
+        material: Material,
+        dtype: torch.dtype | None = None,
+    ):
         """Initialize the solid FEM problem."""
 
-        super().__init__(nodes, elements, material)
+        super().__init__(nodes, elements, material, dtype)
 
         # Set element type depending on number of nodes per element
         if len(elements[0]) == 4:
@@ -30,7 +42,7 @@ class Solid(FEM):
         self.n_int = len(self.etype.iweights())
 
         # Initialize external strain
-        self.ext_strain = torch.zeros(self.n_elem, 3, 3)
+        self.ext_strain = torch.zeros(self.n_elem, 3, 3, dtype=self.dtype)
 
     def eval_shape_functions(
         self, xi: Tensor, u: Tensor | float = 0.0
@@ -38,17 +50,16 @@ class Solid(FEM):
         """Gradient operator at integration points xi."""
         nodes = self.nodes + u
         nodes = nodes[self.elements, :]
-        b = self.etype.B(xi)
+        b = self.etype.B(xi).to(nodes.dtype)
         J = torch.einsum("jk,mkl->mjl", b, nodes)
         detJ = torch.linalg.det(J)
-        if torch.any(detJ <= 0.0):
-            raise Exception("Negative Jacobian. Check element numbering.")
+        self.check_jacobian(detJ)
         B = torch.einsum("jkl,lm->jkm", torch.linalg.inv(J), b)
-        return self.etype.N(xi), B, detJ
+        return self.etype.N(xi).to(nodes.dtype), B, detJ
 
     def compute_k(self, detJ: Tensor, BCB: Tensor) -> Tensor:
         """Element stiffness matrix"""
-        return torch.einsum("j,jkl->jkl", detJ, BCB)
+        return torch.einsum("...,...kl->...kl", detJ, BCB)
 
     def compute_f(self, detJ: Tensor, B: Tensor, S: Tensor) -> Tensor:
         """Element internal force vector."""
@@ -92,6 +103,7 @@ class Solid(FEM):
             **kwargs:
                 Additional keyword arguments passed to pyvista.Plotter.add_mesh.
         """
+        import pyvista
 
         pyvista.set_plot_theme("document")
         pl = pyvista.Plotter() if plotter is None else plotter
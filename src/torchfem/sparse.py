@@ -1,20 +1,21 @@
+import warnings
+from importlib.util import find_spec
+
 import numpy as np
-import pyamg
 import torch
-from scipy.sparse import coo_matrix as scipy_coo_matrix
-from scipy.sparse import csgraph
-from scipy.sparse.linalg import cg as scipy_cg
-from scipy.sparse.linalg import minres as scipy_minres
-from scipy.sparse.linalg import spsolve as scipy_spsolve
 from torch import Tensor
 from torch.autograd import Function
 
 available_backends = ["scipy"]
 
+# Maximum number of corrections in mixed precision solves
+MAX_REFINEMENTS = 10
+
 try:
     import cupy
-    from cupyx.scipy.sparse import coo_matrix as cupy_coo_matrix
+    from cupyx.scipy.sparse import csr_matrix as cupy_csr_matrix
     from cupyx.scipy.sparse import diags as cupy_diags
+    from cupyx.scipy.sparse.linalg import LinearOperator as cupy_LinearOperator
     from cupyx.scipy.sparse.linalg import cg as cupy_cg
     from cupyx.scipy.sparse.linalg import minres as cupy_minres
     from cupyx.scipy.sparse.linalg import spsolve as cupy_spsolve
@@ -23,16 +24,295 @@ try:
 except ImportError:
     pass
 
-try:
-    import pypardiso
-
+# SciPy, PyAMG and PyPardiso are imported on first use in CPU solves
+if find_spec("pypardiso") is not None:
     available_backends.append("pypardiso")
-except ImportError:
-    pass
+
+
+# Number of sparsity patterns whose CSR index buffers are kept
+MAX_CSR_PATTERNS = 4
+_csr_patterns: list[tuple[Tensor, int, Tensor, Tensor]] = []
+
+
+def csr_pattern(indices: Tensor, n_rows: int) -> tuple[Tensor, Tensor]:
+    """Row pointers and column indices of coalesced COO indices in CSR order.
+
+    The buffers are computed once per index tensor and kept for the most recently
+    used sparsity patterns, so that repeated solves with matrices on the same
+    pattern (e.g. from `FEM.assembly_plan`) neither recompute the row pointers nor
+    convert the indices. Indices are int32 if possible, as expected by SciPy, PyAMG
+    and CuPy.
+
+    Args:
+        indices (Tensor): Coalesced (row-major sorted) indices. Shape: `(2, nnz)`.
+        n_rows (int): Number of rows of the matrix.
+
+    Returns:
+        tuple[Tensor, Tensor]: Row pointers and column indices.
+    """
+    for key, version, crow, col in _csr_patterns:
+        if (
+            key.data_ptr() == indices.data_ptr()
+            and key.shape == indices.shape
+            and key.device == indices.device
+            and version == indices._version
+            and crow.shape[0] == n_rows + 1
+        ):
+            return crow, col
+
+    row, col = indices
+    crow = torch.zeros(n_rows + 1, dtype=row.dtype, device=row.device)
+    crow[1:] = torch.cumsum(torch.bincount(row, minlength=n_rows), dim=0)
+    if col.shape[0] < 2**31 - 1:
+        crow = crow.to(torch.int32)
+        col = col.to(torch.int32)
+
+    # Keep a reference to the indices, so that their memory is not reused
+    _csr_patterns.insert(0, (indices, indices._version, crow, col))
+    del _csr_patterns[MAX_CSR_PATTERNS:]
+    return crow, col
+
+
+def csr_buffers(A: Tensor) -> tuple[Tensor, Tensor, Tensor]:
+    """Row pointers, column indices and values of a sparse matrix in CSR order.
+
+    Sparse CSR tensors are returned without conversion. Coalesced COO tensors are
+    already sorted row-major, so only their values are used directly and the index
+    buffers are taken from `csr_pattern`.
+
+    Args:
+        A (Tensor): Sparse matrix with layout `sparse_coo` or `sparse_csr`.
+
+    Returns:
+        tuple[Tensor, Tensor, Tensor]: Row pointers, column indices and values.
+    """
+    if A.layout == torch.sparse_csr:
+        crow = A.crow_indices()
+        col = A.col_indices()
+        val = A.values()
+        if val.shape[0] < 2**31 - 1:
+            crow = crow.to(torch.int32)
+            col = col.to(torch.int32)
+    else:
+        if not A.is_coalesced():
+            A = A.coalesce()
+        crow, col = csr_pattern(A._indices(), A.shape[0])
+        val = A._values()
+    return crow, col, val.detach()
+
+
+class AMGCache:
+    def __init__(
+        self,
+        refresh: bool = False,
+        rebuild_every: int | None = None,
+        max_iter_ratio: float | None = 2.0,
+    ):
+        """Cache for the AMG hierarchy used to precondition iterative solves.
+
+        The hierarchy is built once and reused as long as the sparsity pattern of
+        the matrix does not change. If the values change, the cached hierarchy is
+        either reused as-is or its numeric parts are refreshed, i.e. the smoothed
+        prolongators and Galerkin products are recomputed on the cached aggregates.
+
+        Args:
+            refresh (bool, optional): Refresh the numeric parts of the hierarchy if
+                the matrix values change. Defaults to False, which reuses it as-is.
+            rebuild_every (int, optional): Rebuild the hierarchy from scratch after
+                this number of uses. Defaults to None (no periodic rebuild).
+            max_iter_ratio (float, optional): Rebuild the hierarchy from scratch if
+                a solve needs more than this factor times the iterations of the first
+                solve with the current hierarchy. Defaults to 2.0.
+        """
+        self.refresh = refresh
+        self.rebuild_every = rebuild_every
+        self.max_iter_ratio = max_iter_ratio
+        self.ml = None
+        self.uses = 0
+        self.base_iterations = None
+        self.degraded = False
+        self.stats = {"hits": 0, "refreshes": 0, "rebuilds": 0, "iterations": 0}
+
+    def preconditioner(self, A, B):
+        """Return the AMG preconditioner for the SciPy CSR matrix A."""
+        import pyamg
+
+        if self.ml is None:
+            same_pattern = False
+        else:
+            A0 = self.ml.levels[0].A
+            same_pattern = (
+                A0.shape == A.shape
+                and np.array_equal(A0.indptr, A.indptr)
+                and np.array_equal(A0.indices, A.indices)
+            )
+        rebuild_due = self.rebuild_every is not None and self.uses >= self.rebuild_every
+
+        if not same_pattern or rebuild_due or self.degraded:
+            # Build a new hierarchy from scratch
+            self.ml = pyamg.smoothed_aggregation_solver(
+                A, B, smooth="jacobi", keep=self.refresh
+            )
+            self.uses = 0
+            self.base_iterations = None
+            self.degraded = False
+            self.stats["rebuilds"] += 1
+        elif self.refresh and not np.array_equal(self.ml.levels[0].A.data, A.data):
+            # Recompute the numeric parts on the cached aggregates
+            levels = self.ml.levels[:-1]
+            aggregate = [("predefined", {"AggOp": lvl.AggOp}) for lvl in levels]
+            self.ml = pyamg.smoothed_aggregation_solver(
+                A,
+                B,
+                smooth="jacobi",
+                aggregate=aggregate,
+                max_levels=len(self.ml.levels),
+                keep=True,
+            )
+            self.stats["refreshes"] += 1
+        else:
+            self.stats["hits"] += 1
+
+        self.uses += 1
+        return self.ml.aspreconditioner()
+
+    def report(self, iterations: int):
+        """Track the iterations of a solve to detect a degraded preconditioner."""
+        self.stats["iterations"] += iterations
+        if self.base_iterations is None:
+            self.base_iterations = max(iterations, 1)
+        elif (
+            self.max_iter_ratio is not None
+            and iterations > self.max_iter_ratio * self.base_iterations
+        ):
+            self.degraded = True
+
+
+class FactorizationCache:
+    def __init__(self):
+        """Cache for sparse direct factorizations.
+
+        The fill-reducing ordering is computed once per sparsity pattern and reused
+        for all following factorizations with this pattern. The numeric
+        factorization is only recomputed if the matrix values change, so repeated
+        solves with the same matrix (e.g. the adjoint solve of a symmetric matrix in
+        the backward pass) reuse the full factor.
+        """
+        self.A = None
+        self.method = None
+        self.perm = None
+        self.permuted = False
+        self.factor = None
+        self.A_perm = None
+        self.stats = {"hits": 0, "factorizations": 0, "analyses": 0}
+
+    def solve(self, A, b, method: str):
+        """Solve Ax = b for the SciPy CSR matrix A with 'spsolve' or 'pardiso'."""
+        from scipy.sparse import csgraph
+        from scipy.sparse.linalg import splu as scipy_splu
+
+        same_pattern = (
+            self.A is not None
+            and self.method == method
+            and self.A.shape == A.shape
+            and np.array_equal(self.A.indptr, A.indptr)
+            and np.array_equal(self.A.indices, A.indices)
+        )
+        same_values = same_pattern and np.array_equal(self.A.data, A.data)
+
+        if not same_pattern:
+            self.method = method
+            self.stats["analyses"] += 1
+            if method == "pardiso":
+                # Reverse Cuthill-McKee ordering and solver instance per pattern
+                import pypardiso
+
+                self.perm = csgraph.reverse_cuthill_mckee(A)
+                self.factor = pypardiso.PyPardisoSolver()
+            else:
+                # Keep the column ordering computed by SuperLU in the first run
+                self.perm = None
+                self.factor = None
+
+        if same_values:
+            self.stats["hits"] += 1
+        else:
+            self.stats["factorizations"] += 1
+            if method == "pardiso":
+                # Apply the ordering (kept for the solves with this factor)
+                self.A_perm = A[self.perm][:, self.perm]
+                self.factor.factorize(self.A_perm)
+            elif self.perm is None:
+                # SuperLU factors A[:, argsort(perm_c)] (up to row pivoting)
+                self.factor = scipy_splu(A.tocsc())
+                self.perm = np.argsort(self.factor.perm_c)
+                self.permuted = False
+            else:
+                A_perm = A.tocsc()[:, self.perm]
+                self.factor = scipy_splu(A_perm, permc_spec="NATURAL")
+                self.permuted = True
+        self.A = A
+
+        # Solve with the cached factor
+        if method == "pardiso":
+            x_perm = self.factor.solve(self.A_perm, b[self.perm])
+            x = np.empty_like(x_perm)
+            x[self.perm] = x_perm
+        elif self.permuted:
+            y = self.factor.solve(b)
+            x = np.empty_like(y)
+            x[self.perm] = y
+        else:
+            x = self.factor.solve(b)
+        return x
+
+
+def is_symmetric(A: Tensor) -> bool:
+    """Check if a sparse matrix is symmetric up to round-off.
+
+    Args:
+        A (Tensor): Sparse matrix in COO or CSR layout.
+
+    Returns:
+        bool: True if A equals its transpose.
+    """
+    A = A.to_sparse_coo().coalesce()
+    A_T = A.t().coalesce()
+    if not torch.equal(A.indices(), A_T.indices()):
+        return False
+    values = A.values()
+    if values.numel() == 0:
+        return True
+    atol = 100 * torch.finfo(values.dtype).eps * values.abs().max().item()
+    return torch.allclose(values, A_T.values(), rtol=0.0, atol=atol)
+
+
+def solve_columns(solver, A, b, x0=None, **kwargs):
+    """Apply a single right-hand side iterative solver to each column of b.
+
+    All columns share the operator and the preconditioner passed in kwargs. The
+    initial guess is ignored if its shape does not match b.
+
+    Returns:
+        Tuple: Solution with the shape of b and the first nonzero exit code.
+    """
+    if x0 is not None and x0.shape != b.shape:
+        x0 = None
+    if b.ndim == 1:
+        return solver(A, b, x0=x0, **kwargs)
+    x = b.copy()
+    exit_code = 0
+    for j in range(b.shape[1]):
+        x0_j = None if x0 is None else x0[:, j]
+        x[:, j], code = solver(A, b[:, j], x0=x0_j, **kwargs)
+        exit_code = exit_code or code
+    return x, exit_code
 
 
 class CachedSolve:
-    def __init__(self, previous_x=None, previous_grad=None):
+    def __init__(
+        self, previous_x=None, previous_grad=None, amg=None, factorization=None
+    ):
         """Cache for the previous solution and gradient.
 
         This is used to warm-start the solver in the next iteration.
@@ -42,11 +322,15 @@ class CachedSolve:
         Args:
             previous_x (Tensor, optional): Previous solution tensor.
             previous_grad (Tensor, optional): Previous gradient tensor.
+            amg (AMGCache, optional): Cache for the AMG preconditioner.
+            factorization (FactorizationCache, optional): Cache for direct solves.
         If None, the cache is empty.
         """
 
         self.previous_x = previous_x
         self.previous_grad = previous_grad
+        self.amg = amg
+        self.factorization = factorization
 
     def update_grad(self, grad):
         self.previous_grad = grad.detach().clone() if grad is not None else None
@@ -74,13 +358,16 @@ class Solve(Function):
         M: Tensor | None = None,
         cached_solve=CachedSolve(),
         update_cache=False,
+        symmetric: bool | None = None,
+        refine_dtype: torch.dtype | None = None,
     ) -> Tensor:
         """
         Solve the linear system Ax = b.
 
         Args:
-            A (sparse_coo_tensor): Sparse matrix A.
-            b (Tensor): Right-hand side vector b.
+            A (Tensor): Sparse matrix A in COO or CSR layout.
+            b (Tensor): Right-hand side vector b with shape (n,) or multiple
+                right-hand sides with shape (n, n_rhs), e.g. one per load case.
             B (Tensor, optional): Null space rigid body modes for AMG preconditioner.
             rtol (float, optional): Relative tolerance for the iterative solver.
                 Defaults to 1e-10.
@@ -95,12 +382,22 @@ class Solve(Function):
                 gradient. Defaults to an empty cache.
             update_cache (bool, optional): Whether to update the cached solution
                 after the forward pass. Defaults to False.
+            symmetric (bool, optional): Whether A is symmetric. If True, the backward
+                pass reuses A together with its cached preconditioner and
+                factorization instead of solving with A^T. Defaults to None, which
+                checks the symmetry of A in the backward pass.
+            refine_dtype (torch.dtype, optional): Lower precision for the
+                factorization or preconditioner, e.g. torch.float32. The solution is
+                then refined iteratively with residuals in the precision of A.
+                Defaults to None, which solves in the precision of A.
         Returns:
             Tensor: Solution vector x.
         """
         # Check the input shape
         if A.ndim != 2 or (A.shape[0] != A.shape[1]):
             raise ValueError("A should be a square 2D matrix.")
+        if b.ndim not in (1, 2) or b.shape[0] != A.shape[0]:
+            raise ValueError("b should have shape (n,) or (n, n_rhs) matching A.")
         shape = A.size()
         out_device = b.device
 
@@ -118,22 +415,31 @@ class Solve(Function):
 
         # Make default solver choice based on shape and available backends
         if method is None:
+            # PyPardiso only factorizes on the CPU and in double precision
+            cpu = A.device.type == "cpu"
+            double = (refine_dtype or A.dtype) == torch.float64
             if shape[0] < 10000:
-                if A.device.type == "cpu" and "pypardiso" in available_backends:
+                if cpu and double and "pypardiso" in available_backends:
                     method = "pardiso"
                 else:
                     method = "spsolve"
             else:
                 method = "minres"
 
-        # Solve either on CPU or GPU
-        if A.device.type == "cuda":
-            x_xp = Solve._solve_gpu(A, b, B, method, rtol, M, shape, cached_solve)
+        # Solve either on CPU or GPU (optionally with mixed precision refinement)
+        if refine_dtype is not None and refine_dtype != A.dtype:
+            x = Solve._solve_refined(
+                A, b, B, method, rtol, M, shape, cached_solve, refine_dtype
+            )
+            x = x.to(out_device).requires_grad_(True)
         else:
-            x_xp = Solve._solve_cpu(A, b, B, method, rtol, M, shape, cached_solve)
+            if A.device.type == "cuda":
+                x_xp = Solve._solve_gpu(A, b, B, method, rtol, M, shape, cached_solve)
+            else:
+                x_xp = Solve._solve_cpu(A, b, B, method, rtol, M, shape, cached_solve)
 
-        # Convert back to torch
-        x = torch.tensor(x_xp, requires_grad=True, dtype=b.dtype, device=out_device)
+            # Convert back to torch
+            x = torch.tensor(x_xp, requires_grad=True, dtype=b.dtype, device=out_device)
 
         # Update cached solve with the current solution
         if update_cache:
@@ -147,32 +453,68 @@ class Solve(Function):
         A, x = ctx.saved_tensors
 
         # Backprop rule: gradb = A^T @ grad
+        symmetric = ctx.symmetric
+        if symmetric is None:
+            symmetric = is_symmetric(A)
+        if symmetric:
+            # A^T = A, so the forward operator and its caches can be reused
+            A_T = A
+            cached_solve = CachedSolve(
+                previous_x=ctx.cached_solve.previous_grad,
+                amg=ctx.cached_solve.amg,
+                factorization=ctx.cached_solve.factorization,
+            )
+        else:
+            if A.layout == torch.sparse_csr:
+                A_T = A.t().to_sparse_csr()
+            else:
+                A_T = A.T
+            cached_solve = CachedSolve(previous_x=ctx.cached_solve.previous_grad)
         gradb = Solve.apply(
-            A.T,
+            A_T,
             grad_outputs[0],
             ctx.B,
             ctx.rtol,
             ctx.device,
             ctx.method,
             ctx.M,
-            CachedSolve(previous_x=ctx.cached_solve.previous_grad),
+            cached_solve,
+            False,
+            symmetric,
+            ctx.refine_dtype,
         )
 
-        # Backprop rule: gradA = -gradb @ x^T, sparse version
-        row = A._indices()[0, :]
-        col = A._indices()[1, :]
-        val = -gradb[row] * x[col]
-        gradA = torch.sparse_coo_tensor(torch.stack([row, col]), val, A.shape)
+        # Backprop rule: gradA = -gradb @ x^T, sparse version on the pattern of A
+        # (summed over all right-hand sides)
+        if A.layout == torch.sparse_csr:
+            crow = A.crow_indices()
+            col = A.col_indices()
+            row = torch.repeat_interleave(
+                torch.arange(A.shape[0], device=crow.device), crow.diff()
+            )
+            val = -(gradb[row] * x[col]).reshape(len(row), -1).sum(dim=-1)
+            gradA = torch.sparse_csr_tensor(crow, col, val, A.shape)
+        else:
+            indices = A._indices()
+            val = gradb[indices[0]] * x[indices[1]]
+            val = -val.reshape(indices.shape[1], -1).sum(dim=-1)
+            gradA = torch.sparse_coo_tensor(
+                indices, val, A.shape, is_coalesced=A.is_coalesced()
+            )
 
         # Update storage for next iteration
         if ctx.update_cache:
             ctx.cached_solve.update_grad(gradb.detach().clone())
 
-        return gradA, gradb, None, None, None, None, None, None, None
+        return gradA, gradb, None, None, None, None, None, None, None, None, None
 
     @staticmethod
     def setup_context(ctx, inputs, output):
-        A, b, B, rtol, device, method, M, cached_solve, update_cache = inputs
+        # Fill in the defaults of arguments that were not passed to apply
+        defaults = (None, 1e-10, None, None, None, CachedSolve(), False, None, None)
+        inputs = tuple(inputs) + defaults[len(inputs) - 2 :]
+        A, b, B, rtol, device, method, M, cached_solve, update_cache = inputs[:9]
+        symmetric, refine_dtype = inputs[9:]
         x = output
         ctx.save_for_backward(A, x)
 
@@ -184,6 +526,58 @@ class Solve(Function):
         ctx.M = M
         ctx.cached_solve = cached_solve
         ctx.update_cache = update_cache
+        ctx.symmetric = symmetric
+        ctx.refine_dtype = refine_dtype
+
+    @staticmethod
+    def _solve_refined(A, b, B, method, rtol, M, shape, cached_solve, dtype):
+        """Mixed precision solve with iterative refinement.
+
+        The matrix is factorized (or its preconditioner is built) once in the lower
+        precision `dtype`. Corrections A dx = r are solved with it, while residuals
+        r = b - Ax and the solution are accumulated in the precision of A. If the
+        refinement does not converge, e.g. for ill-conditioned matrices, a warning
+        is issued and the system is solved in the precision of A.
+        """
+        solve = Solve._solve_gpu if A.device.type == "cuda" else Solve._solve_cpu
+        A_low = A.to(dtype)
+        B_low = None if B is None else B.to(dtype)
+
+        # Share the factorization and AMG hierarchy across all corrections
+        cache = CachedSolve(
+            amg=cached_solve.amg or AMGCache(),
+            factorization=cached_solve.factorization or FactorizationCache(),
+        )
+
+        # Start from the previous solution if available
+        x = torch.zeros_like(b)
+        previous_x = cached_solve.previous_x
+        if previous_x is not None and previous_x.shape == b.shape:
+            x = previous_x.to(b)
+
+        # Iterative corrections only need to be accurate to the lower precision
+        inner_rtol = max(rtol, torch.finfo(dtype).eps ** 0.5)
+
+        b_norm = torch.linalg.norm(b, dim=0)
+        for _ in range(MAX_REFINEMENTS):
+            r = b - A @ x
+            if (torch.linalg.norm(r, dim=0) <= rtol * b_norm).all():
+                return x
+            r = r.to(dtype)
+            dx = solve(A_low, r, B_low, method, inner_rtol, M, shape, cache)
+            x = x + torch.as_tensor(dx, device=b.device).to(b.dtype)
+
+        # Ill-conditioned systems may not converge, fall back to the precision of A
+        r = b - A @ x
+        if (torch.linalg.norm(r, dim=0) <= rtol * b_norm).all():
+            return x
+        warnings.warn(
+            f"Iterative refinement in {dtype} did not converge in {MAX_REFINEMENTS} "
+            f"steps. Solving in {A.dtype} instead.",
+            RuntimeWarning,
+        )
+        x_xp = solve(A, b, B, method, rtol, M, shape, CachedSolve(previous_x=x))
+        return torch.as_tensor(x_xp, device=b.device).to(b.dtype)
 
     @staticmethod
     def _solve_gpu(A, b, B, method, rtol, M, shape, cached_solve):
@@ -194,13 +588,12 @@ class Solve(Function):
                 "> pip install cupy-cuda11x # v11.2 - 11.8\n"
                 "> pip install cupy-cuda12x # v12.x"
             )
-        A_cp = cupy_coo_matrix(
-            (
-                cupy.asarray(A._values()),
-                (cupy.asarray(A._indices()[0]), cupy.asarray(A._indices()[1])),
-            ),
+        # Wrap the CSR buffers without copies
+        crow, col, val = csr_buffers(A)
+        A_cp = cupy_csr_matrix(
+            (cupy.from_dlpack(val), cupy.from_dlpack(col), cupy.from_dlpack(crow)),
             shape=shape,
-        ).tocsr()
+        )
         b_cp = cupy.asarray(b.data)
         if cached_solve.previous_x is not None:
             x0_cp = cupy.asarray(cached_solve.previous_x.data)
@@ -214,14 +607,18 @@ class Solve(Function):
             # Jacobi preconditioner
             M = cupy_diags(1.0 / A_cp.diagonal())
             # Solve with minres
-            x_xp, exit_code = cupy_minres(A_cp, b_cp, M=M, tol=rtol, x0=x0_cp)
+            x_xp, exit_code = solve_columns(
+                cupy_minres, A_cp, b_cp, x0=x0_cp, M=M, tol=rtol
+            )
             if exit_code != 0:
                 raise RuntimeError(f"minres failed with exit code {exit_code}")
         elif method == "cg":
             # Jacobi preconditioner
             M = cupy_diags(1.0 / A_cp.diagonal())
             # Solve with conjugated gradients
-            x_xp, exit_code = cupy_cg(A_cp, b_cp, M=M, tol=rtol, x0=x0_cp)
+            x_xp, exit_code = solve_columns(
+                cupy_cg, A_cp, b_cp, x0=x0_cp, M=M, tol=rtol
+            )
             if exit_code != 0:
                 raise RuntimeError(f"CG failed with exit code {exit_code}")
 
@@ -229,9 +626,16 @@ class Solve(Function):
 
     @staticmethod
     def _solve_cpu(A, b, B, method, rtol, M, shape, cached_solve):
-        A_np = scipy_coo_matrix(
-            (A._values(), (A._indices()[0], A._indices()[1])), shape=shape
-        ).tocsr()
+        import pyamg
+        from scipy.sparse import csgraph
+        from scipy.sparse import csr_matrix as scipy_csr_matrix
+        from scipy.sparse.linalg import cg as scipy_cg
+        from scipy.sparse.linalg import minres as scipy_minres
+        from scipy.sparse.linalg import spsolve as scipy_spsolve
+
+        # Wrap the CSR buffers as NumPy views without copies
+        crow, col, val = csr_buffers(A)
+        A_np = scipy_csr_matrix((val.numpy(), col.numpy(), crow.numpy()), shape=shape)
         b_np = b.data.numpy()
         if B is None:
             B_np = None
@@ -242,13 +646,19 @@ class Solve(Function):
         else:
             x0_np = None
 
-        if method == "pardiso":
-            if "pypardiso" not in available_backends:
-                raise RuntimeError(
-                    "PyPardiso is not available.\n\n"
-                    "Please install Pypardiso seperately:\n"
-                    "> pip install pypardiso"
-                )
+        if method == "pardiso" and "pypardiso" not in available_backends:
+            raise RuntimeError(
+                "PyPardiso is not available.\n\n"
+                "Please install Pypardiso seperately:\n"
+                "> pip install pypardiso"
+            )
+
+        if method in ["pardiso", "spsolve"] and cached_solve.factorization is not None:
+            # Solve with cached ordering and factorization
+            x_xp = cached_solve.factorization.solve(A_np, b_np, method)
+        elif method == "pardiso":
+            import pypardiso
+
             # Reorder the matrix using reverse Cuthill-McKee algorithm
             rcm_order = csgraph.reverse_cuthill_mckee(A_np)
             A_rcm = A_np[rcm_order][:, rcm_order]
@@ -260,26 +670,32 @@ class Solve(Function):
             x_xp = x_rcm[inv_rcm_order]
         elif method == "spsolve":
             x_xp = scipy_spsolve(A_np, b_np)
-        elif method == "minres":
+        elif method in ["minres", "cg"]:
             # AMG preconditioner with Jacobi smoother
             if M is None:
-                ml = pyamg.smoothed_aggregation_solver(A_np, B_np, smooth="jacobi")
-                M = ml.aspreconditioner()
+                if cached_solve.amg is not None:
+                    M = cached_solve.amg.preconditioner(A_np, B_np)
+                else:
+                    ml = pyamg.smoothed_aggregation_solver(A_np, B_np, smooth="jacobi")
+                    M = ml.aspreconditioner()
 
-            # Solve with minres
-            x_xp, exit_code = scipy_minres(A_np, b_np, M=M, rtol=rtol, x0=x0_np)
-            if exit_code != 0:
-                raise RuntimeError(f"minres failed with exit code {exit_code}")
-        elif method == "cg":
-            # AMG preconditioner with Jacobi smoother
-            if M is None:
-                ml = pyamg.smoothed_aggregation_solver(A_np, B_np, smooth="jacobi")
-                M = ml.aspreconditioner()
+            # Count iterations to monitor the preconditioner quality
+            iterations = [0]
 
-            # Solve with minres
-            x_xp, exit_code = scipy_cg(A_np, b_np, M=M, rtol=rtol, x0=x0_np)
+            def callback(xk):
+                iterations[0] += 1
+
+            # Solve with minres or conjugated gradients (per right-hand side)
+            solver = scipy_minres if method == "minres" else scipy_cg
+            x_xp, exit_code = solve_columns(
+                solver, A_np, b_np, x0=x0_np, M=M, rtol=rtol, callback=callback
+            )
             if exit_code != 0:
-                raise RuntimeError(f"CG failed with exit code {exit_code}")
+                name = "minres" if method == "minres" else "CG"
+                raise RuntimeError(f"{name} failed with exit code {exit_code}")
+            if cached_solve.amg is not None:
+                n_rhs = 1 if b_np.ndim == 1 else b_np.shape[1]
+                cached_solve.amg.report(iterations[0] // n_rhs)
 
         return x_xp
 
@@ -287,6 +703,225 @@ class Solve(Function):
 sparse_solve = Solve.apply
 
 
+class ElementOperator:
+    def __init__(
+        self, k: Tensor, idx: Tensor, con: Tensor, n_dofs: int, chunk_size: int = 4096
+    ):
+        """Matrix-free operator of the global stiffness matrix.
+
+        The product y = Kx is evaluated as the sum of k_e x_e over all elements e
+        (gather, batched matrix product, scatter) in chunks of elements, so the
+        global matrix is never assembled. Constrained dofs act as identity rows and
+        columns, like in `FEM.assemble_stiffness`.
+
+        Args:
+            k (Tensor): Element stiffness matrices. Shape: `(n_elem, n, n)`.
+            idx (Tensor): Global dof indices of each element. Shape: `(n_elem, n)`.
+            con (Tensor): Indices of constrained degrees of freedom.
+            n_dofs (int): Number of global degrees of freedom.
+            chunk_size (int): Number of elements per batched matrix product.
+        """
+        self.k = k.detach()
+        self.idx = idx.long()
+        self.n_dofs = n_dofs
+        self.chunk_size = chunk_size
+        self.free = torch.ones(n_dofs, dtype=torch.bool, device=k.device)
+        self.free[con] = False
+
+    def matvec(self, x: Tensor) -> Tensor:
+        """Compute y = Kx for a vector x."""
+        x_free = torch.where(self.free, x, 0.0)
+        y = torch.zeros_like(x)
+        for start in range(0, self.k.shape[0], self.chunk_size):
+            k = self.k[start : start + self.chunk_size]
+            idx = self.idx[start : start + self.chunk_size]
+            y_e = torch.bmm(k, x_free[idx].unsqueeze(-1)).squeeze(-1)
+            y.index_add_(0, idx.ravel(), y_e.ravel())
+        return torch.where(self.free, y, x)
+
+    def diagonal(self) -> Tensor:
+        """Diagonal of K assembled from the element diagonals."""
+        diag = torch.zeros(self.n_dofs, dtype=self.k.dtype, device=self.k.device)
+        diag.index_add_(0, self.idx.ravel(), self.k.diagonal(dim1=-2, dim2=-1).ravel())
+        return torch.where(self.free, diag, 1.0)
+
+    def solve(
+        self, b: Tensor, method: str, rtol: float, x0: Tensor | None = None
+    ) -> Tensor:
+        """Solve Kx = b with a Jacobi preconditioned iterative method."""
+        shape = (self.n_dofs, self.n_dofs)
+        inv_diag = 1.0 / self.diagonal()
+        if b.device.type == "cuda":
+            if "cupy" not in available_backends:
+                raise RuntimeError("CuPy is required for matrix-free solves on GPU.")
+            inv_diag_cp = cupy.from_dlpack(inv_diag)
+            A = cupy_LinearOperator(
+                shape,
+                matvec=lambda v: cupy.from_dlpack(
+                    self.matvec(torch.from_dlpack(v.ravel()))
+                ),
+                dtype=inv_diag_cp.dtype,
+            )
+            M = cupy_LinearOperator(
+                shape, matvec=lambda v: inv_diag_cp * v.ravel(), dtype=inv_diag_cp.dtype
+            )
+            solver = cupy_minres if method == "minres" else cupy_cg
+            b_xp = cupy.from_dlpack(b.detach().contiguous())
+            x0_xp = None if x0 is None else cupy.from_dlpack(x0.contiguous())
+            x_xp, exit_code = solve_columns(solver, A, b_xp, x0=x0_xp, M=M, tol=rtol)
+            x = torch.from_dlpack(x_xp)
+        else:
+            from scipy.sparse.linalg import LinearOperator as scipy_LinearOperator
+            from scipy.sparse.linalg import cg as scipy_cg
+            from scipy.sparse.linalg import minres as scipy_minres
+
+            inv_diag_np = inv_diag.numpy()
+            A = scipy_LinearOperator(
+                shape,
+                matvec=lambda v: self.matvec(torch.from_numpy(v.ravel())).numpy(),
+                dtype=inv_diag_np.dtype,
+            )
+            M = scipy_LinearOperator(
+                shape, matvec=lambda v: inv_diag_np * v.ravel(), dtype=inv_diag_np.dtype
+            )
+            solver = scipy_minres if method == "minres" else scipy_cg
+            b_xp = b.detach().numpy()
+            x0_xp = None if x0 is None else x0.numpy()
+            x_xp, exit_code = solve_columns(solver, A, b_xp, x0=x0_xp, M=M, rtol=rtol)
+            x = torch.from_numpy(x_xp)
+        if exit_code != 0:
+            name = "minres" if method == "minres" else "CG"
+            raise RuntimeError(f"{name} failed with exit code {exit_code}")
+        return x.to(b.dtype)
+
+
+class MatrixFreeSolve(Function):
+    @staticmethod
+    def forward(
+        k: Tensor,
+        idx: Tensor,
+        con: Tensor,
+        b: Tensor,
+        rtol: float = 1e-10,
+        method: str | None = None,
+        cached_solve=CachedSolve(),
+        update_cache=False,
+        chunk_size: int = 4096,
+    ) -> Tensor:
+        """
+        Solve Kx = b without assembling K from the element stiffness matrices k.
+
+        Args:
+            k (Tensor): Element stiffness matrices. Shape: `(n_elem, n, n)`.
+            idx (Tensor): Global dof indices of each element. Shape: `(n_elem, n)`.
+            con (Tensor): Indices of constrained degrees of freedom, which are
+                treated as identity rows and columns.
+            b (Tensor): Right-hand side with shape (n_dofs,) or (n_dofs, n_rhs).
+            rtol (float, optional): Relative tolerance for the iterative solver.
+                Defaults to 1e-10.
+            method (str, optional): Iterative method ('cg', 'minres'). Defaults to
+                None, which uses 'cg'.
+            cached_solve (CachedSolve, optional): Cache for the previous solution and
+                gradient. Defaults to an empty cache.
+            update_cache (bool, optional): Whether to update the cached solution
+                after the forward pass. Defaults to False.
+            chunk_size (int, optional): Number of elements per batched matrix
+                product. Defaults to 4096.
+        Returns:
+            Tensor: Solution x.
+        """
+        if method is None:
+            method = "cg"
+        if method not in ["cg", "minres"]:
+            raise ValueError(
+                f"Method {method} is not supported for matrix-free solves. "
+                "Choose from 'cg' or 'minres'."
+            )
+
+        operator = ElementOperator(k, idx, con, b.shape[0], chunk_size)
+        x0 = cached_solve.previous_x
+        x = operator.solve(b, method, rtol, x0)
+
+        # Update cached solve with the current solution
+        if update_cache:
+            cached_solve.update_x(x)
+
+        return x
+
+    @staticmethod
+    def backward(ctx, *grad_outputs):
+        # Access the saved variables
+        k, x = ctx.saved_tensors
+
+        # Backprop rule: gradb = K^T @ grad (with element matrices transposed)
+        gradb = MatrixFreeSolve.apply(
+            k.transpose(-1, -2),
+            ctx.idx,
+            ctx.con,
+            grad_outputs[0],
+            ctx.rtol,
+            ctx.method,
+            CachedSolve(previous_x=ctx.cached_solve.previous_grad),
+            False,
+            ctx.chunk_size,
+        )
+
+        # Backprop rule: gradk_e = -gradb_e @ x_e^T, on free dofs only
+        free = torch.ones(x.shape[0], 1, dtype=torch.bool, device=x.device)
+        free[ctx.con] = False
+        gradb_free = torch.where(free, gradb.reshape(x.shape[0], -1), 0.0)
+        x_free = torch.where(free, x.reshape(x.shape[0], -1), 0.0)
+        idx = ctx.idx.long()
+        gradk = -torch.einsum("eac,ebc->eab", gradb_free[idx], x_free[idx])
+
+        # Update storage for next iteration
+        if ctx.update_cache:
+            ctx.cached_solve.update_grad(gradb)
+
+        return gradk, None, None, gradb, None, None, None, None, None
+
+    @staticmethod
+    def setup_context(ctx, inputs, output):
+        # Fill in the defaults of arguments that were not passed to apply
+        defaults = (1e-10, None, CachedSolve(), False, 4096)
+        inputs = tuple(inputs) + defaults[len(inputs) - 4 :]
+        k, idx, con, b, rtol, method, cached_solve, update_cache, chunk_size = inputs
+        ctx.save_for_backward(k, output)
+        ctx.idx = idx
+        ctx.con = con
+        ctx.rtol = rtol
+        ctx.method = method
+        ctx.cached_solve = cached_solve
+        ctx.update_cache = update_cache
+        ctx.chunk_size = chunk_size
+
+
+def matrix_free_solve(
+    k: Tensor,
+    idx: Tensor,
+    con: Tensor,
+    b: Tensor,
+    rtol: float = 1e-10,
+    method: str | None = None,
+    cached_solve: CachedSolve | None = None,
+    update_cache: bool = False,
+    chunk_size: int | None = None,
+) -> Tensor:
+    """Solve Kx = b without assembling K, see `MatrixFreeSolve.forward`.
+
+    Unlike `MatrixFreeSolve.apply`, this accepts keyword arguments. A cache of None
+    starts from an empty cache and a chunk_size of None uses blocks of 4096
+    elements.
+    """
+    if cached_solve is None:
+        cached_solve = CachedSolve()
+    if chunk_size is None:
+        chunk_size = 4096
+    return MatrixFreeSolve.apply(
+        k, idx, con, b, rtol, method, cached_solve, update_cache, chunk_size
+    )
+
+
 def sparse_index_select(t: Tensor, slices: list[Tensor | None]) -> Tensor:
     coalesced = t.is_coalesced()
     indices = t.indices()
@@ -1,23 +1,32 @@
-import matplotlib.pyplot as plt
-import pyvista
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import torch
-from matplotlib.axes import Axes
-from matplotlib.colors import Normalize
 from torch import Tensor
 
 from .base import FEM
 from .elements import Bar1, Bar2
 from .materials import Material
 
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+
 
 class Truss(FEM):
-    def __init__(self, nodes: Tensor, elements: Tensor, material: Material):
+    def __init__(
+        self,
+        nodes: Tensor,
+        elements: Tensor,
+        material: Material,
+        dtype: torch.dtype | None = None,
+    ):
         """Initialize a truss FEM problem."""
 
-        super().__init__(nodes, elements, material)
+        super().__init__(nodes, elements, material, dtype)
 
         # Set up areas
-        self.areas = torch.ones((len(elements)))
+        self.areas = torch.ones(len(elements), dtype=self.dtype)
 
         # Element type
         if len(elements[0]) == 2:
@@ -32,7 +41,7 @@ class Truss(FEM):
         self.n_int = len(self.etype.iweights())
 
         # Initialize external strain
-        self.ext_strain = torch.zeros(self.n_elem, 1, 1)
+        self.ext_strain = torch.zeros(self.n_elem, 1, 1, dtype=self.dtype)
 
     def eval_shape_functions(
         self, xi: Tensor, u: Tensor | float = 0.0
@@ -49,22 +58,29 @@ class Truss(FEM):
 
         J = 0.5 * torch.linalg.norm(dx, dim=1)[:, None, None]
         detJ = torch.linalg.det(J)
-        if torch.any(detJ <= 0.0):
-            raise Exception("Negative Jacobian. Check element numbering.")
+        self.check_jacobian(detJ)
 
-        b = self.etype.B(xi)
+        b = self.etype.B(xi).to(nodes.dtype)
         B = torch.einsum("jkl,lm->jkm", torch.linalg.inv(J), b)
         B = torch.einsum("ijk,il->ijkl", B, cs).reshape(self.n_elem, -1)[:, None, :]
 
-        return self.etype.N(xi), B, detJ
+        return self.etype.N(xi).to(nodes.dtype), B, detJ
+
+    def select(self, elements: slice) -> "Truss":
+        """Shallow copy of the problem restricted to a block of elements."""
+        fem = super().select(elements)
+        fem.areas = self.areas[elements]
+        return fem
 
     def compute_k(self, detJ: Tensor, BCB: Tensor):
         """Element stiffness matrix."""
-        return torch.einsum("...,...,...kl->...kl", self.areas, detJ, BCB)
+        areas = self.areas.to(detJ.dtype)
+        return torch.einsum("...,...,...kl->...kl", areas, detJ, BCB)
 
     def compute_f(self, detJ: Tensor, B: Tensor, S: Tensor):
         """Element internal force vector."""
-        return torch.einsum("...,...,...ik,...ij->...kj", self.areas, detJ, B, S)
+        areas = self.areas.to(detJ.dtype)
+        return torch.einsum("...,...,...ik,...ij->...kj", areas, detJ, B, S)
 
     def plot(self, **kwargs):
         if self.n_dim == 2:
@@ -88,6 +104,9 @@ class Truss(FEM):
         vmax: float | None = None,
         ax: Axes | None = None,
     ):
+        import matplotlib.pyplot as plt
+        from matplotlib.colors import Normalize
+
         # Set figure size
         if ax is None:
             _, ax = plt.subplots()
@@ -179,6 +198,7 @@ class Truss(FEM):
         constraint_size_factor: float = 0.1,
         cmap: str = "viridis",
     ):
+        import pyvista
 
         pyvista.set_plot_theme("document")
         pyvista.set_jupyter_backend("client")
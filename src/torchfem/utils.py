@@ -1,7 +1,5 @@
 from typing import List, Tuple
 
-import matplotlib.patches as patches
-import matplotlib.pyplot as plt
 import torch
 from torch import Tensor
 
@@ -208,7 +206,9 @@ def voigt2strain(voigt: Tensor) -> Tensor:
 def voigt2stiffness(voigt: Tensor) -> Tensor:
     """Convert a stiffness tensor from Voigt notation."""
     if voigt.shape[-1] == 3:
-        C = torch.zeros(voigt.shape[0], 2, 2, 2, 2)
+        C = torch.zeros(
+            *voigt.shape[:-2], 2, 2, 2, 2, dtype=voigt.dtype, device=voigt.device
+        )
         C[..., 0, 0, 0, 0] = voigt[..., 0, 0]
         C[..., 1, 1, 1, 1] = voigt[..., 1, 1]
         C[..., 0, 0, 1, 1] = voigt[..., 0, 1]
@@ -227,7 +227,9 @@ def voigt2stiffness(voigt: Tensor) -> Tensor:
         C[..., 0, 1, 1, 0] = voigt[..., 2, 2]
         return C
     elif voigt.shape[-1] == 6:
-        C = torch.zeros(voigt.shape[0], 3, 3, 3, 3)
+        C = torch.zeros(
+            *voigt.shape[:-2], 3, 3, 3, 3, dtype=voigt.dtype, device=voigt.device
+        )
         C[..., 0, 0, 0, 0] = voigt[..., 0, 0]
         C[..., 1, 1, 1, 1] = voigt[..., 1, 1]
         C[..., 2, 2, 2, 2] = voigt[..., 2, 2]
@@ -330,6 +332,63 @@ def voigt2stiffness(voigt: Tensor) -> Tensor:
         raise ValueError("Invalid shape for Voigt notation.")
 
 
+def voigt_gradient(B: Tensor) -> Tensor:
+    """Convert a gradient operator to the strain-displacement matrix in Voigt notation.
+
+    The rows follow the ordering of `strain2voigt` with engineering shear strains
+    and the columns are the node-wise ordered element degrees of freedom.
+
+    Args:
+        B (Tensor): Shape function gradients. Shape: `(..., n_dim, N_nod)` or
+            `(..., 1, n_dofs)` for operators that are already scalar (trusses).
+
+    Returns:
+        Tensor: Strain-displacement matrix. Shape: `(..., n_voigt, n_dim * N_nod)`.
+    """
+    if B.shape[-2] == 1:
+        return B
+    zero = torch.zeros_like(B[..., 0, :])
+    if B.shape[-2] == 2:
+        bx, by = B.unbind(-2)
+        rows = [[bx, zero], [zero, by], [by, bx]]
+    elif B.shape[-2] == 3:
+        bx, by, bz = B.unbind(-2)
+        rows = [
+            [bx, zero, zero],
+            [zero, by, zero],
+            [zero, zero, bz],
+            [zero, bz, by],
+            [bz, zero, bx],
+            [by, bx, zero],
+        ]
+    else:
+        raise ValueError("Invalid shape for gradient operator.")
+    return torch.stack([torch.stack(r, dim=-1).flatten(-2) for r in rows], dim=-2)
+
+
+def voigt_stiffness(ddsdde: Tensor, B: Tensor) -> Tensor:
+    """Material stiffness B^T D B of elements in Voigt notation.
+
+    This is equivalent to contracting the fourth-order tangent with the gradient
+    operators twice, but uses batched matrix products of the small Voigt matrices.
+    It requires a tangent with minor symmetries (small-strain materials).
+
+    Args:
+        ddsdde (Tensor): Fourth-order material tangent. Shape: `(..., d, d, d, d)`.
+        B (Tensor): Shape function gradients. Shape: `(..., n_dim, N_nod)` or
+            `(..., 1, n_dofs)`.
+
+    Returns:
+        Tensor: Element stiffness integrand. Shape: `(..., n_dofs, n_dofs)`.
+    """
+    if ddsdde.shape[-1] == 1:
+        D = ddsdde[..., 0, 0, :, :]
+    else:
+        D = stiffness2voigt(ddsdde)
+    Bv = voigt_gradient(B)
+    return Bv.mT @ (D @ Bv)
+
+
 def plot_contours(
     x: Tensor,
     f: Tensor,
@@ -354,6 +413,9 @@ def plot_contours(
         box: Tuple representing the box coordinates for the contour plot.
         paths: Dictionary of paths to plot.
         colorbar: Boolean indicating whether to show the colorbar."""
+    import matplotlib.patches as patches
+    import matplotlib.pyplot as plt
+
     with torch.no_grad():
         plt.figure(figsize=figsize)
         plt.contour(x[..., 0], x[..., 1], f, levels=levels, colors="k", linewidths=0.5)
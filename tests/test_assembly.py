@@ -0,0 +1,62 @@
+import torch
+
+from torchfem import Solid
+from torchfem.materials import IsotropicElasticity3D
+from torchfem.mesh import cube_hexa
+
+
+def get_cube(N: int = 3) -> Solid:
+    nodes, elements = cube_hexa(N, N, N)
+    cube = Solid(nodes, elements, IsotropicElasticity3D(1000.0, 0.3))
+    cube.constraints[nodes[:, 0] == 0.0, :] = True
+    cube.constraints[nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[nodes[:, 0] == 1.0, 0] = 0.1
+    return cube
+
+
+def test_assemble_stiffness():
+    cube = get_cube()
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    k = cube.k0()
+    K = cube.assemble_stiffness(k, con)
+
+    # Reference assembly with dense element loops
+    idx = cube.idx.long()
+    K_ref = torch.zeros(cube.n_dofs, cube.n_dofs)
+    for e in range(cube.n_elem):
+        K_ref[idx[e][:, None], idx[e][None, :]] += k[e]
+    K_ref[con, :] = 0.0
+    K_ref[:, con] = 0.0
+    K_ref[con, con] = 1.0
+
+    assert K.is_coalesced()
+    assert torch.allclose(K.to_dense(), K_ref, atol=1e-4)
+
+
+def test_assembly_plan_reuse():
+    cube = get_cube()
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    indices, scatter, _ = cube.assembly_plan(con)
+    assert cube.assembly_plan(con)[1] is scatter
+
+    # Changing the constraints invalidates the plan
+    cube.constraints[:, 2] = True
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    assert cube.assembly_plan(con)[0].shape[1] < indices.shape[1]
+
+
+def test_assemble_stiffness_condensed():
+    cube = get_cube()
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    free = torch.nonzero(~cube.constraints.ravel(), as_tuple=False).ravel()
+    k = cube.k0()
+    K = cube.assemble_stiffness(k, con)
+    K_red = cube.assemble_stiffness(k, con, condense=True)
+    assert torch.allclose(K_red.to_dense(), K.to_dense()[free][:, free])
+
+
+def test_voigt_kernel():
+    cube = get_cube()
+    k = cube.k0()
+    cube.material.voigt_kernel = False
+    assert torch.allclose(cube.k0(), k, atol=1e-3)
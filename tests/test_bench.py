@@ -0,0 +1,29 @@
+from torchfem.bench import compare, kernel_benchmark, memory_benchmark, run_case
+
+
+def test_run_case():
+    case = run_case(3, method="spsolve")
+    assert case["dofs"] == 81
+    assert all(t is None or t >= 0.0 for t in case["stages"].values())
+
+
+def test_compare():
+    case = {"N": 3, "order": 1, "material": "elastic", "method": "cg"}
+    baseline = {"cases": [{**case, "stages": {"solve": 1.0, "assembly": 1.0}}]}
+    results = {"cases": [{**case, "stages": {"solve": 1.5, "assembly": 1.1}}]}
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert [r["stage"] for r in regressions] == ["solve"]
+
+
+def test_kernel_benchmark():
+    results = kernel_benchmark(n_elem=10, repeat=1)
+    assert len(results) == 10
+    assert all(r["error"] < 1e-5 for r in results)
+
+
+def test_memory_benchmark():
+    results = memory_benchmark(n_elem=100, repeat=1)
+    assert len(results) == 3
+    for r in results:
+        assert r["broadcast_mb"] < r["repeated_mb"] / 50
+        assert r["error"] < 1e-5
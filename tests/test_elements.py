@@ -1,7 +1,19 @@
 import pytest
 import torch
 
-from torchfem.elements import Hexa1, Hexa2, Quad1, Quad2, Tetra1, Tetra2, Tria1, Tria2
+from torchfem.elements import (
+    LINEAR_EDGES,
+    Hexa1,
+    Hexa2,
+    Quad1,
+    Quad2,
+    Tetra1,
+    Tetra2,
+    Tria1,
+    Tria2,
+    linear_to_quadratic,
+)
+from torchfem.mesh import cube_hexa
 
 # Test elements with quad shape and area 1
 test_quad1 = torch.tensor([[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]])
@@ -113,3 +125,32 @@ def test_gradient(elem):
         for i in range(elem.nodes):
             grad = torch.autograd.grad(elem.N(q)[i], q)[0]
             assert torch.allclose(grad, elem.B(q)[:, i], atol=1e-5)
+
+
+def test_linear_to_quadratic():
+    # Two quads sharing the edge (1, 4)
+    nodes = torch.tensor(
+        [[0.0, 0.0], [1.0, 0.0], [2.0, 0.0], [0.0, 1.0], [1.0, 1.0], [2.0, 1.0]]
+    )
+    elements = torch.tensor([[0, 1, 4, 3], [1, 2, 5, 4]])
+    new_nodes, new_elements = linear_to_quadratic(nodes, elements)
+
+    # Midpoints are numbered in the order of their first appearance
+    assert new_elements.tolist() == [
+        [0, 1, 4, 3, 6, 7, 8, 9],
+        [1, 2, 5, 4, 10, 11, 12, 7],
+    ]
+    assert torch.allclose(new_nodes[7], torch.tensor([1.0, 0.5]))
+    assert len(new_nodes) == 13
+
+
+def test_linear_to_quadratic_hexa():
+    nodes, elements = cube_hexa(3, 3, 3)
+    new_nodes, new_elements = linear_to_quadratic(nodes, elements)
+    # Number of unique edges in a 2x2x2 grid of hexahedra
+    assert len(new_nodes) == 27 + 54
+    # Midpoints are located between the corner nodes of each edge
+    edges = torch.tensor(LINEAR_EDGES[(8, 3)])
+    corners = new_nodes[new_elements[:, edges]]
+    midpoints = new_nodes[new_elements[:, 8:]]
+    assert torch.allclose(midpoints, corners.mean(dim=-2))
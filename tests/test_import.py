@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+# Budget for 'import torchfem' on top of 'import torch' in seconds
+IMPORT_BUDGET = 1.0
+
+SCRIPT = """
+import sys
+import time
+
+import torch
+
+start = time.perf_counter()
+import torchfem
+import torchfem.sparse
+print(time.perf_counter() - start)
+print(",".join(sys.modules))
+"""
+
+
+def test_import_time():
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True
+    )
+    duration, modules = out.stdout.split()
+    modules = modules.split(",")
+    for name in ["matplotlib", "meshio", "pyamg", "pyvista", "scipy"]:
+        assert name not in modules
+    assert float(duration) < IMPORT_BUDGET
@@ -1,11 +1,189 @@
+from math import sqrt
+
 import pytest
+import torch
+
+from torch.func import jacrev, vmap
+
+from torchfem.materials import (
+    Hyperelastic3D,
+    IsotropicElasticity3D,
+    IsotropicPlasticity3D,
+    MaterialAssignment,
+)
+
+# Mooney-Rivlin type strain energy density
+MU, C2, LMBDA = 100.0, 20.0, 500.0
+
+
+def psi_invariants(I1, I2, J):
+    return (
+        0.5 * MU * (I1 - 3.0)
+        + C2 * (I2 - 3.0)
+        - MU * torch.log(J)
+        + 0.5 * LMBDA * torch.log(J) ** 2
+    )
+
 
-from torchfem.materials import IsotropicElasticity3D
+def psi_cauchy_green(C):
+    I1 = torch.einsum("...ii->...", C)
+    I2 = 0.5 * (I1**2 - torch.einsum("...ij,...ji->...", C, C))
+    J = torch.sqrt(torch.det(C))
+    return psi_invariants(I1, I2, J)
+
+
+def hyperelastic_reference(psi, F):
+    # Stress and tangent with nested automatic differentiation
+    J = torch.det(F)[:, None, None]
+    C = F.transpose(-1, -2) @ F
+    S = 2 * vmap(jacrev(psi))(C)
+    sigma = 1 / J * F @ S @ F.transpose(-1, -2)
+    C_SE = 4 * vmap(jacrev(jacrev(psi)))(C)
+    I2 = torch.eye(3, dtype=F.dtype)
+    ddsdde = (
+        torch.einsum("...iI,...jJ,...kK,...lL,...IJKL->...ijkl", F, F, F, F, C_SE)
+        + 0.5
+        * (
+            torch.einsum("...ik,...jl->...ijkl", sigma, I2)
+            + torch.einsum("...il,...jk->...ijkl", sigma, I2)
+            + torch.einsum("...jk,...il->...ijkl", sigma, I2)
+            + torch.einsum("...jl,...ik->...ijkl", sigma, I2)
+        )
+    ) / J[:, None, None]
+    # Minor symmetries (the strain increments are symmetric)
+    ddsdde = 0.5 * (ddsdde + ddsdde.transpose(-3, -4))
+    ddsdde = 0.5 * (ddsdde + ddsdde.transpose(-1, -2))
+    return sigma, ddsdde
 
 
 @pytest.mark.parametrize("material, n_elem", [(IsotropicElasticity3D(1000.0, 0.3), 10)])
 def test_vectorization(material, n_elem):
+    # Homogeneous parameters broadcast over all elements
     mat_vec = material.vectorize(n_elem)
-    assert mat_vec.E.shape == (n_elem,)
-    assert mat_vec.nu.shape == (n_elem,)
-    assert mat_vec.C.shape == (n_elem,) + material.C.shape
+    assert mat_vec.E.shape == (1,)
+    assert mat_vec.nu.shape == (1,)
+    assert mat_vec.C.shape == (1,) + material.C.shape
+
+    # Broadcast parameters are shared by selected and tiled materials
+    assert mat_vec.select(slice(2, 5), n_elem).C is mat_vec.C
+    assert mat_vec.tile(4, n_elem).C is mat_vec.C
+
+    # Heterogeneous parameters are materialized per element
+    mat_het = IsotropicElasticity3D(torch.linspace(500.0, 1000.0, n_elem), 0.3)
+    assert mat_het.vectorize(n_elem) is mat_het
+    assert mat_het.C.shape == (n_elem,) + material.C.shape
+    H_inc = torch.rand(n_elem, 3, 3)
+    zeros = torch.zeros(n_elem, 3, 3)
+    state = torch.zeros(n_elem, 0)
+    sigma, _, _ = mat_vec.step(H_inc, zeros, zeros, state, zeros)
+    sigma_het, _, _ = mat_het.step(H_inc, zeros, zeros, state, zeros)
+    assert torch.allclose(sigma[-1], sigma_het[-1])
+
+
+def test_plasticity_masked_update():
+    material = IsotropicPlasticity3D(
+        1000.0, 0.3, lambda q: 1.0 + 100.0 * q, lambda q: 100.0 * torch.ones_like(q)
+    ).vectorize(2)
+
+    # One elastic and one plastic point under uniaxial strain
+    H_inc = torch.zeros(2, 3, 3)
+    H_inc[0, 0, 0] = 1e-4
+    H_inc[1, 0, 0] = 1e-2
+    F = torch.eye(3).expand(2, 3, 3)
+    sigma = torch.zeros(2, 3, 3)
+    state = torch.zeros(2, 1)
+    de0 = torch.zeros(2, 3, 3)
+    sigma_new, state_new, ddsdde = material.step(H_inc, F, sigma, state, de0)
+
+    # Elastic point keeps the trial stress and elastic tangent
+    trial = torch.einsum("ijkl,kl->ij", material.C[0], H_inc[0])
+    assert torch.allclose(sigma_new[0], trial)
+    assert torch.allclose(ddsdde[0], material.C[0])
+    assert state_new[0, 0] == 0.0
+
+    # Plastic point is returned onto the yield surface
+    q = state_new[1, 0]
+    dev = sigma_new[1] - torch.trace(sigma_new[1]) / 3 * torch.eye(3)
+    mises = (1.5 * (dev**2).sum()).sqrt()
+    assert q > 0.0
+    assert torch.isclose(mises, 1.0 + 100.0 * q, rtol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "material",
+    [Hyperelastic3D(psi_cauchy_green), Hyperelastic3D(psi_invariants, True)],
+)
+def test_hyperelastic_tangent(material):
+    torch.manual_seed(0)
+    F = torch.eye(3, dtype=torch.float64) + 0.2 * torch.rand(10, 3, 3).double()
+    H_inc = torch.zeros_like(F)
+    sigma = torch.zeros_like(F)
+    state = torch.zeros(10, 0, dtype=torch.float64)
+    sigma_new, _, ddsdde = material.step(H_inc, F, sigma, state, H_inc)
+    sigma_ref, ddsdde_ref = hyperelastic_reference(psi_cauchy_green, F)
+    assert torch.allclose(sigma_new, sigma_ref)
+    assert torch.allclose(ddsdde, ddsdde_ref)
+
+
+def test_plasticity_active_set():
+    material = IsotropicPlasticity3D(
+        1000.0,
+        0.3,
+        lambda q: 1.0 + 100.0 * q,
+        lambda q: 100.0 * torch.ones_like(q),
+        dtype=torch.float64,
+    ).vectorize(20)
+
+    # Random strain increments, some of which yield
+    torch.manual_seed(0)
+    H_inc = 1.4e-3 * (torch.rand(20, 3, 3, dtype=torch.float64) - 0.5)
+    F = torch.eye(3, dtype=torch.float64).expand(20, 3, 3)
+    sigma = torch.zeros_like(H_inc)
+    state = torch.zeros(20, 1, dtype=torch.float64)
+    sigma_new, state_new, ddsdde = material.step(H_inc, F, sigma, state, sigma)
+    assert 0 < (state_new > 0.0).sum() < 20
+
+    # Compacted return mapping matches the masked return mapping of all points
+    s_trial = torch.einsum("...ijkl,...kl->...ij", material.C, 0.5 * (H_inc + H_inc.mT))
+    dev = s_trial - torch.einsum("...ii->...", s_trial)[:, None, None] / 3 * F
+    dev_norm = torch.linalg.norm(dev, dim=(-1, -2))
+    fm = dev_norm > sqrt(2.0 / 3.0)
+    reference = material._masked_correction(s_trial, dev, dev_norm, state.clone(), fm)
+    assert torch.allclose(sigma_new, reference[0])
+    assert torch.allclose(state_new, reference[1])
+    assert torch.allclose(ddsdde, reference[2])
+
+
+def test_material_assignment():
+    elastic = IsotropicElasticity3D(500.0, 0.2, dtype=torch.float64)
+    plastic = IsotropicPlasticity3D(
+        1000.0,
+        0.3,
+        lambda q: 1.0 + 100.0 * q,
+        lambda q: 100.0 * torch.ones_like(q),
+        dtype=torch.float64,
+    )
+    groups = torch.tensor([1, 0, 1, 1, 0, 1])
+    material = MaterialAssignment([elastic, plastic], groups).vectorize(6)
+    assert material.n_state == 1
+    assert material.voigt_kernel
+
+    # Flat batch of two integration points per element
+    material = material.tile(2, 6)
+    torch.manual_seed(0)
+    H_inc = 1.4e-3 * (torch.rand(12, 3, 3, dtype=torch.float64) - 0.5)
+    F = torch.eye(3, dtype=torch.float64).expand(12, 3, 3)
+    sigma = torch.zeros_like(H_inc)
+    state = torch.zeros(12, 1, dtype=torch.float64)
+    sigma_new, state_new, ddsdde = material.step(H_inc, F, sigma, state, sigma)
+
+    # Each group matches its material model evaluated on its own points
+    for g, model in enumerate([elastic, plastic]):
+        mask = groups.repeat(2) == g
+        n = int(mask.sum())
+        s, a, d = model.vectorize(n).step(
+            H_inc[mask], F[mask], sigma[mask], state[mask, : model.n_state], sigma[mask]
+        )
+        assert torch.allclose(sigma_new[mask], s)
+        assert torch.allclose(state_new[mask, : model.n_state], a)
+        assert torch.allclose(ddsdde[mask], d.expand(n, 3, 3, 3, 3))
@@ -0,0 +1,61 @@
+import pytest
+import torch
+
+from torchfem.mesh import cube_hexa, cube_tetra, rect_quad, rect_tria
+
+
+def test_cube_hexa_ordering():
+    nodes, elements = cube_hexa(2, 2, 2)
+    assert nodes.tolist()[:2] == [[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]]
+    assert elements.tolist() == [[0, 4, 6, 2, 1, 5, 7, 3]]
+
+
+@pytest.mark.parametrize("quadratic", [False, True])
+def test_cube_tetra_volume(quadratic):
+    nodes, elements = cube_tetra(3, 4, 5, 2.0, 1.0, 1.0, quadratic=quadratic)
+    assert elements.shape == (6 * 2 * 3 * 4, 10 if quadratic else 4)
+    x = nodes[elements[:, :4]]
+    volume = torch.linalg.det(x[:, 1:] - x[:, :1]) / 6.0
+    assert torch.all(volume > 0.0)
+    assert torch.isclose(volume.sum(), torch.tensor(2.0))
+
+
+def test_rect_tria_area():
+    nodes, elements = rect_tria(4, 3, 3.0, 2.0, grading=(2.0, 1.0))
+    x = nodes[elements]
+    area = torch.linalg.det(x[:, 1:] - x[:, :1]) / 2.0
+    assert torch.all(area > 0.0)
+    assert torch.isclose(area.sum(), torch.tensor(6.0))
+
+
+def test_grading():
+    nodes, _ = rect_quad(4, 2, 7.0, grading=(4.0, 1.0))
+    x = nodes[::2, 0]
+    assert torch.allclose(x, torch.tensor([0.0, 1.0, 3.0, 7.0]))
+
+
+def test_boundaries():
+    nodes, elements, sets = cube_hexa(3, 3, 3, 2.0, quadratic=True, boundaries=True)
+    assert nodes.shape[0] == 27 + 54
+    assert torch.all(nodes[sets["x1"], 0] == 2.0)
+    assert len(sets["x0"]) == 9 + 12
+    assert len(sets["x0y1"]) == 3 + 2
+    assert nodes[sets["x1y1z1"]].tolist() == [[2.0, 1.0, 1.0]]
+
+
+@pytest.mark.parametrize("generator", [cube_hexa, cube_tetra, rect_quad, rect_tria])
+@pytest.mark.parametrize("quadratic", [False, True])
+def test_boundaries_from_grid(generator, quadratic):
+    # Sets from grid indices match a scan of the coordinates
+    lengths = (2.0, 1.0, 3.0)[: 3 if generator in (cube_hexa, cube_tetra) else 2]
+    shape = (4, 3, 5)[: len(lengths)]
+    grading = (2.0,) * len(lengths)
+    nodes, _, sets = generator(
+        *shape, *lengths, quadratic=quadratic, grading=grading, boundaries=True
+    )
+    for key, indices in sets.items():
+        mask = torch.ones(len(nodes), dtype=torch.bool)
+        for axis, side in zip(key[::2], key[1::2]):
+            i = "xyz".index(axis)
+            mask &= nodes[:, i] == (lengths[i] if side == "1" else 0.0)
+        assert torch.equal(indices, torch.nonzero(mask).ravel())
@@ -0,0 +1,14 @@
+import torch
+
+from torchfem.sdfs import Gyroid, Sphere
+
+
+def test_import_keeps_default_dtype():
+    assert torch.get_default_dtype() == torch.float32
+
+
+def test_sdf_dtype():
+    points = torch.rand(10, 3)
+    assert Sphere().sdf(points).dtype == torch.float32
+    assert Sphere(dtype=torch.float64).sdf(points).dtype == torch.float64
+    assert Gyroid().sdf(points.double()).dtype == torch.float64
@@ -0,0 +1,31 @@
+import torch
+
+from torchfem import Shell
+from torchfem.materials import IsotropicElasticityPlaneStress
+from torchfem.rotations import axis_rotation
+
+
+def get_plate() -> Shell:
+    nodes = torch.tensor(
+        [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 1.0, 0.0]]
+    )
+    # Tilt the plate out of the x-y plane
+    R = axis_rotation(torch.tensor([1.0, 1.0, 0.0]), torch.tensor(0.5))
+    nodes = nodes @ R.T
+    elements = torch.tensor([[0, 1, 2], [0, 2, 3]])
+    return Shell(nodes, elements, IsotropicElasticityPlaneStress(1000.0, 0.3))
+
+
+def test_local_frames():
+    plate = get_plate()
+    I = torch.eye(3).expand(plate.n_elem, 3, 3)
+    assert torch.allclose(plate.t @ plate.t.mT, I, atol=1e-6)
+
+
+def test_block_rotation():
+    plate = get_plate()
+    k = torch.rand(plate.n_elem, 18, 18)
+    u = torch.rand(plate.n_elem, 18)
+    T = plate.T
+    assert torch.allclose(plate._to_global(k), T.mT @ k @ T, atol=1e-5)
+    assert torch.allclose(plate._to_local(u), (T @ u[..., None])[..., 0], atol=1e-5)
@@ -0,0 +1,295 @@
+import pytest
+import torch
+
+from torchfem import Solid
+from torchfem.base import AdaptiveStepping, PrecisionPolicy
+from torchfem.materials import (
+    IsotropicElasticity3D,
+    IsotropicPlasticity3D,
+    MaterialAssignment,
+)
+from torchfem.mesh import cube_hexa
+from torchfem.sparse import matrix_free_solve, sparse_solve
+
+
+def get_cube(N: int = 3, dtype: torch.dtype | None = None) -> Solid:
+    nodes, elements = cube_hexa(N, N, N, dtype=dtype)
+    cube = Solid(nodes, elements, IsotropicElasticity3D(1000.0, 0.3))
+    cube.constraints[nodes[:, 0] == 0.0, :] = True
+    return cube
+
+
+def test_load_cases():
+    # Double precision, as the residual of single precision stalls above atol
+    cube = get_cube(dtype=torch.float64)
+    tip = cube.nodes[:, 0] == 1.0
+    forces = torch.zeros(3, cube.n_nod, cube.n_dim, dtype=torch.float64)
+    for j in range(3):
+        forces[j, tip, j] = 1.0
+
+    # Solve all load cases at once
+    cube.forces = forces
+    u, f, sigma, _, _ = cube.solve()
+    assert u.shape == forces.shape
+
+    # Compare to individual solves
+    for j in range(3):
+        cube.forces = forces[j]
+        u_j, f_j, sigma_j, _, _ = cube.solve()
+        assert torch.allclose(u[j], u_j, atol=1e-6)
+        assert torch.allclose(f[j], f_j, atol=1e-4)
+        assert torch.allclose(sigma[j], sigma_j, atol=1e-4)
+
+
+def test_condense():
+    cube = get_cube(dtype=torch.float64)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+    u, f, _, _, _ = cube.solve()
+
+    # Reduced system of free dofs with prescribed displacements on the right side
+    u_red, f_red, _, _, _ = cube.solve(condense=True)
+    n_free = int((~cube.constraints).sum())
+    assert cube.K.shape == (n_free, n_free)
+    assert torch.allclose(u_red, u, atol=1e-6)
+    assert torch.allclose(f_red, f, atol=1e-4)
+
+
+def test_matrix_free_solve():
+    cube = get_cube()
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    b = torch.linspace(-1.0, 1.0, cube.n_dofs, dtype=torch.float64)
+
+    # Reference with assembled stiffness matrix
+    k_ref = cube.k0().double().requires_grad_(True)
+    K = cube.assemble_stiffness(k_ref, con)
+    x_ref = sparse_solve(K, b, None, 1e-10, None, "spsolve")
+    x_ref.sum().backward()
+
+    # Element-by-element products in small chunks
+    k = k_ref.detach().clone().requires_grad_(True)
+    x = matrix_free_solve(k, cube.idx, con, b, 1e-12, "cg", chunk_size=5)
+    x.sum().backward()
+    assert torch.allclose(x, x_ref)
+    assert torch.allclose(k.grad, k_ref.grad)
+
+    # Chunk size is forwarded to the element operator of matrix-free solves
+    cube = get_cube(dtype=torch.float64)
+    cube.forces[cube.nodes[:, 0] == 1.0, 0] = 1.0
+    u, f, _, _, _ = cube.solve(method="spsolve")
+    u_mf, f_mf, _, _, _ = cube.solve(matrix_free=True, chunk_size=5, rtol=1e-10)
+    assert torch.allclose(u_mf, u)
+    assert torch.allclose(f_mf, f, atol=1e-6)
+
+
+def test_chunked_integration():
+    cube = get_cube(dtype=torch.float64)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+    u, f, sigma, _, _ = cube.solve()
+    K = cube.K
+
+    # Blocks of elements that do not divide the number of elements
+    u_c, f_c, sigma_c, _, _ = cube.solve(chunk_size=5)
+    assert torch.allclose(cube.K.to_dense(), K.to_dense())
+    assert torch.allclose(u_c, u)
+    assert torch.allclose(f_c, f, atol=1e-5)
+    assert torch.allclose(sigma_c, sigma, atol=1e-5)
+
+
+def test_reference_geometry_cache():
+    cube = get_cube()
+    geometry = cube.reference_geometry()
+    assert cube.reference_geometry() is geometry
+
+    # In-place modification and reassignment of nodes invalidate the cache
+    cube.nodes[:, 0] *= 2.0
+    scaled = cube.reference_geometry()
+    assert scaled is not geometry
+    assert torch.allclose(scaled[2], 2.0 * geometry[2])
+    cube.nodes = cube.nodes.clone()
+    assert cube.reference_geometry() is not scaled
+
+    # Nodes that require gradients are never cached
+    cube.nodes = cube.nodes.clone().requires_grad_(True)
+    assert cube.reference_geometry() is not cube.reference_geometry()
+
+
+def test_batched_integration_points():
+    cube = get_cube(dtype=torch.float64)
+    cube.material = (
+        IsotropicPlasticity3D(
+            1000.0, 0.3, lambda q: 1.0 + 100.0 * q, lambda q: 100.0 * torch.ones_like(q)
+        )
+        .vectorize(cube.n_elem)
+        .to(torch.float64)
+    )
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+    increments = torch.linspace(0.0, 1.0, 3, dtype=torch.float64)
+    u, f, sigma, _, state = cube.solve(increments=increments)
+    u_b, f_b, sigma_b, _, state_b = cube.solve(
+        increments=increments, batch_ipoints=True
+    )
+    assert torch.allclose(u_b, u, atol=1e-6)
+    assert torch.allclose(f_b, f, atol=1e-4)
+    assert torch.allclose(sigma_b, sigma, atol=1e-4)
+    assert torch.allclose(state_b, state, atol=1e-6)
+
+    # Volume integral over all integration points at once
+    volume = cube.integrate_field().sum()
+    assert torch.isclose(volume, torch.tensor(1.0, dtype=torch.float64))
+
+
+def test_deferred_jacobian_check():
+    cube = get_cube()
+    xi = cube.etype.ipoints()[0]
+    inverted = -2.0 * cube.nodes
+
+    # Immediate check raises
+    with pytest.raises(Exception, match="Negative Jacobian"):
+        cube.eval_shape_functions(xi, inverted)
+
+    # Deferred check only records a flag
+    cube._deferred_checks = True
+    cube.eval_shape_functions(xi, inverted)
+    assert cube._invalid_jacobian
+
+
+def test_compiled_solve():
+    cube = get_cube(N=2, dtype=torch.float64)
+    cube.forces[cube.nodes[:, 0] == 1.0, 0] = 1.0
+    u, f, sigma, _, _ = cube.solve()
+
+    # Trace the full region without graph breaks, but skip Inductor code generation
+    cube._compiled_step = torch.compile(
+        cube.integrate_step, backend="aot_eager", fullgraph=True
+    )
+    u_c, f_c, sigma_c, _, _ = cube.solve(compile=True)
+    assert torch.allclose(u_c, u)
+    assert torch.allclose(f_c, f)
+    assert torch.allclose(sigma_c, sigma)
+
+    # Checks are immediate again after errors inside the solve
+    with pytest.raises(Exception, match="did not converge"):
+        cube.solve(compile=True, max_iter=1)
+    assert not cube._deferred_checks
+
+
+def test_mixed_precision():
+    cube = get_cube(dtype=torch.float64)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+
+    # Reference solution entirely in double precision
+    cube.precision = PrecisionPolicy(torch.float64)
+    u, f, sigma, _, _ = cube.solve()
+
+    # Element kernels and factorization in single precision
+    cube.precision = PrecisionPolicy.mixed()
+    u_m, f_m, sigma_m, _, _ = cube.solve()
+    assert u_m.dtype == torch.float64
+    assert torch.allclose(u_m, u, atol=1e-6)
+    assert torch.allclose(f_m, f, rtol=1e-4, atol=1e-3)
+    assert torch.allclose(sigma_m, sigma, rtol=1e-4, atol=1e-3)
+
+
+def test_model_dtype():
+    nodes, elements = cube_hexa(3, 3, 3)
+    material = IsotropicElasticity3D(1000.0, 0.3)
+    cube = Solid(nodes, elements, material, dtype=torch.float64)
+    cube.constraints[nodes[:, 0] == 0.0, :] = True
+    cube.forces[nodes[:, 0] == 1.0, 0] = 1.0
+    u, f, sigma, _, _ = cube.solve()
+    assert cube.nodes.dtype == torch.float64
+    assert cube.material.C.dtype == torch.float64
+    assert u.dtype == sigma.dtype == torch.float64
+    assert torch.get_default_dtype() == torch.float32
+
+
+def test_material_assignment():
+    cube = get_cube(dtype=torch.float64)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+    u, f, sigma, _, _ = cube.solve()
+
+    # Elastic and (not yielding) plastic groups with the same elastic constants
+    plastic = IsotropicPlasticity3D(
+        1000.0, 0.3, lambda q: 1e6 + q, lambda q: torch.ones_like(q)
+    )
+    groups = torch.arange(cube.n_elem) % 2
+    material = MaterialAssignment([IsotropicElasticity3D(1000.0, 0.3), plastic], groups)
+    cube.material = material.vectorize(cube.n_elem).to(torch.float64)
+    for options in [{}, {"batch_ipoints": True}, {"chunk_size": 3}]:
+        u_m, f_m, sigma_m, _, state_m = cube.solve(**options)
+        assert state_m.shape[-1] == 1
+        assert torch.allclose(u_m, u)
+        assert torch.allclose(f_m, f, atol=1e-5)
+        assert torch.allclose(sigma_m, sigma, atol=1e-5)
+
+
+def test_adaptive_stepping():
+    cube = get_cube()
+    cube.material = IsotropicPlasticity3D(
+        1000.0, 0.3, lambda q: 1.0 + 100.0 * q, lambda q: 100.0 * torch.ones_like(q)
+    ).vectorize(cube.n_elem)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+    increments = torch.linspace(0.0, 1.0, 21)
+    u, f, sigma, _, state = cube.solve(increments=increments)
+
+    # Fewer increments along the same load path
+    adaptive = AdaptiveStepping(min_step=0.01)
+    u_a, f_a, sigma_a, _, state_a = cube.solve(increments=increments, adaptive=adaptive)
+    stats = adaptive.stats
+    assert stats["loads"][0] == 0.0 and stats["loads"][-1] == 1.0
+    assert stats["increments"] < 20
+    assert stats["increments_saved"] == 20 - stats["increments"]
+    assert stats["solves"] <= stats["iterations"]
+    assert torch.allclose(u_a, u, atol=1e-4)
+    assert torch.allclose(sigma_a, sigma, rtol=1e-2, atol=1e-2)
+    assert torch.allclose(state_a, state, atol=1e-3)
+
+    # Intermediate results at the accepted load factors
+    u_i = cube.solve(
+        increments=increments, adaptive=adaptive, return_intermediate=True
+    )[0]
+    assert len(u_i) == len(adaptive.stats["loads"])
+
+    # Cut back until the minimum step does not converge either
+    with pytest.raises(Exception, match="did not converge"):
+        cube.solve(adaptive=AdaptiveStepping(min_step=0.25, max_iter=1))
+
+    # At least one iteration per attempt
+    with pytest.raises(ValueError, match="max_iter"):
+        AdaptiveStepping(max_iter=0)
+    with pytest.raises(ValueError, match="max_iter"):
+        cube.solve(max_iter=0)
+
+
+def test_adaptive_cutback():
+    cube = get_cube(dtype=torch.float64)
+    cube.material = IsotropicPlasticity3D(
+        1000.0,
+        0.3,
+        lambda q: 1.0 + 10.0 * (1.0 - torch.exp(-50.0 * q)),
+        lambda q: 500.0 * torch.exp(-50.0 * q),
+        dtype=torch.float64,
+    ).vectorize(cube.n_elem)
+    cube.constraints[cube.nodes[:, 0] == 1.0, 0] = True
+    cube.displacements[cube.nodes[:, 0] == 1.0, 0] = 0.1
+
+    # The full load step does not converge within four iterations
+    adaptive = AdaptiveStepping(initial=1.0, max_iter=4, min_step=0.01)
+    u_a, f_a, sigma_a, _, state_a = cube.solve(adaptive=adaptive)
+    loads = adaptive.stats["loads"]
+    assert adaptive.stats["cutbacks"] > 0
+    assert loads[-1] == 1.0
+
+    # Retries start from the last converged increment, as in a fixed schedule
+    increments = torch.tensor(loads, dtype=torch.float64)
+    u, f, sigma, _, state = cube.solve(increments=increments)
+    assert torch.allclose(u_a, u)
+    assert torch.allclose(f_a, f)
+    assert torch.allclose(sigma_a, sigma)
+    assert torch.allclose(state_a, state)
@@ -0,0 +1,235 @@
+import numpy as np
+import pytest
+import torch
+from scipy.sparse import csr_matrix, diags, eye, kron
+
+from torchfem import Solid
+from torchfem.materials import IsotropicElasticity3D
+from torchfem.mesh import cube_hexa
+from torchfem.sparse import (
+    AMGCache,
+    CachedSolve,
+    FactorizationCache,
+    available_backends,
+    csr_buffers,
+    is_symmetric,
+    sparse_solve,
+)
+
+
+def get_system(n: int = 20) -> tuple[torch.Tensor, torch.Tensor]:
+    # Symmetric positive definite tridiagonal matrix
+    i = torch.arange(n)
+    row = torch.cat([i, i[:-1], i[1:]])
+    col = torch.cat([i, i[1:], i[:-1]])
+    val = torch.cat([4.0 * torch.ones(n), -torch.ones(n - 1), -torch.ones(n - 1)])
+    A = torch.sparse_coo_tensor(torch.stack([row, col]), val, (n, n)).coalesce()
+    b = torch.linspace(0.0, 1.0, n)
+    return A.double(), b.double()
+
+
+def solve(A, b, cache, method="spsolve"):
+    cached_solve = CachedSolve(factorization=cache)
+    return sparse_solve(A, b, None, 1e-10, None, method, None, cached_solve)
+
+
+@pytest.mark.parametrize("method", ["spsolve", "pardiso"])
+def test_factorization_cache(method):
+    if method == "pardiso" and "pypardiso" not in available_backends:
+        pytest.skip("PyPardiso is not available.")
+    A, b = get_system()
+    cache = FactorizationCache()
+    x_ref = torch.linalg.solve(A.to_dense(), b)
+
+    x = solve(A, b, cache, method)
+    assert torch.allclose(x, x_ref)
+
+    # Same matrix reuses the factorization (and the ordered matrix)
+    A_perm = cache.A_perm
+    x = solve(A, 2.0 * b, cache, method)
+    assert torch.allclose(x, 2.0 * x_ref)
+    assert cache.stats["hits"] == 1
+    assert cache.A_perm is A_perm
+
+    # New values with the same pattern only refactorize numerically
+    x = solve(2.0 * A, b, cache, method)
+    assert torch.allclose(x, 0.5 * x_ref)
+    assert cache.stats["factorizations"] == 2
+    assert cache.stats["analyses"] == 1
+
+
+def test_symmetric_backward():
+    A, b = get_system()
+    A.requires_grad_(True)
+    b.requires_grad_(True)
+    assert is_symmetric(A)
+    assert not is_symmetric(A + torch.sparse_coo_tensor([[0], [1]], [1.0], A.shape))
+
+    # Declared symmetry reuses the factorization in the backward pass
+    cache = FactorizationCache()
+    cached_solve = CachedSolve(factorization=cache)
+    x = sparse_solve(
+        A, b, None, 1e-10, None, "spsolve", None, cached_solve, False, True
+    )
+    x.sum().backward()
+    assert cache.stats["hits"] == 1
+
+    # Gradients match the dense reference and live on the pattern of A
+    A_dense = A.detach().to_dense().requires_grad_(True)
+    b_dense = b.detach().clone().requires_grad_(True)
+    torch.linalg.solve(A_dense, b_dense).sum().backward()
+    assert torch.allclose(b.grad, b_dense.grad)
+    assert torch.equal(A.grad._indices(), A._indices())
+    assert torch.allclose(A.grad.to_dense(), A_dense.grad * (A.to_dense() != 0))
+
+
+def test_multiple_right_hand_sides():
+    A, b = get_system()
+    b = torch.stack([b, 2.0 * b, torch.ones_like(b)], dim=-1).requires_grad_(True)
+    A.requires_grad_(True)
+
+    for method in ["spsolve", "cg"]:
+        x = sparse_solve(A, b, None, 1e-10, None, method)
+        x_ref = torch.linalg.solve(A.detach().to_dense(), b.detach())
+        assert x.shape == b.shape
+        assert torch.allclose(x, x_ref)
+
+    # Gradients are summed over all right-hand sides
+    x.sum().backward()
+    A_dense = A.detach().to_dense().requires_grad_(True)
+    torch.linalg.solve(A_dense, b.detach()).sum().backward()
+    assert torch.allclose(A.grad.to_dense(), A_dense.grad * (A.to_dense() != 0))
+
+
+def test_mixed_precision_refinement():
+    A, b = get_system()
+    x_ref = torch.linalg.solve(A.to_dense(), b)
+
+    # Single precision factorization with double precision refinement
+    cache = FactorizationCache()
+    cached_solve = CachedSolve(factorization=cache)
+    args = (None, 1e-12, None, "spsolve", None, cached_solve, False, None)
+    x = sparse_solve(A, b, *args, torch.float32)
+    assert x.dtype == torch.float64
+    assert torch.allclose(x, x_ref, rtol=1e-10, atol=1e-12)
+    assert cache.stats["factorizations"] == 1
+
+
+def test_mixed_precision_fallback():
+    # Dense symmetric positive definite matrix with condition number 1e10
+    torch.manual_seed(0)
+    Q, _ = torch.linalg.qr(torch.randn(60, 60, dtype=torch.float64))
+    A_dense = Q @ torch.diag(torch.logspace(0.0, 10.0, 60, dtype=torch.float64)) @ Q.T
+    A_dense = 0.5 * (A_dense + A_dense.T)
+    A = A_dense.to_sparse_coo()
+    b = torch.randn(60, dtype=torch.float64)
+    x_ref = sparse_solve(A, b, None, 1e-12, None, "spsolve")
+
+    # Refinement in single precision stalls and falls back to double precision
+    args = (None, 1e-12, None, "spsolve", None, CachedSolve(), False, None)
+    with pytest.warns(RuntimeWarning, match="did not converge"):
+        x = sparse_solve(A, b, *args, torch.float32)
+    assert torch.allclose(x, x_ref, rtol=1e-10, atol=0.0)
+
+
+def test_csr_buffers():
+    nodes, elements = cube_hexa(3, 3, 3, dtype=torch.float64)
+    cube = Solid(nodes, elements, IsotropicElasticity3D(1000.0, 0.3))
+    cube.constraints[nodes[:, 0] == 0.0, :] = True
+    con = torch.nonzero(cube.constraints.ravel(), as_tuple=False).ravel()
+    K = cube.assemble_stiffness(cube.k0(), con)
+
+    # Index buffers of the assembly plan are computed once as int32
+    crow, col, val = csr_buffers(K)
+    assert crow.dtype == torch.int32 and col.dtype == torch.int32
+    K_new = cube.assemble_stiffness(2.0 * cube.k0(), con)
+    crow_new, col_new, _ = csr_buffers(K_new)
+    assert crow_new is crow and col_new is col
+
+    # The SciPy matrix shares memory with the torch buffers
+    A = csr_matrix((val.numpy(), col.numpy(), crow.numpy()), shape=K.shape)
+    assert np.shares_memory(A.indptr, crow.numpy())
+    assert np.shares_memory(A.indices, col.numpy())
+    assert np.shares_memory(A.data, K._values().numpy())
+    assert np.allclose(A.toarray(), K.to_dense().numpy())
+
+
+def laplacian(n: int = 30) -> csr_matrix:
+    # Five-point Laplacian on an n x n grid
+    T = diags([-1.0, 2.0, -1.0], [-1, 0, 1], shape=(n, n))
+    return (kron(eye(n), T) + kron(T, eye(n))).tocsr()
+
+
+def test_amg_cache():
+    A = laplacian()
+    B = np.ones((A.shape[0], 1))
+    cache = AMGCache()
+
+    # Same matrix reuses the hierarchy
+    M = cache.preconditioner(A, B)
+    assert cache.preconditioner(A, B) is not None
+    assert cache.stats == {"hits": 1, "refreshes": 0, "rebuilds": 1, "iterations": 0}
+
+    # New values on the same pattern are not refreshed by default
+    cache.preconditioner(2.0 * A, B)
+    assert cache.stats["hits"] == 2
+
+    # A new sparsity pattern rebuilds the hierarchy
+    cache.preconditioner(laplacian(20), np.ones((400, 1)))
+    assert cache.stats["rebuilds"] == 2
+    assert M.shape == A.shape
+
+
+def test_amg_cache_refresh():
+    A = laplacian()
+    B = np.ones((A.shape[0], 1))
+    cache = AMGCache(refresh=True)
+    cache.preconditioner(A, B)
+    levels = len(cache.ml.levels)
+
+    # New values on the same pattern recompute the hierarchy on the aggregates
+    M = cache.preconditioner(2.0 * A, B)
+    assert cache.stats["refreshes"] == 1 and cache.stats["rebuilds"] == 1
+    assert len(cache.ml.levels) == levels
+    assert np.allclose(cache.ml.levels[0].A.toarray(), 2.0 * A.toarray())
+
+    # The refreshed preconditioner approximates the inverse of the new matrix
+    x = np.linspace(0.0, 1.0, A.shape[0])
+    y = M @ (2.0 * A @ x)
+    assert np.linalg.norm(y - x) < 0.5 * np.linalg.norm(x)
+
+
+def test_amg_cache_rebuild():
+    A = laplacian()
+    B = np.ones((A.shape[0], 1))
+
+    # Periodic rebuild after a number of uses
+    cache = AMGCache(rebuild_every=2)
+    for _ in range(3):
+        cache.preconditioner(A, B)
+    assert cache.stats["rebuilds"] == 2 and cache.stats["hits"] == 1
+
+    # Rebuild if a solve needs much more iterations than the first one
+    cache = AMGCache(max_iter_ratio=2.0)
+    cache.preconditioner(A, B)
+    cache.report(10)
+    cache.report(15)
+    cache.preconditioner(A, B)
+    assert cache.stats["rebuilds"] == 1
+    cache.report(10)
+    cache.report(25)
+    cache.preconditioner(A, B)
+    assert cache.stats["rebuilds"] == 2
+    assert cache.stats["iterations"] == 60
+
+
+def test_amg_cache_solve():
+    A, b = get_system(200)
+    cache = AMGCache()
+    cached_solve = CachedSolve(amg=cache)
+    x_ref = torch.linalg.solve(A.to_dense(), b)
+    for _ in range(2):
+        x = sparse_solve(A, b, None, 1e-12, None, "cg", None, cached_solve)
+        assert torch.allclose(x, x_ref)
+    assert cache.stats["rebuilds"] == 1 and cache.stats["hits"] == 1
+    assert cache.stats["iterations"] > 0